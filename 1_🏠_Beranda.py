@@ -8,6 +8,13 @@ st.set_page_config(
     layout="wide"
 )
 
+# --- DIAGNOSTIK (TERSEMBUNYI) ---
+from siagagempa.config import DIAGNOSTICS_ENABLED
+if DIAGNOSTICS_ENABLED and st.query_params.get("diagnostik") == "1":
+    from siagagempa.diagnostics import render_diagnostics
+    render_diagnostics()
+    st.stop()
+
 # --- FUNGSI UNTUK GAMBAR LATAR HERO SECTION ---
 # Fungsi ini akan membaca file gambar dan mengubahnya menjadi format yang bisa dibaca CSS
 @st.cache_data
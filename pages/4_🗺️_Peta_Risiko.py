@@ -0,0 +1,86 @@
+import os
+
+import streamlit as st
+import folium
+import shapely
+from streamlit_folium import st_folium
+
+from siagagempa.resources import data_version
+from siagagempa.risk_tiles import RISK_TILES_DIR, RISK_TILES_URL, DEFAULT_GRID_SOURCE, load_risk_grid, load_tiles_metadata
+
+# --- KONFIGURASI HALAMAN ---
+st.set_page_config(page_title="Peta Risiko", page_icon="🗺️", layout="wide")
+
+# --- JUDUL ---
+st.title("🗺️ Peta Risiko Gempa Jawa Barat")
+
+
+# --- FUNGSI-FUNGSI BANTUAN ---
+@st.cache_resource(max_entries=1)
+def load_grid_lookup(grid_source, grid_version):
+    """
+    Grid risiko + STRtree untuk mencari sel yang diklik. Hanya dimuat di server saat ada klik pertama,
+    dan dimuat ulang jika file grid berubah (`grid_version`).
+    """
+    gdf_grid = load_risk_grid(grid_source)
+    return gdf_grid, shapely.STRtree(gdf_grid.geometry.values)
+
+
+meta = load_tiles_metadata()
+if meta is None:
+    st.warning("Tile peta risiko belum dibangun. Jalankan `python -m siagagempa.risk_tiles` lalu muat ulang halaman ini.")
+    st.stop()
+# Tile dari versi lama belum mencatat sumber dan ukuran sel
+grid_source = meta.get('source', DEFAULT_GRID_SOURCE)
+cell_size_text = f"~{round(meta['cell_size_km'], 1):g} km" if meta.get('cell_size_km') else "grid"
+st.markdown(f"Peta tingkat risiko per sel grid ({cell_size_text}). Tile peta dimuat bertahap sesuai zoom dan area "
+            "yang terlihat, klik sebuah sel untuk melihat detailnya.")
+
+# --- PETA ---
+(south, west), (north, east) = meta['bounds']
+m = folium.Map(location=[(south + north) / 2, (west + east) / 2], zoom_start=8, tiles="cartodbpositron",
+               min_zoom=meta['min_zoom'], max_bounds=True)
+folium.TileLayer(
+    # Parameter versi agar browser mengambil tile baru setelah ingestion merender ulang sebagian tile
+    tiles=f"{RISK_TILES_URL}?v={int(os.path.getmtime(os.path.join(RISK_TILES_DIR, 'metadata.json')))}",
+    attr="SiagaGempa Jabar",
+    name="Tingkat Risiko",
+    overlay=True,
+    min_zoom=meta['min_zoom'],
+    max_native_zoom=meta['max_zoom'],
+    max_zoom=18,
+    bounds=meta['bounds'],
+).add_to(m)
+
+legend_items = "".join(
+    f"<div><span style='background:{color};opacity:0.7;width:12px;height:12px;display:inline-block;margin-right:6px;'></span>{level}</div>"
+    for level, color in meta['colors'].items()
+)
+m.get_root().html.add_child(folium.Element(
+    f"<div style='position:fixed;bottom:20px;left:20px;z-index:9999;background:white;padding:8px 10px;"
+    f"border-radius:6px;font-size:13px;box-shadow:0 1px 4px rgba(0,0,0,0.3);'><b>Tingkat Risiko</b>{legend_items}</div>"
+))
+
+map_output = st_folium(m, use_container_width=True, height=550, returned_objects=["last_clicked"])
+
+col1, col2, col3 = st.columns(3)
+col1.metric("Sel Risiko Tinggi", meta['level_counts'].get('Tinggi', 0))
+col2.metric("Sel Risiko Sedang", meta['level_counts'].get('Sedang', 0))
+col3.metric("Sel Risiko Rendah", meta['level_counts'].get('Rendah', 0))
+
+# --- DETAIL SEL YANG DIKLIK ---
+if map_output and map_output.get("last_clicked"):
+    clicked = map_output["last_clicked"]
+    gdf_grid, grid_tree = load_grid_lookup(grid_source, data_version([grid_source]))
+    idx = grid_tree.query(shapely.Point(clicked["lng"], clicked["lat"]), predicate='intersects')
+    if len(idx) == 0:
+        st.info("Tidak ada sel grid pada lokasi yang diklik.")
+    else:
+        cell = gdf_grid.iloc[idx[0]]
+        st.subheader(f"Sel {cell['grid_id']}: Risiko {cell['vulnerability_level']}")
+        st.markdown(f"""
+        - **Jumlah Penduduk (kelurahan)**: {cell['jumlah_penduduk']:,.0f} jiwa
+        - **Kepadatan Penduduk**: {cell['kepadatan_penduduk_kelurahan']:,.0f} jiwa/km²
+        - **Gempa Historis (radius 10 km)**: {cell['count_gempa']:.0f} kali, magnitudo maks. {cell['max_mag']:.1f}
+        - **Rata-rata Kedalaman Gempa**: {cell['avg_depth']:.1f} km
+        """)
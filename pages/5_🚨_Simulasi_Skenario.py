@@ -0,0 +1,97 @@
+import streamlit as st
+import pandas as pd
+import folium
+from streamlit_folium import st_folium
+
+from siagagempa.config import BUFFER_GEMPA_KM
+from siagagempa.resources import data_version
+from siagagempa.risk_tiles import DEFAULT_GRID_SOURCE
+from siagagempa.scenario import ScenarioSimulator, summarize_by_kelurahan, scenario_style
+
+# --- KONFIGURASI HALAMAN ---
+st.set_page_config(page_title="Simulasi Skenario", page_icon="🚨", layout="wide")
+
+# --- JUDUL ---
+st.title("🚨 Simulasi Skenario Gempa")
+st.markdown("Masukkan episentrum, magnitudo, dan kedalaman gempa hipotetis untuk melihat sel grid dan kelurahan "
+            f"yang paling terpapar. Gempa ditambahkan ke fitur setiap sel dalam radius {BUFFER_GEMPA_KM} km, "
+            "lalu hanya sel-sel tersebut yang diprediksi ulang.")
+
+
+# --- FUNGSI-FUNGSI BANTUAN ---
+@st.cache_resource(max_entries=1)
+def load_simulator(grid_version):
+    """
+    Grid, buffer sel, dan level dasar dibangun sekali per proses; dimuat ulang jika file grid berubah.
+    """
+    return ScenarioSimulator.load(DEFAULT_GRID_SOURCE)
+
+
+simulator = load_simulator(data_version([DEFAULT_GRID_SOURCE]))
+
+# --- INPUT SKENARIO ---
+with st.form("form_skenario"):
+    col1, col2, col3, col4 = st.columns(4)
+    latitude = col1.number_input("Latitude Episentrum", value=-6.9175, min_value=-8.0, max_value=-5.5, format="%.4f")
+    longitude = col2.number_input("Longitude Episentrum", value=107.6191, min_value=105.5, max_value=109.0, format="%.4f")
+    magnitude = col3.slider("Magnitudo", min_value=3.0, max_value=9.0, value=6.0, step=0.1)
+    depth = col4.number_input("Kedalaman (km)", value=10.0, min_value=0.0, max_value=700.0, step=1.0)
+    submitted = st.form_submit_button("Jalankan Skenario", type="primary", use_container_width=True)
+
+if submitted:
+    st.session_state.scenario_result = simulator.run(latitude, longitude, magnitude, depth)
+    st.session_state.scenario_params = (latitude, longitude, magnitude, depth)
+
+if st.session_state.get('scenario_result') is None:
+    st.stop()
+
+result = st.session_state.scenario_result
+latitude, longitude, magnitude, depth = st.session_state.scenario_params
+
+# --- RINGKASAN ---
+st.markdown("---")
+st.subheader(f"📊 Hasil Skenario M{magnitude:.1f}, kedalaman {depth:.0f} km")
+if result.empty:
+    st.info(f"Tidak ada sel grid dalam radius {BUFFER_GEMPA_KM} km dari episentrum.")
+    st.stop()
+
+changed = result[result['berubah']]
+col1, col2, col3 = st.columns(3)
+col1.metric("Sel Terdampak", len(result))
+col2.metric("Sel Berubah Level", len(changed))
+col3.metric("Sel Risiko Tinggi", int((result['level_sesudah'] == 'Tinggi').sum()))
+
+# --- PETA SEL BERUBAH ---
+st.subheader("🗺️ Sel yang Berubah Tingkat Risiko")
+m = folium.Map(location=[latitude, longitude], zoom_start=11, tiles="cartodbpositron")
+folium.Circle([latitude, longitude], radius=BUFFER_GEMPA_KM * 1000, color='black', weight=1, fill=False,
+              dash_array='5', tooltip=f"Radius {BUFFER_GEMPA_KM} km").add_to(m)
+unchanged = result[~result['berubah']]
+if not unchanged.empty:
+    folium.GeoJson(
+        unchanged[['grid_id', 'level_sesudah', 'geometry']], name="Sel Terdampak (Tetap)",
+        style_function=lambda x: {'fillOpacity': 0, 'color': '#808080', 'weight': 1},
+        tooltip=folium.GeoJsonTooltip(['grid_id', 'level_sesudah'], aliases=['Sel', 'Level'])
+    ).add_to(m)
+if not changed.empty:
+    folium.GeoJson(
+        changed[['grid_id', 'level_sebelum', 'level_sesudah', 'peluang_tinggi', 'geometry']], name="Sel Berubah Level",
+        style_function=scenario_style,
+        tooltip=folium.GeoJsonTooltip(['grid_id', 'level_sebelum', 'level_sesudah', 'peluang_tinggi'],
+                                      aliases=['Sel', 'Sebelum', 'Sesudah', 'Peluang Tinggi'])
+    ).add_to(m)
+folium.Marker([latitude, longitude], tooltip="Episentrum", icon=folium.Icon(color="black", icon="screenshot")).add_to(m)
+folium.LayerControl().add_to(m)
+st_folium(m, use_container_width=True, height=450, returned_objects=[])
+
+# --- TABEL PERINGKAT ---
+st.subheader("📋 Peringkat Sel Paling Terpapar")
+table = pd.DataFrame(result.drop(columns='geometry'))
+st.dataframe(table, use_container_width=True)
+st.download_button("⬇️ Unduh CSV", table.to_csv(index=False).encode('utf-8'),
+                   file_name="skenario_gempa.csv", mime="text/csv")
+
+summary = summarize_by_kelurahan(result)
+if summary is not None and not summary.empty:
+    st.subheader("🏘️ Ringkasan per Kelurahan")
+    st.dataframe(summary, use_container_width=True)
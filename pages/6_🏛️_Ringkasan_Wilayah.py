@@ -0,0 +1,88 @@
+import os
+
+import streamlit as st
+
+from siagagempa.config import ADMIN_ROLLUP_DIR, GD_DEMOGRAFI_JABAR_CLEAN_PATH, MODEL_FILENAME
+from siagagempa.resources import data_version
+from siagagempa.risk_tiles import DEFAULT_GRID_SOURCE
+from siagagempa.admin_rollup import META_FILENAME, load_or_compute_rollups, search_rollup
+
+# --- KONFIGURASI HALAMAN ---
+st.set_page_config(page_title="Ringkasan Wilayah", page_icon="🏛️", layout="wide")
+
+# --- JUDUL ---
+st.title("🏛️ Ringkasan Risiko per Wilayah")
+st.markdown("Peringkat kabupaten/kota, kecamatan, dan kelurahan menurut sebaran tingkat risiko sel grid, "
+            "estimasi penduduk terpapar, dan magnitudo gempa maksimum. Cari nama wilayah atau saring per kabupaten/kota.")
+
+
+# --- FUNGSI-FUNGSI BANTUAN ---
+@st.cache_resource(max_entries=1)
+def load_admin_rollups(rollup_version):
+    """
+    Tabel ringkasan dimuat sekali per proses; dimuat ulang jika grid, demografi, model, atau file ringkasan berubah.
+    """
+    return load_or_compute_rollups(ADMIN_ROLLUP_DIR, DEFAULT_GRID_SOURCE, GD_DEMOGRAFI_JABAR_CLEAN_PATH)
+
+
+rollups, from_file = load_admin_rollups(data_version([
+    DEFAULT_GRID_SOURCE, GD_DEMOGRAFI_JABAR_CLEAN_PATH, MODEL_FILENAME, os.path.join(ADMIN_ROLLUP_DIR, META_FILENAME)
+]))
+if not from_file:
+    st.info("Ringkasan wilayah belum dibangun atau sudah usang, jadi dihitung langsung dari grid. "
+            "Bangun ulang dengan: `python -m siagagempa.admin_rollup build`")
+
+LEVEL_LABELS = {'Kabupaten/Kota': 'kabupaten', 'Kecamatan': 'kecamatan', 'Kelurahan': 'kelurahan'}
+COLUMN_LABELS = {
+    'nama_kab': 'Kabupaten/Kota', 'nama_kec': 'Kecamatan', 'nama_kel': 'Kelurahan',
+    'jumlah_kelurahan': 'Jumlah Kelurahan', 'jumlah_sel': 'Jumlah Sel',
+    'sel_rendah': 'Sel Rendah', 'sel_sedang': 'Sel Sedang', 'sel_tinggi': 'Sel Tinggi',
+    'persen_sel_tinggi': '% Sel Tinggi', 'jumlah_penduduk': 'Jumlah Penduduk',
+    'penduduk_terpapar_tinggi': 'Penduduk Terpapar Tinggi', 'penduduk_terpapar_sedang': 'Penduduk Terpapar Sedang',
+    'max_mag': 'Magnitudo Maks.',
+}
+SORT_OPTIONS = {
+    'Penduduk Terpapar Tinggi': 'penduduk_terpapar_tinggi',
+    '% Sel Tinggi': 'persen_sel_tinggi',
+    'Magnitudo Maks.': 'max_mag',
+    'Jumlah Penduduk': 'jumlah_penduduk',
+}
+
+# --- FILTER ---
+col1, col2, col3, col4 = st.columns([1, 2, 2, 2])
+level_label = col1.radio("**Tingkat Wilayah**", list(LEVEL_LABELS), index=1)
+query = col2.text_input("**Cari Nama Wilayah**", placeholder="mis. Coblong")
+kabupaten_options = ["Semua"] + sorted(rollups['kabupaten']['nama_kab'].dropna().astype(str).unique())
+kabupaten = col3.selectbox("**Kabupaten/Kota**", kabupaten_options, disabled=level_label == 'Kabupaten/Kota')
+sort_label = col4.selectbox("**Urutkan Menurut**", list(SORT_OPTIONS))
+
+table = rollups[LEVEL_LABELS[level_label]]
+filtered = search_rollup(table, query, None if kabupaten == "Semua" or level_label == 'Kabupaten/Kota' else kabupaten)
+# Tabel tersimpan sudah terurut menurut penduduk terpapar; urutan lain diurutkan ulang secara stabil
+if SORT_OPTIONS[sort_label] != 'penduduk_terpapar_tinggi':
+    filtered = filtered.sort_values(SORT_OPTIONS[sort_label], ascending=False, kind='stable')
+
+# --- RINGKASAN & TABEL PERINGKAT ---
+metric1, metric2, metric3 = st.columns(3)
+metric1.metric(f"Jumlah {level_label}", f"{len(filtered):,}")
+metric2.metric("Penduduk Terpapar Risiko Tinggi", f"{filtered['penduduk_terpapar_tinggi'].sum():,.0f}")
+metric3.metric("Magnitudo Gempa Maks.", f"{filtered['max_mag'].max():.1f}" if len(filtered) else "-")
+
+display = filtered.reset_index(drop=True)
+display.index = display.index + 1
+st.dataframe(
+    display.rename(columns=COLUMN_LABELS), use_container_width=True, height=520,
+    column_config={
+        '% Sel Tinggi': st.column_config.NumberColumn(format="%.1f"),
+        'Jumlah Penduduk': st.column_config.NumberColumn(format="%.0f"),
+        'Penduduk Terpapar Tinggi': st.column_config.NumberColumn(format="%.0f"),
+        'Penduduk Terpapar Sedang': st.column_config.NumberColumn(format="%.0f"),
+        'Magnitudo Maks.': st.column_config.NumberColumn(format="%.1f"),
+    },
+)
+st.caption("Penduduk terpapar adalah estimasi: penduduk kelurahan dikalikan proporsi sel grid kelurahan tersebut "
+           "yang berlevel risiko Tinggi/Sedang. Sel dipasangkan ke kelurahan yang memuat centroid sel.")
+st.download_button(
+    "⬇️ Unduh CSV", filtered.to_csv(index=False).encode('utf-8'),
+    file_name=f"ringkasan_risiko_{LEVEL_LABELS[level_label]}.csv", mime="text/csv"
+)
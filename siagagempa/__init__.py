@@ -0,0 +1,3 @@
+"""
+Logika inti SiagaGempa Jabar yang dapat dipakai ulang di luar halaman Streamlit.
+"""
@@ -0,0 +1,242 @@
+"""
+Ringkasan risiko per wilayah administratif (kelurahan, kecamatan, kabupaten/kota) yang dihitung sekali.
+
+Setiap sel grid risiko (final_grid atau permukaan risiko yang lebih halus, lihat siagagempa.risk_surface)
+dipasangkan ke kelurahan yang memuat centroid sel lewat satu point-in-polygon massal. Kelurahan yang
+terlalu kecil untuk memuat centroid sel mana pun memakai sel yang memuat titik representatifnya.
+Dari pasangan itu dihitung tabel siap pakai per tingkat wilayah:
+
+- jumlah sel per tingkat risiko dan persentase sel 'Tinggi'
+- jumlah penduduk dan estimasi penduduk terpapar (penduduk kelurahan x proporsi sel 'Tinggi'/'Sedang')
+- magnitudo gempa maksimum di sel-sel wilayah tersebut
+
+Tabel disimpan sebagai CSV di ADMIN_ROLLUP_DIR bersama meta.json berisi sidik jari file sumber,
+sehingga halaman Ringkasan Wilayah cukup membaca tabel kecil tanpa spatial join per pemuatan halaman.
+
+Pemakaian:
+    python -m siagagempa.admin_rollup build [--grid data/final_grid_data_processed.gpkg]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from siagagempa.config import ADMIN_ROLLUP_DIR, GD_DEMOGRAFI_JABAR_CLEAN_PATH, MODEL_FILENAME
+from siagagempa.compact_store import KelurahanStore, KELURAHAN_NAME_COLUMNS, KELURAHAN_STORE_COLUMNS
+from siagagempa.fingerprint import source_fingerprint
+from siagagempa.risk_tiles import DEFAULT_GRID_SOURCE, load_risk_grid
+
+ROLLUP_FORMAT_VERSION = 1
+META_FILENAME = 'meta.json'
+RISK_LEVELS = ['Rendah', 'Sedang', 'Tinggi']
+
+# Tingkat wilayah -> kolom nama yang menjadi kunci pengelompokan
+ADMIN_LEVELS = {
+    'kabupaten': ['nama_kab'],
+    'kecamatan': ['nama_kab', 'nama_kec'],
+    'kelurahan': KELURAHAN_NAME_COLUMNS,
+}
+
+
+def read_risk_cells(source=DEFAULT_GRID_SOURCE):
+    """
+    Sel risiko dari GeoPackage grid (level diprediksi jika belum ada) atau output GeoParquet risk_surface.
+    """
+    if os.path.isdir(source) or source.endswith('.parquet'):
+        gdf = gpd.read_parquet(source)
+        return gdf.to_crs("EPSG:4326") if gdf.crs is not None and gdf.crs != "EPSG:4326" else gdf
+    return load_risk_grid(source)
+
+
+def assign_cells(cell_geoms, kelurahan):
+    """
+    Pasangan (indeks sel, indeks kelurahan): kelurahan yang memuat centroid setiap sel, ditambah sel yang
+    memuat titik representatif kelurahan yang tidak mendapat sel sama sekali.
+    """
+    cell_geoms = np.asarray(cell_geoms)
+    kelurahan_tree = shapely.STRtree(kelurahan.geoms)
+    idx_cell, idx_kel = kelurahan_tree.query(shapely.centroid(cell_geoms), predicate='within')
+    # Centroid di batas dua kelurahan: pakai kelurahan pertama, seperti SpatialIndex.locate_kelurahan
+    idx_cell, first = np.unique(idx_cell, return_index=True)
+    idx_kel = idx_kel[first]
+
+    without_cell = np.setdiff1d(np.arange(len(kelurahan)), idx_kel)
+    if len(without_cell):
+        cell_tree = shapely.STRtree(cell_geoms)
+        idx_extra, idx_extra_cell = cell_tree.query(
+            shapely.point_on_surface(kelurahan.geoms[without_cell]), predicate='within'
+        )
+        idx_extra, first = np.unique(idx_extra, return_index=True)
+        idx_cell = np.concatenate([idx_cell, idx_extra_cell[first]])
+        idx_kel = np.concatenate([idx_kel, without_cell[idx_extra]])
+    return idx_cell, idx_kel
+
+
+def _summarize(df, keys):
+    """
+    Agregasi baris kelurahan (atau sel per kelurahan) ke tingkat `keys`, diurutkan dari yang paling terpapar.
+    """
+    sums = ['jumlah_sel'] + [f'sel_{level.lower()}' for level in RISK_LEVELS] + [
+        'jumlah_penduduk', 'penduduk_terpapar_tinggi', 'penduduk_terpapar_sedang'
+    ]
+    summary = df.groupby(keys, observed=True, sort=False).agg(
+        jumlah_kelurahan=('nama_kel', 'size'), **{col: (col, 'sum') for col in sums}, max_mag=('max_mag', 'max')
+    ).reset_index()
+    if keys == KELURAHAN_NAME_COLUMNS:
+        summary = summary.drop(columns='jumlah_kelurahan')
+    summary['persen_sel_tinggi'] = np.where(
+        summary['jumlah_sel'] > 0, 100 * summary['sel_tinggi'] / summary['jumlah_sel'].clip(lower=1), 0.0
+    )
+    return summary.sort_values(
+        ['penduduk_terpapar_tinggi', 'persen_sel_tinggi', 'max_mag'], ascending=False, kind='stable'
+    ).reset_index(drop=True)
+
+
+def compute_rollups(gdf_cells, kelurahan):
+    """
+    {tingkat: DataFrame} untuk kelurahan, kecamatan, dan kabupaten.
+    `gdf_cells` berisi kolom vulnerability_level dan max_mag; `kelurahan` adalah KelurahanStore.
+    """
+    if gdf_cells.crs is not None and gdf_cells.crs != "EPSG:4326":
+        gdf_cells = gdf_cells.to_crs("EPSG:4326")
+    idx_cell, idx_kel = assign_cells(gdf_cells.geometry.values, kelurahan)
+    levels = gdf_cells['vulnerability_level'].to_numpy(dtype=object)[idx_cell]
+    pairs = pd.DataFrame({
+        'kelurahan': idx_kel,
+        'max_mag': gdf_cells['max_mag'].to_numpy(dtype=float)[idx_cell] if 'max_mag' in gdf_cells.columns else 0.0,
+        **{f'sel_{level.lower()}': (levels == level).astype(np.int64) for level in RISK_LEVELS},
+    })
+
+    per_kel = pairs.groupby('kelurahan').agg(
+        jumlah_sel=('kelurahan', 'size'), max_mag=('max_mag', 'max'),
+        **{col: (col, 'sum') for col in pairs.columns if col.startswith('sel_')}
+    ).reindex(np.arange(len(kelurahan)), fill_value=0)
+    names = kelurahan.frame(np.arange(len(kelurahan)), KELURAHAN_NAME_COLUMNS).drop(columns='geometry')
+    table = pd.concat([names, per_kel.reset_index(drop=True)], axis=1)
+    table['jumlah_penduduk'] = kelurahan.column('jumlah_penduduk') if 'jumlah_penduduk' in kelurahan.columns else 0.0
+    # Estimasi penduduk terpapar: sebaran penduduk kelurahan dianggap merata di sel-selnya
+    share = table['jumlah_sel'].clip(lower=1)
+    table['penduduk_terpapar_tinggi'] = table['jumlah_penduduk'] * table['sel_tinggi'] / share
+    table['penduduk_terpapar_sedang'] = table['jumlah_penduduk'] * table['sel_sedang'] / share
+
+    return {level: _summarize(table, keys) for level, keys in ADMIN_LEVELS.items()}
+
+
+def _sources(grid_path, demografi_path):
+    # Level sel diprediksi dengan model .pkl jika grid belum memuat vulnerability_level
+    return {path: source_fingerprint(path) for path in [grid_path, demografi_path, MODEL_FILENAME] if os.path.exists(path)}
+
+
+def build_rollups(grid_path=DEFAULT_GRID_SOURCE, demografi_path=GD_DEMOGRAFI_JABAR_CLEAN_PATH, out_dir=ADMIN_ROLLUP_DIR):
+    """
+    Menghitung ringkasan lalu menulisnya ke folder sementara yang kemudian ditukar dengan `out_dir`.
+    """
+    kelurahan = KelurahanStore.from_geodataframe(gpd.read_file(demografi_path, columns=KELURAHAN_STORE_COLUMNS))
+    rollups = compute_rollups(read_risk_cells(grid_path), kelurahan)
+
+    out_dir = os.path.abspath(out_dir)
+    parent = os.path.dirname(out_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.admin-rollup-', dir=parent)
+    try:
+        for name, table in rollups.items():
+            table.to_csv(os.path.join(tmp_dir, f'{name}.csv'), index=False)
+        meta = {
+            'version': ROLLUP_FORMAT_VERSION,
+            'grid': grid_path,
+            'rows': {name: len(table) for name, table in rollups.items()},
+            'sources': _sources(grid_path, demografi_path),
+        }
+        with open(os.path.join(tmp_dir, META_FILENAME), 'w') as f:
+            json.dump(meta, f, indent=2)
+        old_dir = None
+        if os.path.exists(out_dir):
+            old_dir = tempfile.mkdtemp(prefix='.admin-rollup-old-', dir=parent)
+            os.replace(out_dir, os.path.join(old_dir, 'admin_rollup'))
+        os.replace(tmp_dir, out_dir)
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    finally:
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return meta
+
+
+def _read_meta(directory):
+    meta_path = os.path.join(directory, META_FILENAME)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def rollups_are_current(directory=ADMIN_ROLLUP_DIR):
+    """
+    True jika ringkasan ada, versinya cocok, dan file sumbernya belum berubah.
+    """
+    meta = _read_meta(directory)
+    if meta is None or meta.get('version') != ROLLUP_FORMAT_VERSION or not meta.get('sources'):
+        return False
+    return all(
+        os.path.exists(path) and source_fingerprint(path) == fingerprint for path, fingerprint in meta['sources'].items()
+    )
+
+
+def load_rollups(directory=ADMIN_ROLLUP_DIR):
+    """
+    {tingkat: DataFrame} dari CSV yang sudah dibangun.
+    """
+    return {name: pd.read_csv(os.path.join(directory, f'{name}.csv')) for name in ADMIN_LEVELS}
+
+
+def load_or_compute_rollups(directory=ADMIN_ROLLUP_DIR, grid_path=DEFAULT_GRID_SOURCE,
+                            demografi_path=GD_DEMOGRAFI_JABAR_CLEAN_PATH):
+    """
+    (ringkasan, dari_file): tabel yang sudah dibangun bila masih sesuai dengan sumbernya, atau dihitung
+    di memori dari grid dan demografi (tanpa menulis file) jika belum ada/usang.
+    """
+    if rollups_are_current(directory):
+        return load_rollups(directory), True
+    kelurahan = KelurahanStore.from_geodataframe(gpd.read_file(demografi_path, columns=KELURAHAN_STORE_COLUMNS))
+    return compute_rollups(read_risk_cells(grid_path), kelurahan), False
+
+
+def search_rollup(table, query='', kabupaten=None):
+    """
+    Baris yang nama wilayahnya memuat `query` (tanpa membedakan huruf besar/kecil), opsional dibatasi
+    ke satu kabupaten/kota. Urutan peringkat tabel dipertahankan.
+    """
+    mask = np.ones(len(table), dtype=bool)
+    if kabupaten:
+        mask &= (table['nama_kab'] == kabupaten).to_numpy()
+    query = query.strip().lower()
+    if query:
+        name_cols = [col for col in KELURAHAN_NAME_COLUMNS if col in table.columns]
+        names = table[name_cols].astype(str).agg(' '.join, axis=1).str.lower()
+        mask &= names.str.contains(query, regex=False).to_numpy()
+    return table[mask]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Ringkasan risiko per kelurahan, kecamatan, dan kabupaten/kota.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help="Hitung ulang ringkasan dari grid risiko.")
+    build_parser.add_argument('--grid', default=DEFAULT_GRID_SOURCE,
+                              help="Grid risiko (.gpkg) atau output risk_surface (.gpkg/.parquet)")
+    build_parser.add_argument('--demografi', default=GD_DEMOGRAFI_JABAR_CLEAN_PATH)
+    build_parser.add_argument('--out', default=ADMIN_ROLLUP_DIR)
+    args = parser.parse_args()
+
+    meta = build_rollups(args.grid, args.demografi, args.out)
+    rows = ', '.join(f"{name} {count}" for name, count in meta['rows'].items())
+    print(f"Ringkasan wilayah disimpan di '{args.out}' ({rows} baris).")
+
+
+if __name__ == '__main__':
+    main()
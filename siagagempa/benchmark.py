@@ -0,0 +1,378 @@
+"""
+Benchmark pipeline prediksi di luar Streamlit.
+
+Mengukur pemuatan sumber daya, `predict_vulnerability_for_point` + `predict_vulnerability`
+per titik, batch `predict_vulnerability_for_points` (1k dan 100k titik), serta pembuatan
+peta hasil. Titik uji diambil acak di dalam wilayah Jawa Barat. Setiap kasus dijalankan di
+proses terpisah agar puncak memori (max RSS) per kasus tidak saling memengaruhi.
+
+Hanya memakai file di repo: jika GeoPackage POI/demografi tidak ada, lapisan sintetis
+dibangun dari data/final_grid_data_processed.gpkg (sel grid sebagai wilayah demografi,
+POI acak di dalam sel sesuai kolom count_poi_*).
+
+Pemakaian:
+    python -m siagagempa.benchmark --output benchmark.json
+    python -m siagagempa.benchmark --baseline benchmark_baseline.json --output benchmark.json
+"""
+import argparse
+import datetime
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+
+from siagagempa.config import (
+    GD_GEMPA_JABAR_PATH, GD_POI_JABAR_PATH, GD_DEMOGRAFI_JABAR_CLEAN_PATH,
+    DEMOG_FEATURE_COLUMNS, POI_CATEGORY_COLUMNS, FEATURE_MODE
+)
+
+GRID_DATA_PATH = os.path.join('data', 'final_grid_data_processed.gpkg')
+DEFAULT_BATCH_SIZES = [1000, 100000]
+# Ambang perubahan (relatif) yang dianggap regresi saat dibandingkan dengan baseline
+DEFAULT_REGRESSION_THRESHOLD = 0.2
+
+
+# --- DATA ---
+def synthetic_geodata(seed=0):
+    """
+    Lapisan POI dan demografi sintetis dari grid final (hanya file di repo), plus data gempa asli.
+    """
+    rng = np.random.default_rng(seed)
+    gdf_gempa = gpd.read_file(GD_GEMPA_JABAR_PATH).to_crs("EPSG:4326")
+    gdf_grid = gpd.read_file(GRID_DATA_PATH).to_crs("EPSG:4326")
+
+    gdf_demografi = gdf_grid[DEMOG_FEATURE_COLUMNS + ['geometry']].copy()
+    gdf_demografi['nama_kab'] = 'Sintetis'
+    gdf_demografi['nama_kec'] = 'Sintetis'
+    gdf_demografi['nama_kel'] = gdf_grid['grid_id'].to_numpy()
+
+    bounds = gdf_grid.geometry.bounds
+    lons, lats, categories = [], [], []
+    for category, col in POI_CATEGORY_COLUMNS.items():
+        counts = gdf_grid[col].fillna(0).to_numpy(dtype=np.int64)
+        idx = np.repeat(np.arange(len(gdf_grid)), counts)
+        lons.append(rng.uniform(bounds['minx'].to_numpy()[idx], bounds['maxx'].to_numpy()[idx]))
+        lats.append(rng.uniform(bounds['miny'].to_numpy()[idx], bounds['maxy'].to_numpy()[idx]))
+        categories.append(np.full(len(idx), category, dtype=object))
+    gdf_poi = gpd.GeoDataFrame(
+        {'category': np.concatenate(categories)},
+        geometry=gpd.points_from_xy(np.concatenate(lons), np.concatenate(lats)), crs="EPSG:4326"
+    )
+    return gdf_gempa, gdf_poi, gdf_demografi
+
+
+def load_benchmark_geodata(data_source='auto'):
+    """
+    Data asli jika semua GeoPackage tersedia (atau dipaksa 'repo'), selain itu data sintetis.
+    Mengembalikan (gdf_gempa, gdf_poi, gdf_demografi, nama_sumber).
+    """
+    from siagagempa.resources import load_geodata
+
+    real_available = all(os.path.exists(p) for p in [GD_GEMPA_JABAR_PATH, GD_POI_JABAR_PATH, GD_DEMOGRAFI_JABAR_CLEAN_PATH])
+    if data_source == 'repo' or (data_source == 'auto' and real_available):
+        return (*load_geodata(), 'repo')
+    return (*synthetic_geodata(), 'synthetic')
+
+
+def random_points_in_province(spatial_index, gdf_demografi, n_points, rng):
+    """
+    Titik acak seragam di dalam poligon wilayah (rejection sampling terhadap bounding box).
+    """
+    min_lon, min_lat, max_lon, max_lat = gdf_demografi.total_bounds
+    lats, lons = np.empty(0), np.empty(0)
+    while len(lats) < n_points:
+        batch = max(1000, 2 * (n_points - len(lats)))
+        cand_lon = rng.uniform(min_lon, max_lon, batch)
+        cand_lat = rng.uniform(min_lat, max_lat, batch)
+        inside = spatial_index.locate_kelurahan(spatial_index.points(cand_lon, cand_lat)) >= 0
+        lons = np.concatenate([lons, cand_lon[inside]])
+        lats = np.concatenate([lats, cand_lat[inside]])
+    return lats[:n_points], lons[:n_points]
+
+
+# --- PENGUKURAN ---
+def _max_rss_mb():
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux melaporkan KB, macOS byte
+    return max_rss / (1024 * 1024) if sys.platform == 'darwin' else max_rss / 1024
+
+
+def _latency_stats(samples, items_per_sample=1):
+    samples = np.asarray(samples, dtype=float)
+    return {
+        'n_samples': int(len(samples)),
+        'p50_ms': float(np.percentile(samples, 50) * 1000),
+        'p95_ms': float(np.percentile(samples, 95) * 1000),
+        'mean_ms': float(samples.mean() * 1000),
+        'throughput_per_s': float(items_per_sample * len(samples) / samples.sum()) if samples.sum() > 0 else None,
+    }
+
+
+def _setup(data_source, seed):
+    from siagagempa.resources import load_model, load_density_grid_if_enabled
+    from siagagempa.spatial_index import SpatialIndex
+
+    model, label_encoder, model_expected_features = load_model()
+    gdf_gempa, gdf_poi, gdf_demografi, source_name = load_benchmark_geodata(data_source)
+    # Cache fitur lokasi sengaja tidak dipakai agar yang diukur adalah kerja spasial sebenarnya
+    density_grid = load_density_grid_if_enabled(FEATURE_MODE) if source_name == 'repo' else None
+    spatial_index = SpatialIndex(gdf_gempa, gdf_poi, gdf_demografi, density_grid=density_grid)
+    rng = np.random.default_rng(seed)
+    return {
+        'model': model, 'label_encoder': label_encoder, 'model_expected_features': model_expected_features,
+        'gdf_gempa': gdf_gempa, 'gdf_poi': gdf_poi, 'gdf_demografi': gdf_demografi,
+        'spatial_index': spatial_index, 'rng': rng, 'data_source': source_name,
+    }
+
+
+def _case_load_resources(data_source, seed, **_):
+    from siagagempa.resources import load_model
+    from siagagempa.spatial_index import SpatialIndex
+
+    timings = {}
+    start = time.perf_counter()
+    load_model()
+    timings['load_model_s'] = time.perf_counter() - start
+    start = time.perf_counter()
+    gdf_gempa, gdf_poi, gdf_demografi, source_name = load_benchmark_geodata(data_source)
+    timings['load_geodata_s'] = time.perf_counter() - start
+    start = time.perf_counter()
+    SpatialIndex(gdf_gempa, gdf_poi, gdf_demografi)
+    timings['build_spatial_index_s'] = time.perf_counter() - start
+    timings['total_s'] = sum(timings.values())
+    return {'data_source': source_name, **timings}
+
+
+def _case_single_point(data_source, seed, n_calls=200, **_):
+    from siagagempa.features import predict_vulnerability_for_point, predict_vulnerability
+
+    ctx = _setup(data_source, seed)
+    lats, lons = random_points_in_province(ctx['spatial_index'], ctx['gdf_demografi'], n_calls + 5, ctx['rng'])
+    feature_times, predict_times, total_times = [], [], []
+    for i in range(len(lats)):
+        start = time.perf_counter()
+        X = predict_vulnerability_for_point(
+            lats[i], lons[i], 50, 75, 75, 20, 10, 'Tidak', 'Tidak', 'Tidak', 'Tidak', 'Tidak',
+            ctx['model_expected_features'], ctx['gdf_gempa'], ctx['gdf_poi'], ctx['gdf_demografi'],
+            ctx['spatial_index']
+        )
+        mid = time.perf_counter()
+        predict_vulnerability(X, ctx['model'], ctx['label_encoder'])
+        end = time.perf_counter()
+        # 5 panggilan pertama sebagai pemanasan
+        if i >= 5:
+            feature_times.append(mid - start)
+            predict_times.append(end - mid)
+            total_times.append(end - start)
+    return {
+        'data_source': ctx['data_source'],
+        'model_backend': type(ctx['model']).__name__,
+        'predict_vulnerability_for_point': _latency_stats(feature_times),
+        'predict_vulnerability': _latency_stats(predict_times),
+        'end_to_end': _latency_stats(total_times),
+    }
+
+
+def _case_batch(data_source, seed, size=1000, repeats=5, **_):
+    from siagagempa.features import predict_vulnerability_for_points, predict_vulnerability_batch
+
+    ctx = _setup(data_source, seed)
+    lats, lons = random_points_in_province(ctx['spatial_index'], ctx['gdf_demografi'], size, ctx['rng'])
+    feature_times, predict_times = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        X = predict_vulnerability_for_points(
+            lats, lons, None, ctx['model_expected_features'],
+            ctx['gdf_gempa'], ctx['gdf_poi'], ctx['gdf_demografi'], ctx['spatial_index']
+        )
+        mid = time.perf_counter()
+        predict_vulnerability_batch(X, ctx['model'], ctx['label_encoder'])
+        feature_times.append(mid - start)
+        predict_times.append(time.perf_counter() - mid)
+    total_times = np.add(feature_times, predict_times)
+    return {
+        'data_source': ctx['data_source'],
+        'model_backend': type(ctx['model']).__name__,
+        'size': size,
+        'predict_vulnerability_for_points': _latency_stats(feature_times, size),
+        'predict_vulnerability_batch': _latency_stats(predict_times, size),
+        'end_to_end': _latency_stats(total_times, size),
+    }
+
+
+def _case_result_map(data_source, seed, n_calls=20, **_):
+    from siagagempa.result_map import find_kelurahan_info, build_result_map
+
+    ctx = _setup(data_source, seed)
+    lats, lons = random_points_in_province(ctx['spatial_index'], ctx['gdf_demografi'], n_calls, ctx['rng'])
+    build_times, render_times, html_bytes = [], [], []
+    for lat, lon in zip(lats, lons):
+        start = time.perf_counter()
+        kelurahan_info, _, _, kel_name = find_kelurahan_info(lat, lon, ctx['spatial_index'], ctx['gdf_demografi'])
+        m_results, _, _ = build_result_map(
+            lat, lon, 'Sedang', ctx['spatial_index'], ctx['gdf_gempa'], ctx['gdf_poi'], kelurahan_info, kel_name
+        )
+        mid = time.perf_counter()
+        # Render HTML seperti yang dilakukan st_folium
+        html = m_results.get_root().render()
+        build_times.append(mid - start)
+        render_times.append(time.perf_counter() - mid)
+        html_bytes.append(len(html.encode('utf-8')))
+    return {
+        'data_source': ctx['data_source'],
+        'build_result_map': _latency_stats(build_times),
+        'render_html': _latency_stats(render_times),
+        'html_kb_p50': float(np.percentile(html_bytes, 50) / 1024),
+        'html_kb_max': float(max(html_bytes) / 1024),
+    }
+
+
+CASE_FUNCTIONS = {
+    'load_resources': _case_load_resources,
+    'single_point': _case_single_point,
+    'batch': _case_batch,
+    'result_map': _case_result_map,
+}
+
+
+def _run_case(args):
+    """
+    Dijalankan di proses anak: menjalankan satu kasus dan menambahkan puncak memori.
+    """
+    kind, kwargs = args
+    start = time.perf_counter()
+    result = CASE_FUNCTIONS[kind](**kwargs)
+    result['wall_s'] = time.perf_counter() - start
+    result['peak_rss_mb'] = _max_rss_mb()
+    return result
+
+
+def run_benchmarks(batch_sizes=DEFAULT_BATCH_SIZES, single_calls=200, data_source='auto', seed=42):
+    cases = [('load_resources', 'load_resources', {})]
+    cases.append(('single_point', 'single_point', {'n_calls': single_calls}))
+    for size in batch_sizes:
+        cases.append((f'batch_{size}', 'batch', {'size': size, 'repeats': 5 if size <= 10000 else 2}))
+    cases.append(('result_map', 'result_map', {}))
+
+    results = {}
+    ctx = multiprocessing.get_context('spawn')
+    for name, kind, kwargs in cases:
+        print(f"  - Menjalankan {name}...", flush=True)
+        # Satu proses baru per kasus agar max RSS terukur terpisah
+        with ctx.Pool(1, maxtasksperchild=1) as pool:
+            results[name] = pool.apply(_run_case, ((kind, {'data_source': data_source, 'seed': seed, **kwargs}),))
+
+    return {'meta': _environment_info(data_source, seed), 'cases': results}
+
+
+def _environment_info(data_source, seed):
+    import shapely
+    import sklearn
+    import folium
+
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'feature_mode': FEATURE_MODE,
+        'data_source_requested': data_source,
+        'seed': seed,
+        'versions': {
+            'numpy': np.__version__, 'pandas': pd.__version__, 'geopandas': gpd.__version__,
+            'shapely': shapely.__version__, 'scikit-learn': sklearn.__version__, 'folium': folium.__version__,
+        },
+    }
+
+
+# --- PERBANDINGAN BASELINE ---
+def _flatten_metrics(cases):
+    """
+    {(kasus, metrik): (nilai, lebih_tinggi_lebih_baik)} untuk metrik latensi, throughput, dan memori.
+    """
+    metrics = {}
+    for case, result in cases.items():
+        for key, value in result.items():
+            if isinstance(value, dict) and 'p50_ms' in value:
+                metrics[(case, f'{key}.p50_ms')] = (value['p50_ms'], False)
+                metrics[(case, f'{key}.p95_ms')] = (value['p95_ms'], False)
+                if value.get('throughput_per_s') is not None:
+                    metrics[(case, f'{key}.throughput_per_s')] = (value['throughput_per_s'], True)
+            elif key.endswith('_s') and key != 'wall_s':
+                metrics[(case, key)] = (value, False)
+        if 'peak_rss_mb' in result:
+            metrics[(case, 'peak_rss_mb')] = (result['peak_rss_mb'], False)
+    return metrics
+
+
+def compare_with_baseline(current, baseline, threshold=DEFAULT_REGRESSION_THRESHOLD):
+    """
+    Membandingkan hasil dengan baseline. Mengembalikan daftar baris perbandingan;
+    `regression` True jika metrik memburuk lebih dari `threshold` (relatif).
+    """
+    current_metrics = _flatten_metrics(current['cases'])
+    baseline_metrics = _flatten_metrics(baseline['cases'])
+    rows = []
+    for key, (value, higher_is_better) in current_metrics.items():
+        if key not in baseline_metrics or not baseline_metrics[key][0]:
+            continue
+        base = baseline_metrics[key][0]
+        change = (value - base) / base
+        worse = -change if higher_is_better else change
+        rows.append({
+            'case': key[0], 'metric': key[1], 'baseline': base, 'current': value,
+            'change_pct': change * 100, 'regression': worse > threshold,
+        })
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline prediksi SiagaGempa di luar Streamlit.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_BATCH_SIZES, help="Ukuran batch titik.")
+    parser.add_argument('--single-calls', type=int, default=200, help="Jumlah panggilan untuk kasus satu titik.")
+    parser.add_argument('--data', choices=['auto', 'repo', 'synthetic'], default='auto',
+                        help="Sumber data POI/demografi (auto: sintetis jika GeoPackage tidak ada).")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--output', default='benchmark.json', help="File JSON hasil benchmark.")
+    parser.add_argument('--baseline', help="File JSON baseline untuk dibandingkan.")
+    parser.add_argument('--threshold', type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help="Perubahan relatif yang dianggap regresi (0.2 = 20%%).")
+    parser.add_argument('--fail-on-regression', action='store_true', help="Keluar dengan kode 1 jika ada regresi.")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.sizes, args.single_calls, args.data, args.seed)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Hasil benchmark disimpan di '{args.output}'.")
+
+    for name, result in results['cases'].items():
+        summary = {k: v for k, v in result.items() if isinstance(v, dict) and 'p50_ms' in v}
+        parts = [f"{k}: p50 {v['p50_ms']:.2f} ms, p95 {v['p95_ms']:.2f} ms" for k, v in summary.items()]
+        print(f"{name} (peak {result['peak_rss_mb']:.0f} MB, {result['wall_s']:.1f} dtk)")
+        for part in parts:
+            print(f"    {part}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare_with_baseline(results, baseline, args.threshold)
+        print(f"\nPerbandingan dengan baseline '{args.baseline}':")
+        for row in rows:
+            flag = "  REGRESI" if row['regression'] else ""
+            print(f"  {row['case']:<16} {row['metric']:<50} {row['baseline']:>12.3f} -> {row['current']:>12.3f} "
+                  f"({row['change_pct']:+.1f}%){flag}")
+        n_regressions = sum(row['regression'] for row in rows)
+        print(f"{n_regressions} regresi dengan ambang {args.threshold:.0%}.")
+        if args.fail_on_regression and n_regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
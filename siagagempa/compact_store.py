@@ -0,0 +1,192 @@
+"""
+Representasi kolom yang hemat memori untuk layer POI dan demografi.
+
+GeoDataFrame asli menyimpan objek shapely per baris, string kategori, dan kolom nama bertipe object
+untuk setiap worker. Di sini koordinat disimpan sebagai array float64, kategori POI sebagai kode int8
+dengan tabel kategori, nama wilayah dienkode kamus (pd.Categorical), dan poligon kelurahan hanya
+disimpan sekali (array shapely yang juga dipakai STRtree), tanpa salinan GeoDataFrame.
+"""
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from pyproj import Transformer
+
+from siagagempa.config import DEMOG_FEATURE_COLUMNS
+
+KELURAHAN_NAME_COLUMNS = ['nama_kab', 'nama_kec', 'nama_kel']
+
+# Kolom atribut yang dibaca dari GeoPackage untuk membangun store (selain geometri)
+POI_STORE_COLUMNS = ['category']
+KELURAHAN_STORE_COLUMNS = ['kode_desa_spatial'] + DEMOG_FEATURE_COLUMNS + KELURAHAN_NAME_COLUMNS
+
+
+def _small_int_dtype(n_values):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_values < np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+class PoiStore:
+    """
+    POI sebagai lon/lat float64 dan kode kategori (-1 = tanpa kategori) dengan tabel `categories`.
+    """
+
+    def __init__(self, lon, lat, category_codes=None, categories=None):
+        self.lon = np.asarray(lon, dtype=np.float64)
+        self.lat = np.asarray(lat, dtype=np.float64)
+        self.category_codes = category_codes
+        self.categories = list(categories) if categories is not None else None
+
+    @classmethod
+    def from_geodataframe(cls, gdf):
+        if gdf.crs is not None and gdf.crs != "EPSG:4326":
+            gdf = gdf.to_crs("EPSG:4326")
+        geoms = gdf.geometry.values
+        # Geometri non-titik diwakili oleh titik representatifnya
+        if not (gdf.geom_type == 'Point').all():
+            geoms = shapely.point_on_surface(np.asarray(geoms))
+        lon, lat = shapely.get_x(geoms), shapely.get_y(geoms)
+        if 'category' not in gdf.columns:
+            return cls(lon, lat)
+        category = pd.Categorical(gdf['category'])
+        codes = category.codes.astype(_small_int_dtype(len(category.categories)))
+        return cls(lon, lat, codes, category.categories)
+
+    def __len__(self):
+        return len(self.lon)
+
+    @property
+    def columns(self):
+        return pd.Index((['category'] if self.categories is not None else []) + ['geometry'])
+
+    @property
+    def total_bounds(self):
+        return np.array([self.lon.min(), self.lat.min(), self.lon.max(), self.lat.max()])
+
+    def category_code(self, category):
+        """
+        Kode int untuk satu kategori, atau None jika kategori tidak ada di data.
+        """
+        if self.categories is None or category not in self.categories:
+            return None
+        return self.categories.index(category)
+
+    def category_values(self, idx=slice(None)):
+        """
+        Nama kategori untuk baris `idx` (None jika tidak berkategori).
+        """
+        if self.categories is None:
+            return np.full(len(self.lon[idx]), None, dtype=object)
+        return np.asarray(pd.Categorical.from_codes(self.category_codes[idx], self.categories), dtype=object)
+
+    def frame(self, idx):
+        """
+        GeoDataFrame kecil untuk baris `idx` saja (mis. POI terdekat di peta hasil).
+        """
+        data = {'category': self.category_values(idx)} if self.categories is not None else {}
+        return gpd.GeoDataFrame(data, geometry=shapely.points(self.lon[idx], self.lat[idx]), crs="EPSG:4326")
+
+    def nbytes(self):
+        codes = self.category_codes.nbytes if self.category_codes is not None else 0
+        return self.lon.nbytes + self.lat.nbytes + codes
+
+
+def _point_coords_from_wkb(wkb):
+    """
+    Koordinat x, y dari array WKB titik. Jalur cepat membaca langsung byte WKB Point 2D little-endian
+    (21 byte) tanpa membuat objek shapely; selain itu didekode lewat shapely.
+    """
+    if len(wkb) and all(isinstance(g, bytes) and len(g) == 21 for g in wkb):
+        raw = np.frombuffer(b''.join(wkb), dtype=np.uint8).reshape(-1, 21)
+        if (raw[:, 0] == 1).all() and (raw[:, 1:5] == [1, 0, 0, 0]).all():
+            coords = np.ascontiguousarray(raw[:, 5:21]).view('<f8')
+            return coords[:, 0].copy(), coords[:, 1].copy()
+    geoms = shapely.from_wkb(wkb)
+    geoms = np.where(shapely.get_type_id(geoms) == 0, geoms, shapely.point_on_surface(geoms))
+    return shapely.get_x(geoms), shapely.get_y(geoms)
+
+
+def read_poi_store(path):
+    """
+    Membaca GeoPackage POI langsung menjadi PoiStore (kolom category dan geometri sebagai WKB mentah),
+    sehingga tidak ada GeoDataFrame berisi objek shapely per baris yang sempat dibuat.
+    """
+    try:
+        import pyogrio
+    except ImportError:
+        return PoiStore.from_geodataframe(gpd.read_file(path, columns=POI_STORE_COLUMNS))
+
+    meta, _, wkb, field_data = pyogrio.raw.read(path, columns=POI_STORE_COLUMNS)
+    lon, lat = _point_coords_from_wkb(wkb)
+    crs = meta.get('crs')
+    if crs is not None and crs != "EPSG:4326":
+        lon, lat = Transformer.from_crs(crs, "EPSG:4326", always_xy=True).transform(lon, lat)
+    fields = list(meta['fields'])
+    if 'category' not in fields:
+        return PoiStore(lon, lat)
+    category = pd.Categorical(field_data[fields.index('category')])
+    return PoiStore(lon, lat, category.codes.astype(_small_int_dtype(len(category.categories))), category.categories)
+
+
+class KelurahanStore:
+    """
+    Kelurahan sebagai poligon shapely (EPSG:4326, satu salinan), matriks fitur numerik float64,
+    dan kolom nama yang dienkode kamus.
+    """
+
+    def __init__(self, geoms, values, value_columns, names=None):
+        self.geoms = np.asarray(geoms)
+        self.values = np.asarray(values, dtype=np.float64)
+        self.value_columns = list(value_columns)
+        self.names = names or {}
+        self._value_index = {col: i for i, col in enumerate(self.value_columns)}
+
+    @classmethod
+    def from_geodataframe(cls, gdf):
+        if gdf.crs is not None and gdf.crs != "EPSG:4326":
+            gdf = gdf.to_crs("EPSG:4326")
+        value_columns = [col for col in ['kode_desa_spatial'] + DEMOG_FEATURE_COLUMNS if col in gdf.columns]
+        values = np.column_stack(
+            [pd.to_numeric(gdf[col], errors='coerce').to_numpy(dtype=np.float64) for col in value_columns]
+        ) if value_columns else np.zeros((len(gdf), 0))
+        names = {col: pd.Categorical(gdf[col]) for col in KELURAHAN_NAME_COLUMNS if col in gdf.columns}
+        return cls(gdf.geometry.values, values, value_columns, names)
+
+    def __len__(self):
+        return len(self.geoms)
+
+    @property
+    def columns(self):
+        return pd.Index(self.value_columns + list(self.names) + ['geometry'])
+
+    @property
+    def total_bounds(self):
+        return shapely.total_bounds(self.geoms)
+
+    def column(self, col):
+        """
+        Nilai satu kolom untuk semua kelurahan (array float64 untuk fitur, object untuk nama).
+        """
+        if col in self._value_index:
+            return self.values[:, self._value_index[col]]
+        return np.asarray(self.names[col], dtype=object)
+
+    def frame(self, idx, columns=None):
+        """
+        GeoDataFrame untuk baris `idx` saja, dengan kolom yang diminta (default: nama wilayah).
+        """
+        idx = np.atleast_1d(idx)
+        columns = list(self.names) if columns is None else columns
+        data = {}
+        for col in columns:
+            if col in self._value_index:
+                data[col] = self.values[idx, self._value_index[col]]
+            else:
+                data[col] = np.asarray(self.names[col], dtype=object)[idx]
+        return gpd.GeoDataFrame(data, geometry=self.geoms[idx], crs="EPSG:4326")
+
+    def nbytes(self):
+        names = sum(cat.codes.nbytes + cat.categories.memory_usage(deep=True) for cat in self.names.values())
+        return self.values.nbytes + names
@@ -0,0 +1,105 @@
+import os
+
+# --- DEFINISI LOKASI FILE ---
+DIR_DATA_FILES = "data"
+MODEL_FILENAME = 'random_forest_model.pkl'
+LABEL_ENCODER_FILENAME = 'label_encoder.pkl'
+FEATURE_COLUMNS_FILENAME = 'feature_columns_model.pkl'
+
+GD_GEMPA_JABAR_PATH = os.path.join(DIR_DATA_FILES, 'gdf_gempa_jabar_processed.gpkg')
+GD_POI_JABAR_PATH = os.path.join(DIR_DATA_FILES, 'gdf_poi_jabar_processed.gpkg')
+GD_DEMOGRAFI_JABAR_CLEAN_PATH = os.path.join(DIR_DATA_FILES, 'gdf_demografi_jabar_clean_processed.gpkg')
+
+# --- PARAMETER FITUR ---
+BUFFER_GEMPA_KM = 10
+BUFFER_POI_METER = 500
+
+# CRS metrik yang dipakai untuk semua perhitungan radius (sama seperti notebook)
+METRIC_CRS = "EPSG:3857"
+
+DEMOG_FEATURE_COLUMNS = [
+    'jumlah_penduduk', 'pria', 'wanita', 'jumlah_produktif', 'jumlah_non_produktif',
+    'rasio_lp', 'rasio_produktif_nonproduktif', 'kepadatan_penduduk_kelurahan',
+    'jumlah_penduduk_miskin_kelurahan_estimasi'
+]
+
+# Kategori POI -> nama kolom fitur model (perhatikan slash pada nama kolom)
+POI_CATEGORY_COLUMNS = {
+    'Fasilitas Kesehatan': 'count_poi_fasilitas_kesehatan',
+    'Sekolah': 'count_poi_sekolah',
+    'Pemerintahan/Publik': 'count_poi_pemerintahan/publik',
+    'Fasilitas Sosial/Publik Lain': 'count_poi_fasilitas_sosial/publik_lain',
+    'Bangunan Biasa': 'count_poi_bangunan_biasa'
+}
+
+# --- MODE FITUR RADIUS ---
+# 'exact' : kueri STRtree terhadap setiap titik gempa/POI (default)
+# 'grid'  : agregasi dari grid kepadatan yang dibangun offline (lihat siagagempa.density_grid); lossy, hanya opt-in
+FEATURE_MODE = os.environ.get('SIAGAGEMPA_FEATURE_MODE', 'exact')
+DENSITY_GRID_DIR = os.path.join(DIR_DATA_FILES, 'density_grid')
+
+# --- FITUR GEMPA BERJENDELA WAKTU ---
+# Jendela (tahun terakhir, relatif terhadap gempa terakhir di katalog) untuk jumlah gempa dan magnitudo maksimum
+# dalam BUFFER_GEMPA_KM (lihat siagagempa.seismic_index); ditampilkan di halaman prediksi dan ditulis ke grid
+SEISMIC_WINDOWS_YEARS = [
+    float(years) for years in os.environ.get('SIAGAGEMPA_SEISMIC_WINDOWS_YEARS', '5,20').split(',') if years.strip()
+]
+
+# --- FITUR TETANGGA TERDEKAT ---
+# Jarak ke fasilitas terdekat per kategori POI dan ke K gempa terdekat (lihat siagagempa.nearest_index);
+# bukan fitur model, ditampilkan di halaman prediksi dan ditulis ke grid
+NEAREST_POI_COLUMNS = {
+    'Fasilitas Kesehatan': 'jarak_fasilitas_kesehatan_m',
+    'Sekolah': 'jarak_sekolah_m',
+    'Pemerintahan/Publik': 'jarak_pemerintahan_publik_m',
+}
+NEAREST_GEMPA_K = int(os.environ.get('SIAGAGEMPA_NEAREST_GEMPA_K', 5))
+
+# --- CACHE FITUR LOKASI ---
+# Jumlah desimal koordinat untuk kunci cache (4 ~ 11 m) dan batas entri LRU; 0 entri = cache nonaktif.
+# Opt-in: titik di sel yang sama berbagi fitur, jadi hasilnya bisa sedikit berbeda dari mode exact
+FEATURE_CACHE_PRECISION = int(os.environ.get('SIAGAGEMPA_FEATURE_CACHE_PRECISION', 4))
+FEATURE_CACHE_SIZE = int(os.environ.get('SIAGAGEMPA_FEATURE_CACHE_SIZE', 0))
+# Permintaan dengan titik lebih banyak dari ini (unggahan batch) tidak memakai cache
+FEATURE_CACHE_MAX_BATCH_POINTS = int(os.environ.get('SIAGAGEMPA_FEATURE_CACHE_MAX_BATCH_POINTS', 100))
+
+# --- MODEL TERKOMPILASI ---
+# Random forest dalam bentuk array NumPy (lihat siagagempa.compiled_forest); dipakai otomatis bila masih sesuai dengan .pkl
+COMPILED_MODEL_DIR = os.path.join(DIR_DATA_FILES, 'compiled_model')
+
+# --- PIPELINE FITUR OFFLINE ---
+# Cache tahap-tahap siagagempa.feature_pipeline (gempa, POI, demografi, grid); tahap dilewati jika inputnya tidak berubah
+PIPELINE_CACHE_DIR = os.path.join(DIR_DATA_FILES, 'pipeline_cache')
+
+# --- RINGKASAN WILAYAH ADMINISTRATIF ---
+# Tabel risiko per kelurahan/kecamatan/kabupaten yang dihitung sekali dari grid risiko (lihat siagagempa.admin_rollup)
+ADMIN_ROLLUP_DIR = os.path.join(DIR_DATA_FILES, 'admin_rollup')
+
+# --- BUNDEL DATA ---
+# Model dan layer geografis yang sudah diproses dalam satu folder array .npy (lihat siagagempa.data_bundle);
+# dimuat lebih dulu saat startup bila masih sesuai dengan file sumbernya
+DATA_BUNDLE_DIR = os.path.join(DIR_DATA_FILES, 'bundle')
+
+# --- DIAGNOSTIK ---
+# Baris log JSON per permintaan (set SIAGAGEMPA_METRICS_LOG=0 untuk mematikan)
+METRICS_LOG = os.environ.get('SIAGAGEMPA_METRICS_LOG', '1') != '0'
+# Panel diagnostik tersembunyi di Beranda (?diagnostik=1), hanya aktif jika SIAGAGEMPA_DIAGNOSTICS=1
+DIAGNOSTICS_ENABLED = os.environ.get('SIAGAGEMPA_DIAGNOSTICS', '0') == '1'
+
+# --- LAYANAN HTTP PREDIKSI ---
+# Lihat siagagempa.service: jumlah proses worker, ukuran batch gabungan, jendela penggabungan,
+# dan batas titik yang boleh mengantre sebelum permintaan ditolak (HTTP 503)
+SERVICE_HOST = os.environ.get('SIAGAGEMPA_SERVICE_HOST', '127.0.0.1')
+SERVICE_PORT = int(os.environ.get('SIAGAGEMPA_SERVICE_PORT', 8765))
+SERVICE_WORKERS = int(os.environ.get('SIAGAGEMPA_SERVICE_WORKERS', min(4, os.cpu_count() or 1)))
+SERVICE_MAX_BATCH_POINTS = int(os.environ.get('SIAGAGEMPA_SERVICE_MAX_BATCH_POINTS', 2000))
+SERVICE_COALESCE_MS = float(os.environ.get('SIAGAGEMPA_SERVICE_COALESCE_MS', 5))
+SERVICE_MAX_PENDING_POINTS = int(os.environ.get('SIAGAGEMPA_SERVICE_MAX_PENDING_POINTS', 20000))
+
+# --- PETA HASIL PREDIKSI ---
+# 'vector'  : gempa sebagai satu layer GeoJSON dan POI sebagai satu layer cluster, gaya diatur di browser (default)
+# 'markers' : satu objek folium per titik seperti versi awal
+RESULT_MAP_RENDER_MODE = os.environ.get('SIAGAGEMPA_RESULT_MAP_MODE', 'vector')
+# Batas titik per layer pada mode 'vector' (gempa terbesar / POI terdekat yang dipertahankan)
+RESULT_MAP_MAX_GEMPA = int(os.environ.get('SIAGAGEMPA_RESULT_MAP_MAX_GEMPA', 500))
+RESULT_MAP_MAX_POI = int(os.environ.get('SIAGAGEMPA_RESULT_MAP_MAX_POI', 5000))
@@ -0,0 +1,309 @@
+"""
+Bundel data terproses untuk startup cepat.
+
+Startup biasa membaca tiga GeoPackage lewat GDAL, mengonversi CRS, memproyeksikan POI dan gempa
+ke EPSG:3857, lalu meng-unpickle model, label encoder (yang ikut mengimpor sklearn), dan daftar fitur.
+Bundel menyimpan semua yang dibutuhkan halaman prediksi dalam satu folder:
+
+- meta.json        : versi format, sidik jari file sumber, kolom, kategori, kelas label, dan daftar fitur
+- gempa_*.npy      : kolom atribut gempa (teks sebagai kode kategori), lon/lat, dan x/y EPSG:3857
+- poi_*.npy        : lon/lat, x/y EPSG:3857, dan kode kategori POI (lihat siagagempa.compact_store)
+- kelurahan_*.npy  : poligon sebagai WKB bersambung + offset, matriks fitur demografi, kode nama wilayah
+- model/           : random forest terkompilasi (lihat siagagempa.compiled_forest)
+
+Semua array dimuat dengan memory mapping. STRtree tidak dapat diserialisasi oleh shapely, jadi pohon
+dibangun ulang dari geometri yang sudah terproyeksi (puluhan milidetik). Bundel hanya dipakai jika
+sidik jari semua file sumbernya masih cocok; jika tidak, aplikasi kembali membaca GeoPackage.
+
+Pemakaian:
+    python -m siagagempa.data_bundle build
+    python -m siagagempa.data_bundle verify [--samples 2000]
+"""
+import argparse
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from siagagempa.config import (
+    DATA_BUNDLE_DIR, MODEL_FILENAME, LABEL_ENCODER_FILENAME, FEATURE_COLUMNS_FILENAME,
+    GD_GEMPA_JABAR_PATH, GD_POI_JABAR_PATH, GD_DEMOGRAFI_JABAR_CLEAN_PATH
+)
+from siagagempa.compact_store import PoiStore, KelurahanStore
+from siagagempa.compiled_forest import CompiledForest, compile_forest
+from siagagempa.fingerprint import source_fingerprint
+
+BUNDLE_FORMAT_VERSION = 2
+META_FILENAME = 'meta.json'
+MODEL_SUBDIR = 'model'
+
+MODEL_SOURCE_PATHS = [MODEL_FILENAME, LABEL_ENCODER_FILENAME, FEATURE_COLUMNS_FILENAME]
+GEODATA_SOURCE_PATHS = [GD_GEMPA_JABAR_PATH, GD_POI_JABAR_PATH, GD_DEMOGRAFI_JABAR_CLEAN_PATH]
+
+
+class BundledLabelEncoder:
+    """
+    Pengganti LabelEncoder untuk inferensi (`classes_` dan `inverse_transform`) tanpa mengimpor sklearn.
+    """
+
+    def __init__(self, classes):
+        self.classes_ = np.asarray(classes, dtype=object)
+
+    def inverse_transform(self, codes):
+        codes = np.asarray(codes)
+        if codes.size and (codes.min() < 0 or codes.max() >= len(self.classes_)):
+            raise ValueError(f"Kode label di luar rentang 0..{len(self.classes_) - 1}")
+        return self.classes_[codes.astype(np.int64)]
+
+
+# --- PENYIMPANAN ARRAY ---
+def _save_array(directory, name, array):
+    np.save(os.path.join(directory, f'{name}.npy'), np.ascontiguousarray(array), allow_pickle=False)
+
+
+def _load_array(directory, name):
+    # np.asarray melepas subclass memmap tanpa menyalin data
+    return np.asarray(np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r', allow_pickle=False))
+
+
+def _encode_columns(directory, prefix, df):
+    """
+    Menyimpan setiap kolom DataFrame sebagai .npy: numerik apa adanya, selain itu sebagai kode kategori
+    (-1 = kosong) dengan daftar kategori di meta.
+    """
+    columns = []
+    for i, col in enumerate(df.columns):
+        name = f'{prefix}_col{i}'
+        series = df[col]
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            _save_array(directory, name, series.to_numpy())
+            columns.append({'name': col, 'file': name, 'kind': 'array'})
+        else:
+            category = pd.Categorical(series.astype(object).where(series.notna(), None))
+            _save_array(directory, name, category.codes.astype(np.int32))
+            columns.append({'name': col, 'file': name, 'kind': 'category',
+                            'categories': [str(value) for value in category.categories]})
+    return columns
+
+
+def _decode_columns(directory, columns):
+    data = {}
+    for column in columns:
+        values = _load_array(directory, column['file'])
+        if column['kind'] == 'category':
+            values = np.asarray(pd.Categorical.from_codes(values, column['categories']), dtype=object)
+        data[column['name']] = values
+    return data
+
+
+def _wkb_blob(geoms):
+    """
+    Geometri sebagai satu buffer WKB bersambung dan offset awal/akhir setiap geometri.
+    """
+    wkb = shapely.to_wkb(geoms)
+    offsets = np.zeros(len(wkb) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(g) for g in wkb])
+    return np.frombuffer(b''.join(wkb), dtype=np.uint8), offsets
+
+
+def _geoms_from_wkb_blob(blob, offsets):
+    data = blob.tobytes()
+    return shapely.from_wkb(np.array([data[start:end] for start, end in zip(offsets[:-1], offsets[1:])], dtype=object))
+
+
+# --- PEMBANGUNAN BUNDEL ---
+def _write_bundle(directory):
+    import joblib
+    from siagagempa.resources import load_model, load_compact_geodata
+    from siagagempa.spatial_index import SpatialIndex
+
+    model, label_encoder, model_expected_features = load_model()
+    # Selalu dikompilasi dari .pkl, karena model terkompilasi di COMPILED_MODEL_DIR bisa saja usang
+    compile_forest(joblib.load(MODEL_FILENAME), os.path.join(directory, MODEL_SUBDIR))
+
+    gdf_gempa, poi_store, kelurahan_store = load_compact_geodata()
+    # Koordinat metrik diambil dari SpatialIndex agar identik dengan jalur GeoPackage
+    spatial_index = SpatialIndex(gdf_gempa, poi_store, kelurahan_store)
+
+    geometry_name = gdf_gempa.geometry.name
+    gempa_columns = _encode_columns(directory, 'gempa', pd.DataFrame(gdf_gempa.drop(columns=geometry_name)))
+    for name, values in [('gempa_lon', shapely.get_x(gdf_gempa.geometry.values)),
+                         ('gempa_lat', shapely.get_y(gdf_gempa.geometry.values)),
+                         ('gempa_x', shapely.get_x(spatial_index.gempa_geoms)),
+                         ('gempa_y', shapely.get_y(spatial_index.gempa_geoms)),
+                         ('poi_lon', poi_store.lon), ('poi_lat', poi_store.lat),
+                         ('poi_x', shapely.get_x(spatial_index.poi_geoms)),
+                         ('poi_y', shapely.get_y(spatial_index.poi_geoms)),
+                         ('kelurahan_values', kelurahan_store.values)]:
+        _save_array(directory, name, values)
+    if poi_store.category_codes is not None:
+        _save_array(directory, 'poi_category_codes', poi_store.category_codes)
+    blob, offsets = _wkb_blob(kelurahan_store.geoms)
+    _save_array(directory, 'kelurahan_wkb', blob)
+    _save_array(directory, 'kelurahan_wkb_offsets', offsets)
+    for i, (col, category) in enumerate(kelurahan_store.names.items()):
+        _save_array(directory, f'kelurahan_name{i}', category.codes)
+
+    meta = {
+        'version': BUNDLE_FORMAT_VERSION,
+        'sources': {path: source_fingerprint(path) for path in MODEL_SOURCE_PATHS + GEODATA_SOURCE_PATHS},
+        'model': {
+            'label_classes': [str(label) for label in label_encoder.classes_],
+            'model_expected_features': list(model_expected_features),
+        },
+        'gempa': {'rows': len(gdf_gempa), 'geometry_name': geometry_name, 'columns': gempa_columns},
+        'poi': {'rows': len(poi_store), 'categories': poi_store.categories},
+        'kelurahan': {
+            'rows': len(kelurahan_store),
+            'value_columns': kelurahan_store.value_columns,
+            'names': {col: [str(value) for value in category.categories] for col, category in kelurahan_store.names.items()},
+        },
+    }
+    with open(os.path.join(directory, META_FILENAME), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def build_bundle(out_dir=DATA_BUNDLE_DIR):
+    """
+    Membangun bundel di folder sementara lalu menukarnya dengan `out_dir`. File lama tidak pernah
+    ditimpa di tempat, sehingga proses yang sedang memetakan array bundel lama tetap aman.
+    """
+    out_dir = os.path.abspath(out_dir)
+    parent = os.path.dirname(out_dir)
+    os.makedirs(parent, exist_ok=True)
+    tmp_dir = tempfile.mkdtemp(prefix='.bundle-', dir=parent)
+    try:
+        meta = _write_bundle(tmp_dir)
+        old_dir = None
+        if os.path.exists(out_dir):
+            old_dir = tempfile.mkdtemp(prefix='.bundle-old-', dir=parent)
+            os.replace(out_dir, os.path.join(old_dir, 'bundle'))
+        os.replace(tmp_dir, out_dir)
+        if old_dir:
+            shutil.rmtree(old_dir, ignore_errors=True)
+    finally:
+        if os.path.exists(tmp_dir):
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    return meta
+
+
+# --- PEMUATAN BUNDEL ---
+def _read_meta(directory):
+    meta_path = os.path.join(directory, META_FILENAME)
+    if not os.path.exists(meta_path):
+        return None
+    with open(meta_path) as f:
+        return json.load(f)
+
+
+def bundle_is_current(directory=DATA_BUNDLE_DIR, paths=None):
+    """
+    True jika bundel ada, versinya cocok, dan file sumber `paths` (default: semua) belum berubah.
+    """
+    meta = _read_meta(directory)
+    if meta is None or meta.get('version') != BUNDLE_FORMAT_VERSION:
+        return False
+    sources = meta.get('sources', {})
+    for path in (sources if paths is None else paths):
+        if path not in sources or not os.path.exists(path) or source_fingerprint(path) != sources[path]:
+            return False
+    return True
+
+
+def load_bundle_model(directory=DATA_BUNDLE_DIR):
+    """
+    (model, label_encoder, model_expected_features) dari bundel, tanpa unpickle dan tanpa mengimpor sklearn.
+    """
+    meta = _read_meta(directory)['model']
+    model = CompiledForest.load(os.path.join(directory, MODEL_SUBDIR))
+    return model, BundledLabelEncoder(meta['label_classes']), list(meta['model_expected_features'])
+
+
+def load_bundle_geodata(directory=DATA_BUNDLE_DIR):
+    """
+    (gdf_gempa, PoiStore, KelurahanStore, koordinat metrik) dari bundel. Koordinat metrik berupa dict
+    `gempa_metric_xy`/`poi_metric_xy` yang dapat langsung diteruskan ke SpatialIndex.
+    """
+    meta = _read_meta(directory)
+
+    gempa = meta['gempa']
+    data = _decode_columns(directory, gempa['columns'])
+    geometry = shapely.points(_load_array(directory, 'gempa_lon'), _load_array(directory, 'gempa_lat'))
+    gdf_gempa = gpd.GeoDataFrame(data, geometry=gpd.GeoSeries(geometry, crs="EPSG:4326").rename(gempa['geometry_name']))
+
+    poi = meta['poi']
+    poi_codes = _load_array(directory, 'poi_category_codes') if poi['categories'] is not None else None
+    poi_store = PoiStore(_load_array(directory, 'poi_lon'), _load_array(directory, 'poi_lat'), poi_codes, poi['categories'])
+
+    kelurahan = meta['kelurahan']
+    geoms = _geoms_from_wkb_blob(_load_array(directory, 'kelurahan_wkb'), _load_array(directory, 'kelurahan_wkb_offsets'))
+    names = {
+        col: pd.Categorical.from_codes(_load_array(directory, f'kelurahan_name{i}'), categories)
+        for i, (col, categories) in enumerate(kelurahan['names'].items())
+    }
+    kelurahan_store = KelurahanStore(geoms, _load_array(directory, 'kelurahan_values'), kelurahan['value_columns'], names)
+
+    metric_xy = {
+        'gempa_metric_xy': (_load_array(directory, 'gempa_x'), _load_array(directory, 'gempa_y')),
+        'poi_metric_xy': (_load_array(directory, 'poi_x'), _load_array(directory, 'poi_y')),
+    }
+    return gdf_gempa, poi_store, kelurahan_store, metric_xy
+
+
+def verify(n_samples=2000, seed=42):
+    """
+    Membandingkan fitur dan prediksi dari bundel dengan jalur GeoPackage pada titik acak di Jawa Barat.
+    """
+    import time
+    from siagagempa.resources import load_compact_geodata
+    from siagagempa.spatial_index import SpatialIndex
+    from siagagempa.features import compute_location_features
+
+    start = time.perf_counter()
+    gdf_gempa, poi_store, kelurahan_store = load_compact_geodata()
+    index_gpkg = SpatialIndex(gdf_gempa, poi_store, kelurahan_store)
+    seconds_gpkg = time.perf_counter() - start
+    start = time.perf_counter()
+    gdf_gempa_b, poi_store_b, kelurahan_store_b, metric_xy = load_bundle_geodata()
+    index_bundle = SpatialIndex(gdf_gempa_b, poi_store_b, kelurahan_store_b, **metric_xy)
+    seconds_bundle = time.perf_counter() - start
+
+    rng = np.random.default_rng(seed)
+    minx, miny, maxx, maxy = kelurahan_store.total_bounds
+    lats, lons = rng.uniform(miny, maxy, n_samples), rng.uniform(minx, maxx, n_samples)
+    features_gpkg = compute_location_features(lats, lons, gdf_gempa, poi_store, kelurahan_store, index_gpkg)
+    features_bundle = compute_location_features(lats, lons, gdf_gempa_b, poi_store_b, kelurahan_store_b, index_bundle)
+    return {
+        'n_points': n_samples,
+        'features_identical': all(np.array_equal(features_gpkg[col], features_bundle[col]) for col in features_gpkg),
+        'gempa_identical': bool(pd.DataFrame(gdf_gempa).equals(pd.DataFrame(gdf_gempa_b))),
+        'seconds_geopackage': seconds_gpkg,
+        'seconds_bundle': seconds_bundle,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bangun atau verifikasi bundel data untuk startup cepat.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    build_parser = subparsers.add_parser('build', help="Tulis model dan layer geografis terproses ke folder bundel.")
+    build_parser.add_argument('--out', default=DATA_BUNDLE_DIR)
+    verify_parser = subparsers.add_parser('verify', help="Bandingkan fitur dari bundel dengan dari GeoPackage.")
+    verify_parser.add_argument('--samples', type=int, default=2000)
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        meta = build_bundle(args.out)
+        print(f"Bundel data disimpan di '{args.out}': {meta['gempa']['rows']} gempa, {meta['poi']['rows']} POI, "
+              f"{meta['kelurahan']['rows']} kelurahan.")
+    else:
+        print(json.dumps(verify(args.samples), indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,341 @@
+"""
+Grid kepadatan untuk fitur radius POI dan gempa dalam waktu hampir konstan.
+
+Setiap lapisan dirasterisasi ke grid EPSG:3857 lalu disimpan sebagai prefix-sum per baris
+(summed-area table satu dimensi). Jumlah di dalam lingkaran radius R dihitung dari
+satu rentang kolom per baris grid yang tercakup, sehingga biaya kueri hanya bergantung
+pada R / ukuran sel, bukan pada jumlah titik di dataset. Maksimum magnitudo memakai
+sparse table per baris dengan cara yang sama.
+
+Mode ini bersifat lossy dan hanya aktif jika dipilih (SIAGAGEMPA_FEATURE_MODE=grid); defaultnya tetap
+kueri exact. POI dan gempa dibulatkan ke pusat sel, jadi titik di dekat tepi radius bisa masuk/keluar:
+pada laporan drift 2000 titik hanya ~84% nilai count_poi_bangunan_biasa (~90-97% kategori POI lain) yang
+identik dengan mode exact dan ~99% prediksi yang sama, sementara percepatannya hanya 1,7-2,8x antar-run
+(sekitar 0,1 dtk exact vs 0,04 dtk grid untuk 2000 titik di satu core). Gunakan `report` untuk mengukurnya
+ulang sebelum mengaktifkan mode ini.
+
+Prefix-sum POI disimpan dengan dtype unsigned terkecil yang memuat total POI per baris (biasanya uint16).
+
+Pemakaian:
+    python -m siagagempa.density_grid build [--poi-cell 100] [--gempa-cell 500]
+    python -m siagagempa.density_grid report [--samples 2000] [--output drift.json]
+"""
+import argparse
+import json
+import os
+import time
+
+import numpy as np
+
+from siagagempa.config import (
+    BUFFER_GEMPA_KM, BUFFER_POI_METER, METRIC_CRS, DENSITY_GRID_DIR,
+    GD_GEMPA_JABAR_PATH, GD_POI_JABAR_PATH, POI_CATEGORY_COLUMNS
+)
+from siagagempa.fingerprint import repo_path, source_fingerprint
+
+GRID_FORMAT_VERSION = 1
+META_FILENAME = 'meta.json'
+
+
+class _RowGrid:
+    """
+    Geometri grid (origin, ukuran sel, dimensi) dan perhitungan rentang kolom per baris
+    untuk lingkaran di sekitar titik kueri. Sel dihitung jika pusatnya berada di dalam lingkaran.
+    """
+
+    def __init__(self, x0, y0, cell, nx, ny):
+        self.x0, self.y0, self.cell = float(x0), float(y0), float(cell)
+        self.nx, self.ny = int(nx), int(ny)
+
+    @classmethod
+    def covering(cls, x, y, cell, pad):
+        x0 = np.floor((np.min(x) - pad) / cell) * cell
+        y0 = np.floor((np.min(y) - pad) / cell) * cell
+        nx = int(np.ceil((np.max(x) + pad - x0) / cell)) + 1
+        ny = int(np.ceil((np.max(y) + pad - y0) / cell)) + 1
+        return cls(x0, y0, cell, nx, ny)
+
+    def to_meta(self):
+        return {'x0': self.x0, 'y0': self.y0, 'cell': self.cell, 'nx': self.nx, 'ny': self.ny}
+
+    def cell_index(self, x, y):
+        col = np.floor((np.asarray(x) - self.x0) / self.cell).astype(np.int64)
+        row = np.floor((np.asarray(y) - self.y0) / self.cell).astype(np.int64)
+        return row, col
+
+    def spans(self, x, y, radius):
+        """
+        Untuk N titik mengembalikan array (N, K): baris, kolom awal, kolom akhir, dan mask valid.
+        """
+        x = np.asarray(x, dtype=float)[:, None]
+        y = np.asarray(y, dtype=float)[:, None]
+        k = int(np.ceil(radius / self.cell)) + 1
+        row_center, _ = self.cell_index(x[:, 0], y[:, 0])
+        rows = row_center[:, None] + np.arange(-k, k + 1)[None, :]
+        dy = self.y0 + (rows + 0.5) * self.cell - y
+        half = np.sqrt(np.clip(radius ** 2 - dy ** 2, 0.0, None))
+        lo = np.ceil((x - half - self.x0) / self.cell - 0.5).astype(np.int64)
+        hi = np.floor((x + half - self.x0) / self.cell - 0.5).astype(np.int64)
+        valid = (np.abs(dy) <= radius) & (rows >= 0) & (rows < self.ny) & (lo <= hi) & (hi >= 0) & (lo < self.nx)
+        rows = np.clip(rows, 0, self.ny - 1)
+        lo = np.clip(lo, 0, self.nx - 1)
+        hi = np.clip(hi, 0, self.nx - 1)
+        return rows, lo, hi, valid
+
+
+def _row_prefix_sum(raster):
+    """
+    Prefix-sum sepanjang sumbu kolom dengan kolom nol di depan: P[..., j] = sum(raster[..., :j]).
+    """
+    pad = [(0, 0)] * (raster.ndim - 1) + [(1, 0)]
+    return np.cumsum(np.pad(raster, pad), axis=-1)
+
+
+def _row_sparse_max(raster):
+    """
+    Sparse table per baris: S[l, r, j] = max(raster[r, j : j + 2**l]).
+    """
+    nx = raster.shape[1]
+    levels = max(1, int(np.floor(np.log2(nx))) + 1)
+    table = np.full((levels,) + raster.shape, -np.inf)
+    table[0] = raster
+    for level in range(1, levels):
+        step = 1 << (level - 1)
+        table[level, :, :nx - step] = np.maximum(table[level - 1, :, :nx - step], table[level - 1, :, step:])
+    return table
+
+
+def _smallest_uint_dtype(max_value):
+    for dtype in (np.uint8, np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+def _range_sum(prefix, rows, lo, hi, valid):
+    upper, lower = prefix[..., rows, hi + 1], prefix[..., rows, lo]
+    if prefix.dtype.kind == 'u':
+        # Prefix POI bertipe unsigned kecil: selisih dihitung di int64 agar tidak wrap pada span tidak valid
+        upper, lower = upper.astype(np.int64), lower.astype(np.int64)
+    values = upper - lower
+    return np.where(valid, values, 0).sum(axis=-1)
+
+
+class DensityGrid:
+    """
+    Grid kepadatan yang sudah dibangun, dimuat sebagai array memory-mapped.
+    """
+
+    def __init__(self, meta, poi_prefix, gempa_count_prefix, gempa_depth_prefix, gempa_mag_table):
+        self.meta = meta
+        self.poi_grid = _RowGrid(**meta['poi_grid'])
+        self.gempa_grid = _RowGrid(**meta['gempa_grid'])
+        self.poi_columns = meta['poi_columns']
+        self.poi_prefix = poi_prefix
+        self.gempa_count_prefix = gempa_count_prefix
+        self.gempa_depth_prefix = gempa_depth_prefix
+        self.gempa_mag_table = gempa_mag_table
+
+    @classmethod
+    def load(cls, directory=DENSITY_GRID_DIR):
+        directory = repo_path(directory)
+        with open(os.path.join(directory, META_FILENAME)) as f:
+            meta = json.load(f)
+        arrays = {
+            name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')
+            for name in ['poi_prefix', 'gempa_count_prefix', 'gempa_depth_prefix', 'gempa_mag_table']
+        }
+        return cls(meta, **arrays)
+
+    def poi_counts(self, x, y, radius_m=BUFFER_POI_METER):
+        """
+        Jumlah POI per kolom fitur di dalam radius, untuk N titik (koordinat EPSG:3857).
+        """
+        rows, lo, hi, valid = self.poi_grid.spans(x, y, radius_m)
+        counts = {}
+        for i, col in enumerate(self.poi_columns):
+            counts[col] = _range_sum(self.poi_prefix[i], rows, lo, hi, valid).astype(np.int64)
+        return counts
+
+    def gempa_stats(self, x, y, radius_m=BUFFER_GEMPA_KM * 1000):
+        """
+        (count_gempa, max_mag, avg_depth) di dalam radius, untuk N titik (koordinat EPSG:3857).
+        """
+        rows, lo, hi, valid = self.gempa_grid.spans(x, y, radius_m)
+        count = np.rint(_range_sum(self.gempa_count_prefix, rows, lo, hi, valid)).astype(np.int64)
+        depth_sum = _range_sum(self.gempa_depth_prefix, rows, lo, hi, valid)
+
+        length = hi - lo + 1
+        level = np.floor(np.log2(np.maximum(length, 1))).astype(np.int64)
+        right = hi - (1 << level) + 1
+        table = self.gempa_mag_table
+        span_max = np.maximum(table[level, rows, lo], table[level, rows, right])
+        max_mag = np.where(valid, span_max, -np.inf).max(axis=1)
+
+        has_gempa = count > 0
+        max_mag = np.where(has_gempa, max_mag, 0.0).astype(float)
+        avg_depth = np.zeros(len(count))
+        avg_depth[has_gempa] = depth_sum[has_gempa] / count[has_gempa]
+        return count, max_mag, avg_depth
+
+
+def build_density_grid(gdf_gempa, gdf_poi, out_dir=DENSITY_GRID_DIR, poi_cell_m=100.0, gempa_cell_m=500.0,
+                       sources=None):
+    """
+    Merasterisasi POI per kategori dan gempa (jumlah, total kedalaman, magnitudo maksimum)
+    ke grid EPSG:3857, lalu menyimpan prefix-sum/sparse table sebagai file .npy.
+    `out_dir` relatif diukur dari folder repo, seperti path di `sources`.
+    """
+    out_dir = repo_path(out_dir)
+    os.makedirs(out_dir, exist_ok=True)
+    pad = max(BUFFER_POI_METER, BUFFER_GEMPA_KM * 1000)
+
+    # --- POI per kategori ---
+    poi_proj = gdf_poi.geometry.to_crs(METRIC_CRS)
+    poi_x, poi_y = poi_proj.x.to_numpy(), poi_proj.y.to_numpy()
+    poi_grid = _RowGrid.covering(poi_x, poi_y, poi_cell_m, BUFFER_POI_METER)
+    poi_columns = list(POI_CATEGORY_COLUMNS.values())
+    row, col = poi_grid.cell_index(poi_x, poi_y)
+    categories = gdf_poi['category'].to_numpy() if 'category' in gdf_poi.columns else np.array([None] * len(gdf_poi))
+    # Nilai terbesar prefix-sum = jumlah POI terbanyak dalam satu baris grid untuk satu kategori
+    masks = [categories == category for category in POI_CATEGORY_COLUMNS]
+    max_row_total = max((np.bincount(row[mask], minlength=poi_grid.ny).max() for mask in masks if mask.any()), default=0)
+    poi_prefix = np.zeros((len(poi_columns), poi_grid.ny, poi_grid.nx + 1), dtype=_smallest_uint_dtype(max_row_total))
+    for i, mask in enumerate(masks):
+        raster = np.zeros((poi_grid.ny, poi_grid.nx), dtype=np.int64)
+        np.add.at(raster, (row[mask], col[mask]), 1)
+        poi_prefix[i] = _row_prefix_sum(raster)
+
+    # --- Gempa ---
+    gempa_proj = gdf_gempa.geometry.to_crs(METRIC_CRS)
+    gempa_x, gempa_y = gempa_proj.x.to_numpy(), gempa_proj.y.to_numpy()
+    gempa_grid = _RowGrid.covering(gempa_x, gempa_y, gempa_cell_m, pad)
+    row, col = gempa_grid.cell_index(gempa_x, gempa_y)
+    count = np.zeros((gempa_grid.ny, gempa_grid.nx))
+    depth = np.zeros((gempa_grid.ny, gempa_grid.nx))
+    mag = np.full((gempa_grid.ny, gempa_grid.nx), -np.inf)
+    np.add.at(count, (row, col), 1)
+    np.add.at(depth, (row, col), gdf_gempa['depth'].to_numpy(dtype=float))
+    np.maximum.at(mag, (row, col), gdf_gempa['mag'].to_numpy(dtype=float))
+
+    arrays = {
+        'poi_prefix': poi_prefix,
+        'gempa_count_prefix': _row_prefix_sum(count),
+        'gempa_depth_prefix': _row_prefix_sum(depth),
+        'gempa_mag_table': _row_sparse_max(mag),
+    }
+    for name, array in arrays.items():
+        np.save(os.path.join(out_dir, f'{name}.npy'), array)
+
+    meta = {
+        'version': GRID_FORMAT_VERSION,
+        'crs': METRIC_CRS,
+        'poi_grid': poi_grid.to_meta(),
+        'gempa_grid': gempa_grid.to_meta(),
+        'poi_columns': poi_columns,
+        'sources': sources or {},
+    }
+    with open(os.path.join(out_dir, META_FILENAME), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def density_grid_is_current(directory=DENSITY_GRID_DIR):
+    """
+    True jika grid ada, versinya cocok, dan file GeoPackage sumbernya belum berubah.
+    Path relatif diukur dari folder repo, jadi hasilnya sama dari direktori kerja mana pun.
+    """
+    meta_path = os.path.join(repo_path(directory), META_FILENAME)
+    if not os.path.exists(meta_path):
+        return False
+    with open(meta_path) as f:
+        meta = json.load(f)
+    if meta.get('version') != GRID_FORMAT_VERSION:
+        return False
+    for path, fingerprint in meta.get('sources', {}).items():
+        path = repo_path(path)
+        if not os.path.exists(path) or source_fingerprint(path) != fingerprint:
+            return False
+    return True
+
+
+def drift_report(n_samples=2000, seed=42):
+    """
+    Membandingkan fitur mode grid dengan mode exact pada titik acak di Jawa Barat
+    (separuh seragam di seluruh provinsi, separuh di sekitar lokasi POI yang padat).
+    """
+    from siagagempa.resources import load_resources, load_density_grid_if_enabled
+    from siagagempa.features import predict_vulnerability_for_points
+
+    model, _, model_expected_features, gdf_gempa, gdf_poi, gdf_demografi, spatial_index = load_resources('exact')
+    density_grid = load_density_grid_if_enabled('grid')
+    if density_grid is None:
+        raise SystemExit("Grid kepadatan belum dibangun atau usang. Jalankan: python -m siagagempa.density_grid build")
+
+    rng = np.random.default_rng(seed)
+    min_lon, min_lat, max_lon, max_lat = gdf_demografi.total_bounds
+    n_uniform = n_samples // 2
+    poi_sample = rng.integers(0, len(gdf_poi), n_samples - n_uniform)
+    lons = np.concatenate([rng.uniform(min_lon, max_lon, n_uniform), gdf_poi.lon[poi_sample] + rng.normal(0, 0.002, len(poi_sample))])
+    lats = np.concatenate([rng.uniform(min_lat, max_lat, n_uniform), gdf_poi.lat[poi_sample] + rng.normal(0, 0.002, len(poi_sample))])
+
+    args = (lats, lons, None, model_expected_features, gdf_gempa, gdf_poi, gdf_demografi)
+    start = time.perf_counter()
+    X_exact = predict_vulnerability_for_points(*args, spatial_index=spatial_index)
+    time_exact = time.perf_counter() - start
+    spatial_index.density_grid = density_grid
+    start = time.perf_counter()
+    X_grid = predict_vulnerability_for_points(*args, spatial_index=spatial_index)
+    time_grid = time.perf_counter() - start
+    spatial_index.density_grid = None
+
+    features = {}
+    for col in ['count_gempa', 'max_mag', 'avg_depth'] + list(POI_CATEGORY_COLUMNS.values()):
+        diff = np.abs(X_grid[col].to_numpy(dtype=float) - X_exact[col].to_numpy(dtype=float))
+        features[col] = {
+            'share_exact_match': float(np.mean(diff < 1e-9)),
+            'mean_abs_error': float(diff.mean()),
+            'p95_abs_error': float(np.percentile(diff, 95)),
+            'max_abs_error': float(diff.max()),
+        }
+    return {
+        'n_samples': int(n_samples),
+        'grid': {k: density_grid.meta[k] for k in ['poi_grid', 'gempa_grid']},
+        'prediction_agreement': float(np.mean(model.predict(X_grid) == model.predict(X_exact))),
+        'seconds_exact': time_exact,
+        'seconds_grid': time_grid,
+        'features': features,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bangun dan evaluasi grid kepadatan fitur POI/gempa.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help="Bangun grid dari GeoPackage POI dan gempa.")
+    build_parser.add_argument('--poi-cell', type=float, default=100.0, help="Ukuran sel grid POI (meter EPSG:3857).")
+    build_parser.add_argument('--gempa-cell', type=float, default=500.0, help="Ukuran sel grid gempa (meter EPSG:3857).")
+    build_parser.add_argument('--out', default=DENSITY_GRID_DIR)
+
+    report_parser = subparsers.add_parser('report', help="Laporan selisih fitur mode grid vs exact.")
+    report_parser.add_argument('--samples', type=int, default=2000)
+    report_parser.add_argument('--output', help="Simpan laporan sebagai JSON.")
+
+    args = parser.parse_args()
+    if args.command == 'build':
+        from siagagempa.resources import load_geodata
+        gdf_gempa, gdf_poi, _ = load_geodata()
+        sources = {path: source_fingerprint(repo_path(path)) for path in [GD_GEMPA_JABAR_PATH, GD_POI_JABAR_PATH]}
+        meta = build_density_grid(gdf_gempa, gdf_poi, args.out, args.poi_cell, args.gempa_cell, sources)
+        print(f"Grid kepadatan disimpan di '{args.out}': POI {meta['poi_grid']['ny']}x{meta['poi_grid']['nx']} sel, "
+              f"gempa {meta['gempa_grid']['ny']}x{meta['gempa_grid']['nx']} sel.")
+    else:
+        report = drift_report(args.samples)
+        print(json.dumps(report, indent=2))
+        if args.output:
+            with open(args.output, 'w') as f:
+                json.dump(report, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,39 @@
+"""
+Panel diagnostik tersembunyi: metrik per tahap, permintaan terbaru, dan info cache.
+Ditampilkan dari Beranda dengan ?diagnostik=1 jika SIAGAGEMPA_DIAGNOSTICS=1.
+"""
+import pandas as pd
+import streamlit as st
+
+from siagagempa import metrics
+
+
+def render_diagnostics():
+    st.title("🩺 Diagnostik SiagaGempa")
+    st.caption("Metrik di dalam proses server ini sejak dijalankan (atau sejak direset).")
+
+    if st.button("Reset Metrik"):
+        metrics.REGISTRY.reset()
+
+    rows = metrics.REGISTRY.snapshot()
+    st.subheader("Waktu per Tahap")
+    if rows:
+        df = pd.DataFrame(rows).set_index('stage')
+        st.dataframe(df.round(3), use_container_width=True)
+    else:
+        st.info("Belum ada metrik. Jalankan prediksi terlebih dahulu.")
+
+    info = metrics.REGISTRY.info()
+    if info:
+        st.subheader("Info Komponen")
+        for name, values in info.items():
+            st.markdown(f"**{name}**")
+            st.json(values)
+
+    st.subheader("Permintaan Terbaru")
+    requests = metrics.REGISTRY.recent_requests()
+    if not requests:
+        st.info("Belum ada permintaan tercatat.")
+    for trace in reversed(requests):
+        with st.expander(f"{trace['ts']} · {trace['request']} · {trace['total_ms']:.1f} ms"):
+            st.dataframe(pd.DataFrame(trace['stages']), use_container_width=True)
@@ -0,0 +1,137 @@
+"""
+Penjelasan prediksi dari jalur keputusan random forest.
+
+Untuk setiap baris, kontribusi fitur dihitung dengan menjumlahkan perubahan probabilitas kelas di
+setiap split yang dilalui (lihat CompiledForest.contributions), sehingga
+peluang dasar + jumlah kontribusi = peluang yang diprediksi. Perhitungan tervektorisasi atas pohon
+dan baris, jadi dipakai baik untuk satu titik di halaman prediksi maupun untuk batch/grid.
+"""
+import weakref
+
+import numpy as np
+import pandas as pd
+
+from siagagempa.compiled_forest import CompiledForest
+from siagagempa import metrics
+
+# Nama fitur model -> label yang ditampilkan ke pengguna
+FEATURE_LABELS = {
+    'jumlah_penduduk': 'Jumlah penduduk kelurahan',
+    'pria': 'Jumlah penduduk laki-laki',
+    'wanita': 'Jumlah penduduk perempuan',
+    'jumlah_produktif': 'Penduduk usia produktif',
+    'jumlah_non_produktif': 'Penduduk usia non-produktif',
+    'rasio_lp': 'Rasio laki-laki/perempuan',
+    'rasio_produktif_nonproduktif': 'Rasio produktif/non-produktif',
+    'kepadatan_penduduk_kelurahan': 'Kepadatan penduduk kelurahan',
+    'jumlah_penduduk_miskin_kelurahan_estimasi': 'Estimasi penduduk miskin',
+    'count_gempa': 'Jumlah gempa dalam radius',
+    'max_mag': 'Magnitudo gempa terbesar',
+    'avg_depth': 'Rata-rata kedalaman gempa',
+    'count_poi_fasilitas_kesehatan': 'Fasilitas kesehatan di sekitar',
+    'count_poi_sekolah': 'Sekolah di sekitar',
+    'count_poi_pemerintahan/publik': 'Kantor pemerintahan/publik di sekitar',
+    'count_poi_fasilitas_sosial/publik_lain': 'Fasilitas sosial lain di sekitar',
+    'count_poi_bangunan_biasa': 'Bangunan biasa di sekitar',
+    'user_input_jumlah_kk': 'Jumlah KK (input)',
+    'user_input_rasio_lp': 'Rasio laki-laki/perempuan (input)',
+    'user_ada_rs': 'Ada rumah sakit/klinik (input)',
+    'user_ada_sekolah': 'Ada sekolah (input)',
+    'user_ada_pemerintahan': 'Ada kantor pemerintahan (input)',
+    'user_ada_bangunan_biasa': 'Ada bangunan biasa (input)',
+    'user_ada_fasos_lain': 'Ada fasilitas sosial lain (input)',
+}
+
+# Model .pkl yang sudah dikompilasi ke array di memori, agar tidak diulang setiap prediksi
+_COMPILED_ESTIMATORS = weakref.WeakKeyDictionary()
+
+
+def explainable_forest(model):
+    """
+    CompiledForest untuk `model`: model itu sendiri, atau hasil kompilasi di memori dari RandomForestClassifier.
+    """
+    if isinstance(model, CompiledForest):
+        return model
+    forest = _COMPILED_ESTIMATORS.get(model)
+    if forest is None:
+        forest = _COMPILED_ESTIMATORS[model] = CompiledForest.from_estimator(model)
+    return forest
+
+
+def feature_label(feature):
+    return FEATURE_LABELS.get(feature, feature)
+
+
+class Explanation:
+    """
+    Hasil `explain_predictions`: label prediksi, peluang kelas tersebut, peluang dasar (rata-rata data latih),
+    dan kontribusi tiap fitur terhadap peluang kelas yang diprediksi (DataFrame n_baris x n_fitur).
+    """
+
+    def __init__(self, labels, probability, base, contributions, values):
+        self.labels = labels
+        self.probability = probability
+        self.base = base
+        self.contributions = contributions
+        self.values = values
+
+    def __len__(self):
+        return len(self.labels)
+
+    def top_drivers(self, i=0, top_n=5):
+        """
+        Fitur dengan kontribusi absolut terbesar untuk baris ke-`i`, sebagai DataFrame siap tampil.
+        """
+        row = self.contributions.iloc[i]
+        order = row.abs().sort_values(ascending=False, kind='stable').index[:top_n]
+        return pd.DataFrame({
+            'fitur': order,
+            'faktor': [feature_label(f) for f in order],
+            'nilai': self.values.iloc[i][order].to_numpy(),
+            'kontribusi': row[order].to_numpy(),
+        })
+
+    def summary(self, top_n=3):
+        """
+        Ringkasan teks faktor pendorong utama per baris (kontribusi positif terbesar), untuk kolom hasil batch.
+        """
+        contrib = self.contributions.to_numpy()
+        if contrib.size == 0:
+            return pd.Series([], dtype=object, index=self.contributions.index)
+        top_n = min(top_n, contrib.shape[1])
+        top = np.argsort(-contrib, axis=1, kind='stable')[:, :top_n]
+        top_values = np.take_along_axis(contrib, top, axis=1)
+        labels = np.array([feature_label(f) for f in self.contributions.columns], dtype=object)
+        # Nilai sudah terurut menurun, jadi kontribusi positif selalu berupa awalan; teks disusun per peringkat
+        texts = np.full(len(contrib), '', dtype=object)
+        for rank in range(top_n):
+            values = top_values[:, rank]
+            part = labels[top[:, rank]] + ' (+' + np.char.mod('%.1f', values * 100).astype(object) + ')'
+            separator = '; ' if rank else ''
+            texts = np.where(values > 0, texts + separator + part, texts)
+        return pd.Series(texts, index=self.contributions.index, dtype=object)
+
+
+def explain_predictions(X, model, label_encoder):
+    """
+    Menghitung kontribusi fitur untuk setiap baris X (sudah dalam format fitur model).
+    """
+    forest = explainable_forest(model)
+    with metrics.stage('model.explain', rows=len(X)):
+        bias, contrib = forest.contributions(X)
+        proba = bias + contrib.sum(axis=1)
+        # Dibulatkan agar seri (mis. 0.5/0.5) diputus ke kelas pertama seperti predict sklearn,
+        # bukan oleh selisih pembulatan penjumlahan kontribusi
+        predicted = np.argmax(np.round(proba, 12), axis=1)
+        rows = np.arange(len(X))
+        index = X.index if hasattr(X, 'index') else pd.RangeIndex(len(X))
+        features = list(forest.feature_names_in_)
+        values = X[features] if hasattr(X, 'columns') else pd.DataFrame(np.asarray(X), columns=features)
+        labels = label_encoder.inverse_transform(forest.classes_[predicted]) if len(X) else np.array([], dtype=object)
+        return Explanation(
+            labels=np.asarray(labels, dtype=object),
+            probability=proba[rows, predicted],
+            base=bias[predicted],
+            contributions=pd.DataFrame(contrib[rows, :, predicted], index=index, columns=features),
+            values=values.set_axis(index),
+        )
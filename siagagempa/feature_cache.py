@@ -0,0 +1,131 @@
+"""
+Cache fitur lokasi (demografi, gempa, POI) per koordinat yang dikuantisasi.
+
+Fitur yang hanya bergantung pada lokasi dihitung sekali per sel koordinat (mis. 4 desimal
+~ 11 m) lalu disimpan dalam LRU yang dipakai bersama oleh semua sesi di satu proses.
+Input pengguna (KK, jenis kelamin, usia, konfirmasi fasilitas) digabung setelahnya, sehingga
+klik berulang/berdekatan tidak perlu melakukan kueri spasial lagi. Cache dikosongkan
+otomatis jika file GeoPackage sumbernya berubah.
+
+Fitur yang belum ada dihitung pada koordinat asli titik pertama yang jatuh di sel tersebut; koordinat
+terkuantisasi hanya dipakai sebagai kunci. Titik lain di sel yang sama memakai fitur titik itu, sehingga
+hasil bisa berbeda dari mode exact untuk titik di dekat batas buffer. Karena itu cache nonaktif secara
+default (SIAGAGEMPA_FEATURE_CACHE_SIZE=0). Permintaan dengan lebih dari `max_batch_points` titik (unggahan
+batch) tidak melewati LRU agar tidak menggusur entri klik tunggal yang sering dipakai.
+"""
+import os
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from siagagempa.fingerprint import source_fingerprint
+
+
+class LocationFeatureCache:
+    """
+    LRU berbatas ukuran dengan kunci (namespace, lat, lon) terkuantisasi dan penghitung hit/miss.
+    """
+
+    def __init__(self, precision=4, max_entries=20000, source_paths=(), max_batch_points=100):
+        self.precision = int(precision)
+        self.max_entries = int(max_entries)
+        self.max_batch_points = int(max_batch_points)
+        self.source_paths = list(source_paths)
+        self.columns = None
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self.bypassed = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._fingerprints = self._current_fingerprints()
+
+    def _current_fingerprints(self):
+        return {path: source_fingerprint(path) if os.path.exists(path) else None for path in self.source_paths}
+
+    def _check_sources(self):
+        """
+        Mengosongkan cache jika ukuran/waktu modifikasi salah satu file sumber berubah.
+        """
+        fingerprints = self._current_fingerprints()
+        if fingerprints != self._fingerprints:
+            with self._lock:
+                self._entries.clear()
+                self._fingerprints = fingerprints
+                self.invalidations += 1
+
+    def quantize(self, lats, lons):
+        return np.round(np.asarray(lats, dtype=float), self.precision), np.round(np.asarray(lons, dtype=float), self.precision)
+
+    def get_or_compute(self, lats, lons, compute, namespace=''):
+        """
+        Mengembalikan fitur lokasi {kolom: array} untuk setiap titik. Kunci yang belum ada
+        dihitung sekaligus dengan `compute(lats, lons)` pada koordinat asli titik pertama per kunci.
+        Lebih dari `max_batch_points` titik langsung dihitung dengan `compute` tanpa menyentuh LRU.
+        """
+        lats, lons = np.asarray(lats, dtype=float), np.asarray(lons, dtype=float)
+        if len(lats) == 0:
+            return compute(np.zeros(0), np.zeros(0))
+        if len(lats) > self.max_batch_points:
+            with self._lock:
+                self.bypassed += len(lats)
+            return compute(lats, lons)
+        self._check_sources()
+        q_lats, q_lons = self.quantize(lats, lons)
+        keys = [(namespace, lat, lon) for lat, lon in zip(q_lats.tolist(), q_lons.tolist())]
+        # Indeks titik pertama per kunci, koordinat aslinya dipakai untuk menghitung fitur
+        first_index = {}
+        for i, key in enumerate(keys):
+            first_index.setdefault(key, i)
+        unique_keys = list(first_index)
+
+        rows = {}
+        with self._lock:
+            for key in unique_keys:
+                row = self._entries.get(key)
+                if row is not None:
+                    self._entries.move_to_end(key)
+                    rows[key] = row
+            self.hits += len(rows)
+            self.misses += len(unique_keys) - len(rows)
+
+        missing = [key for key in unique_keys if key not in rows]
+        if missing:
+            missing_index = np.array([first_index[key] for key in missing])
+            computed = compute(lats[missing_index], lons[missing_index])
+            columns = list(computed.keys())
+            matrix = np.column_stack([np.asarray(computed[col], dtype=float) for col in columns])
+            with self._lock:
+                self.columns = columns
+                for key, row in zip(missing, matrix):
+                    rows[key] = row
+                    if self.max_entries > 0:
+                        self._entries[key] = row
+                        self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+
+        matrix = np.vstack([rows[key] for key in keys])
+        return {col: matrix[:, j] for j, col in enumerate(self.columns)}
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'precision': self.precision,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations,
+            'max_batch_points': self.max_batch_points,
+            'bypassed_points': self.bypassed,
+        }
@@ -0,0 +1,453 @@
+"""
+Pipeline fitur offline yang menggantikan Fase 1.2-1.3 notebook (persiapan data, pembentukan grid,
+dan agregasi spasial per sel), dari file sumber mentah hingga file yang dimuat aplikasi.
+
+    python -m siagagempa.feature_pipeline \\
+        --gempa 2004-2008.csv 2009-2013.csv 2014-2018.csv 2019-2024.csv \\
+        --poi poi_indonesia.geojson --demografi demografi_jawabarat.gpkg --batas batas_jabar.geojson
+
+Tahap-tahapnya:
+1. gempa     : CSV katalog USGS dibersihkan (lihat siagagempa.ingest_gempa.read_catalog) lalu difilter
+               ke batas Jawa Barat.
+2. poi       : file POI nasional dibaca per batch dengan filter bbox Jawa Barat (tanpa memuat seluruh file),
+               dikategorikan seperti notebook, lalu difilter ke batas provinsi. Pembacaan per batch
+               membutuhkan pyogrio dan pyarrow (keduanya ada di requirements.txt); tanpa pyarrow file
+               dibaca sekaligus dengan filter bbox yang sama sehingga memori puncaknya jauh lebih besar.
+3. demografi : fitur demografi, estimasi penduduk miskin per kelurahan, dan nama wilayah.
+4. grid      : grid GRID_SIZE_DEGREE dibagi menjadi tile yang fiturnya dihitung paralel di process pool
+               (lihat siagagempa.grid), lalu sel yang semua fiturnya nol dibuang. Selain fitur model, setiap
+               sel mendapat fitur gempa berjendela waktu (count_gempa_<N>th, max_mag_<N>th, lihat
+               siagagempa.seismic_index) untuk SEISMIC_WINDOWS_YEARS, serta jarak dari titik tengah sel ke
+               fasilitas kesehatan/sekolah/pemerintahan terdekat dan ringkasan NEAREST_GEMPA_K gempa terdekat
+               (lihat siagagempa.nearest_index).
+
+Setiap tahap disimpan di PIPELINE_CACHE_DIR bersama kunci dari sidik jari file input, parameter,
+dan kunci tahap sebelumnya; menjalankan ulang hanya menghitung tahap yang inputnya berubah.
+Hasil akhirnya disalin secara atomik ke final_grid_data_processed.gpkg, ketiga GeoPackage *_processed
+yang dimuat aplikasi, dan feature_columns_model.pkl. Setelah grid berubah, tile peta risiko
+(siagagempa.risk_tiles) dibangun ulang dari grid tersebut; tahap ini dilewati jika model belum tersedia.
+"""
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from pyproj import Transformer
+
+from siagagempa.config import (
+    DIR_DATA_FILES, PIPELINE_CACHE_DIR, FEATURE_COLUMNS_FILENAME, DEMOG_FEATURE_COLUMNS, SEISMIC_WINDOWS_YEARS,
+    NEAREST_GEMPA_K,
+    GD_GEMPA_JABAR_PATH, GD_POI_JABAR_PATH, GD_DEMOGRAFI_JABAR_CLEAN_PATH
+)
+from siagagempa.grid import (
+    GRID_SIZE_DEGREE, GRID_FEATURE_COLUMNS, USER_PLACEHOLDER_FEATURES, GridSpec, cell_polygons,
+    compute_cell_features, compute_cell_window_features, compute_cell_nearest_features, drop_empty_cells
+)
+from siagagempa.compact_store import KELURAHAN_NAME_COLUMNS
+from siagagempa.fingerprint import source_fingerprint
+from siagagempa.ingest_gempa import read_catalog, _replace_atomic
+from siagagempa.risk_tiles import RISK_TILES_DIR, build_tiles, load_risk_grid, tiles_built_from
+
+PIPELINE_FORMAT_VERSION = 1
+MANIFEST_FILENAME = 'manifest.json'
+FINAL_GRID_PATH = os.path.join(DIR_DATA_FILES, 'final_grid_data_processed.gpkg')
+
+# Kolom POI nasional yang dibaca (selain geometri) dan jumlah fitur per batch saat streaming
+POI_SOURCE_COLUMNS = ['amenity', 'name']
+POI_BATCH_SIZE = 65536
+
+# Kolom usia produktif di data demografi mentah (Fase 1.2 langkah 5)
+PRODUCTIVE_AGE_COLUMNS = ['u15', 'u20', 'u25', 'u30', 'u35', 'u40', 'u45', 'u50', 'u55', 'u60']
+
+# Urutan fitur saat pelatihan: kolom numerik final_grid_data (tanpa kode_desa_spatial) lalu placeholder
+MODEL_FEATURE_COLUMNS = GRID_FEATURE_COLUMNS + list(USER_PLACEHOLDER_FEATURES)
+
+
+# --- BATAS WILAYAH ---
+class Boundary:
+    """
+    Poligon batas Jawa Barat (EPSG:4326) dengan STRtree untuk memfilter gempa, POI, dan sel grid.
+    """
+
+    def __init__(self, gdf):
+        if gdf.crs is not None and gdf.crs != "EPSG:4326":
+            gdf = gdf.to_crs("EPSG:4326")
+        self.geoms = np.asarray(gdf.geometry.values)
+        self.tree = shapely.STRtree(self.geoms)
+        self.total_bounds = shapely.total_bounds(self.geoms)
+
+    def contains_mask(self, geoms):
+        """
+        True untuk geometri yang berpotongan dengan batas (predikat sjoin 'intersects' di notebook).
+        """
+        mask = np.zeros(len(geoms), dtype=bool)
+        idx, _ = self.tree.query(np.asarray(geoms), predicate='intersects')
+        mask[idx] = True
+        return mask
+
+
+# --- TAHAP 1: GEMPA ---
+def build_gempa(csv_paths, boundary):
+    gdf = read_catalog(csv_paths)
+    return gdf[boundary.contains_mask(gdf.geometry.values)].reset_index(drop=True)
+
+
+# --- TAHAP 2: POI ---
+def categorize_poi(amenity):
+    """
+    Kategori POI dari kolom amenity, dengan urutan aturan yang sama seperti `categorize_poi` di notebook.
+    """
+    amenity = amenity.astype(str).str.lower()
+    rules = [
+        (['hospital', 'clinic'], 'Fasilitas Kesehatan'),
+        (['school'], 'Sekolah'),
+        (['police', 'townhall'], 'Pemerintahan/Publik'),
+        (['library', 'place_of_worship'], 'Fasilitas Sosial/Publik Lain'),
+        (['restaurant'], 'Komersial'),
+    ]
+    conditions = [np.logical_or.reduce([amenity.str.contains(word, regex=False).to_numpy() for word in words])
+                  for words, _ in rules]
+    return pd.Series(np.select(conditions, [category for _, category in rules], 'Bangunan Biasa'), index=amenity.index)
+
+
+def _clean_poi_batch(gdf, boundary):
+    gdf = gdf.dropna(subset=['amenity'])
+    gdf = gdf[~(gdf.geometry.isna() | gdf.geometry.is_empty)]
+    if gdf.crs is not None and gdf.crs != "EPSG:4326":
+        gdf = gdf.to_crs("EPSG:4326")
+    gdf = gdf[boundary.contains_mask(gdf.geometry.values)].copy()
+    gdf['category'] = categorize_poi(gdf['amenity'])
+    return gdf
+
+
+def read_poi_in_province(path, boundary, batch_size=POI_BATCH_SIZE):
+    """
+    Membaca file POI nasional per batch Arrow dengan filter bbox di GDAL, sehingga hanya batch berisi
+    POI di sekitar Jawa Barat yang pernah dibuat di memori. Tanpa pyarrow, file dibaca sekaligus
+    dengan filter bbox yang sama.
+    """
+    import pyogrio
+
+    info = pyogrio.read_info(path)
+    columns = [col for col in POI_SOURCE_COLUMNS if col in info['fields']]
+    bbox = tuple(boundary.total_bounds)
+    if info['crs'] is not None and info['crs'] != "EPSG:4326":
+        bbox = Transformer.from_crs("EPSG:4326", info['crs'], always_xy=True).transform_bounds(*bbox)
+
+    try:
+        import pyarrow  # noqa: F401 (dibutuhkan oleh pyogrio.open_arrow)
+    except ImportError:
+        return _clean_poi_batch(gpd.read_file(path, bbox=bbox, columns=columns), boundary).reset_index(drop=True)
+
+    parts = []
+    with pyogrio.open_arrow(path, bbox=bbox, columns=columns, batch_size=batch_size, use_pyarrow=True) as (meta, reader):
+        geometry_column = meta['geometry_name'] or 'wkb_geometry'
+        for batch in reader:
+            df = batch.to_pandas()
+            geometry = shapely.from_wkb(df.pop(geometry_column).to_numpy())
+            parts.append(_clean_poi_batch(gpd.GeoDataFrame(df, geometry=geometry, crs=meta['crs']), boundary))
+    if not parts:
+        return gpd.GeoDataFrame(columns=columns + ['category'], geometry=[], crs="EPSG:4326")
+    return pd.concat(parts, ignore_index=True)
+
+
+# --- TAHAP 3: DEMOGRAFI ---
+def clean_demografi(gdf):
+    """
+    Fase 1.2 langkah 4-5: estimasi penduduk miskin per kelurahan dari angka kab/kota, usia produktif,
+    rasio, dan kepadatan penduduk. Mengembalikan kolom yang disimpan di GeoPackage demografi aplikasi.
+    """
+    if gdf.crs is not None and gdf.crs != "EPSG:4326":
+        gdf = gdf.to_crs("EPSG:4326")
+    gdf = gdf.copy()
+
+    # Estimasi penduduk miskin: porsi penduduk kelurahan terhadap total kab/kota dikali jumlah miskin kab/kota
+    gdf['jumlah_penduduk'] = pd.to_numeric(gdf['jumlah_penduduk'], errors='coerce').fillna(0)
+    gdf['jumlah_penduduk_miskin_kabkot'] = pd.to_numeric(gdf['jumlah_penduduk_miskin_kabkot'], errors='coerce').fillna(0)
+    penduduk_kabkot = gdf.groupby('nama_kab')['jumlah_penduduk'].transform('sum')
+    gdf['jumlah_penduduk_miskin_kelurahan_estimasi'] = (
+        (gdf['jumlah_penduduk'].astype(float) / penduduk_kabkot.replace(0, np.nan))
+        * gdf['jumlah_penduduk_miskin_kabkot'].astype(float)
+    ).fillna(0).astype(int)
+
+    productive_cols = [col for col in PRODUCTIVE_AGE_COLUMNS if col in gdf.columns]
+    required = ['kode_desa_spatial', 'jumlah_penduduk', 'pria', 'wanita', 'nama_kab'] + productive_cols
+    gdf = gdf.dropna(subset=[col for col in required if col in gdf.columns])
+    numeric_cols = ['jumlah_penduduk', 'pria', 'wanita'] + productive_cols
+    for col in numeric_cols:
+        gdf[col] = pd.to_numeric(gdf[col], errors='coerce')
+    gdf = gdf.dropna(subset=numeric_cols)
+
+    gdf['jumlah_produktif'] = gdf[productive_cols].sum(axis=1) if productive_cols else 0.0
+    gdf['jumlah_non_produktif'] = (gdf['jumlah_penduduk'] - gdf['jumlah_produktif']).clip(lower=0)
+    gdf['rasio_lp'] = (gdf['pria'] / gdf['wanita']).replace([np.inf, -np.inf], np.nan).fillna(1.0)
+    gdf['rasio_produktif_nonproduktif'] = (
+        gdf['jumlah_produktif'] / gdf['jumlah_non_produktif'].replace(0, np.nan)
+    ).replace([np.inf, -np.inf], np.nan).fillna(1.0)
+    luas_area_sqkm = gdf.geometry.to_crs(epsg=3857).area / 10**6
+    gdf['kepadatan_penduduk_kelurahan'] = (
+        gdf['jumlah_penduduk'] / luas_area_sqkm.replace(0, np.nan)
+    ).replace([np.inf, -np.inf], np.nan).fillna(0)
+
+    # Nama wilayah diambil dari baris yang sama (notebook menggabungkannya ulang lewat kode_desa_spatial)
+    columns = ['kode_desa_spatial'] + DEMOG_FEATURE_COLUMNS + [col for col in KELURAHAN_NAME_COLUMNS if col in gdf.columns]
+    return gdf[columns + [gdf.geometry.name]].reset_index(drop=True)
+
+
+# --- TAHAP 4: GRID ---
+# Layer per proses worker (diwarisi saat fork, dimuat ulang dari cache tahap saat spawn)
+_WORKER_STATE = None
+
+
+def _init_worker(gempa_path, poi_path, demografi_path, boundary_path):
+    global _WORKER_STATE
+    if _WORKER_STATE is not None and _WORKER_STATE['paths'] == (gempa_path, poi_path, demografi_path, boundary_path):
+        return
+    from siagagempa.spatial_index import SpatialIndex
+
+    gdf_gempa, gdf_poi, gdf_demografi = [gpd.read_file(path) for path in (gempa_path, poi_path, demografi_path)]
+    _WORKER_STATE = {
+        'paths': (gempa_path, poi_path, demografi_path, boundary_path),
+        'boundary': Boundary(gpd.read_file(boundary_path)),
+        'gdf_gempa': gdf_gempa,
+        'spatial_index': SpatialIndex(gdf_gempa, gdf_poi, gdf_demografi),
+    }
+
+
+def process_grid_tile(task):
+    """
+    Sel-sel satu tile yang berpotongan dengan batas provinsi beserta fiturnya, atau None jika kosong.
+    """
+    grid_spec, tile, windows_years, nearest_k = task
+    state = _WORKER_STATE
+    cells = grid_spec.cells(*tile)
+    cells = cells[state['boundary'].contains_mask(cell_polygons(cells))].reset_index(drop=True)
+    if cells.empty:
+        return None
+    spatial_index = state['spatial_index']
+    features = compute_cell_features(cells, spatial_index, state['gdf_gempa'], spatial_index.poi, spatial_index.kelurahan)
+    cells, features = drop_empty_cells(cells, features)
+    if cells.empty:
+        return None
+    if spatial_index.gempa_time_index is not None:
+        features = features.join(compute_cell_window_features(cells, spatial_index.gempa_time_index, windows_years))
+    features = features.join(compute_cell_nearest_features(cells, spatial_index.nearest_index, nearest_k))
+    features.insert(0, 'grid_id', cells['grid_id'].to_numpy())
+    return gpd.GeoDataFrame(features, geometry=cell_polygons(cells), crs="EPSG:4326")
+
+
+def build_grid(stage_paths, boundary, cell_size=GRID_SIZE_DEGREE, tile_cells=20, workers=None,
+               windows_years=SEISMIC_WINDOWS_YEARS, nearest_k=NEAREST_GEMPA_K):
+    grid_spec = GridSpec(boundary.total_bounds, cell_size)
+    tiles = grid_spec.tiles(tile_cells)
+    init_args = (stage_paths['gempa'], stage_paths['poi'], stage_paths['demografi'], stage_paths['batas'])
+    print(f"  - Grid {grid_spec.n_rows} x {grid_spec.n_cols} sel, {len(tiles)} tile, {workers or os.cpu_count()} worker.")
+    _init_worker(*init_args)
+    with multiprocessing.Pool(processes=workers, initializer=_init_worker, initargs=init_args) as pool:
+        # imap mempertahankan urutan tile sehingga output identik di setiap run
+        tasks = [(grid_spec, tile, windows_years, nearest_k) for tile in tiles]
+        parts = [gdf for gdf in pool.imap(process_grid_tile, tasks) if gdf is not None]
+    if not parts:
+        raise ValueError("Tidak ada sel grid dengan fitur bukan nol di dalam batas wilayah.")
+    return pd.concat(parts, ignore_index=True)
+
+
+# --- CACHE TAHAP ---
+class StageCache:
+    """
+    Hasil setiap tahap sebagai GeoPackage di `cache_dir`, dengan manifest berisi kunci input tahap
+    dan sidik jari file hasilnya.
+    """
+
+    def __init__(self, cache_dir=PIPELINE_CACHE_DIR):
+        self.cache_dir = cache_dir
+        os.makedirs(cache_dir, exist_ok=True)
+        self.manifest_path = os.path.join(cache_dir, MANIFEST_FILENAME)
+        self.manifest = {}
+        if os.path.exists(self.manifest_path):
+            with open(self.manifest_path) as f:
+                self.manifest = json.load(f)
+
+    def path(self, stage):
+        return os.path.join(self.cache_dir, f'{stage}.gpkg')
+
+    def key(self, stage, inputs=(), params=None, upstream=()):
+        payload = {
+            'version': PIPELINE_FORMAT_VERSION,
+            'stage': stage,
+            'inputs': {os.path.abspath(path): source_fingerprint(path) for path in inputs},
+            'params': params or {},
+            'upstream': [self.manifest[name]['key'] for name in upstream],
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def is_current(self, stage, key):
+        entry = self.manifest.get(stage)
+        path = self.path(stage)
+        return entry is not None and entry['key'] == key and os.path.exists(path) and source_fingerprint(path) == entry['output']
+
+    def _save_manifest(self):
+        with open(self.manifest_path, 'w') as f:
+            json.dump(self.manifest, f, indent=2)
+
+    def run(self, stage, key, compute):
+        """
+        Memakai hasil tahap dari cache jika kuncinya sama; selain itu menjalankan `compute()` dan menyimpannya.
+        Mengembalikan True jika tahap dihitung ulang.
+        """
+        if self.is_current(stage, key):
+            print(f"[{stage}] input tidak berubah, memakai cache ({self.manifest[stage]['rows']} baris).")
+            return False
+        start = time.perf_counter()
+        gdf = compute()
+        path = self.path(stage)
+        _replace_atomic(path, lambda tmp_path: gdf.to_file(tmp_path, layer=stage, driver='GPKG'))
+        self.manifest[stage] = {'key': key, 'output': source_fingerprint(path), 'rows': len(gdf)}
+        self._save_manifest()
+        print(f"[{stage}] {len(gdf)} baris ({time.perf_counter() - start:.1f} dtk).")
+        return True
+
+    def publish(self, stage, out_path):
+        """
+        Menyalin hasil tahap ke file yang dimuat aplikasi (atomik, nama layer sesuai nama file). Dilewati jika
+        file tersebut masih hasil publikasi tahap yang sama, agar aplikasi tidak memuat ulang data tanpa perubahan.
+        """
+        entry = self.manifest[stage]
+        published = entry.setdefault('published', {})
+        if os.path.exists(out_path) and published.get(out_path) == source_fingerprint(out_path):
+            return False
+        gdf = gpd.read_file(self.path(stage))
+        layer = os.path.splitext(os.path.basename(out_path))[0]
+        os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+        _replace_atomic(out_path, lambda tmp_path: gdf.to_file(tmp_path, layer=layer, driver='GPKG'))
+        published[out_path] = source_fingerprint(out_path)
+        self._save_manifest()
+        return True
+
+
+def _boundary_frame(gdf):
+    if gdf.crs is not None and gdf.crs != "EPSG:4326":
+        gdf = gdf.to_crs("EPSG:4326")
+    return gpd.GeoDataFrame(geometry=gdf.geometry.values, crs="EPSG:4326")
+
+
+def _write_feature_columns(path):
+    """
+    Menyimpan daftar fitur model; file tidak ditulis ulang jika isinya sudah sama.
+    """
+    import joblib
+
+    if os.path.exists(path) and joblib.load(path) == MODEL_FEATURE_COLUMNS:
+        return False
+    joblib.dump(MODEL_FEATURE_COLUMNS, path)
+    return True
+
+
+def _publish_risk_tiles(grid_path, tiles_dir, grid_changed):
+    """
+    Membangun ulang tile peta risiko jika grid baru dipublikasikan atau tile belum dibangun dari grid ini.
+    Level sel diprediksi dengan model; tanpa file model tahap ini dilewati. Mengembalikan True jika dibangun.
+    """
+    if not grid_changed and tiles_built_from(grid_path, tiles_dir):
+        return False
+    try:
+        gdf = load_risk_grid(grid_path)
+    except FileNotFoundError as e:
+        print(f"[tiles] dilewati, model tidak ditemukan: {e.filename}")
+        return False
+    start = time.perf_counter()
+    meta = build_tiles(gdf, tiles_dir, source=grid_path)
+    print(f"[tiles] {meta['n_tiles']} tile ke '{tiles_dir}' ({time.perf_counter() - start:.1f} dtk).")
+    return True
+
+
+def run_pipeline(gempa_csvs, poi_path, demografi_path, batas_path=None, out_dir=None,
+                 feature_columns_path=FEATURE_COLUMNS_FILENAME, cache_dir=PIPELINE_CACHE_DIR,
+                 cell_size=GRID_SIZE_DEGREE, tile_cells=20, workers=None, tiles_dir=None):
+    """
+    Menjalankan semua tahap lalu memublikasikan hasilnya. Tanpa `batas_path`, poligon kelurahan dipakai
+    sebagai batas Jawa Barat. Tile peta risiko ditulis ke `tiles_dir` (default RISK_TILES_DIR, atau
+    <out_dir>/risk_tiles jika `out_dir` diisi; '' untuk melewati). Mengembalikan dict {tahap: dihitung ulang?}.
+    """
+    cache = StageCache(cache_dir)
+    recomputed = {}
+
+    recomputed['demografi'] = cache.run(
+        'demografi', cache.key('demografi', [demografi_path]), lambda: clean_demografi(gpd.read_file(demografi_path))
+    )
+    if batas_path:
+        recomputed['batas'] = cache.run('batas', cache.key('batas', [batas_path]),
+                                        lambda: _boundary_frame(gpd.read_file(batas_path)))
+    else:
+        recomputed['batas'] = cache.run('batas', cache.key('batas', upstream=['demografi']),
+                                        lambda: _boundary_frame(gpd.read_file(cache.path('demografi'))))
+    boundary = Boundary(gpd.read_file(cache.path('batas')))
+
+    recomputed['gempa'] = cache.run('gempa', cache.key('gempa', gempa_csvs, upstream=['batas']),
+                                    lambda: build_gempa(gempa_csvs, boundary))
+    recomputed['poi'] = cache.run('poi', cache.key('poi', [poi_path], upstream=['batas']),
+                                  lambda: read_poi_in_province(poi_path, boundary))
+
+    stage_paths = {stage: cache.path(stage) for stage in ['gempa', 'poi', 'demografi', 'batas']}
+    grid_key = cache.key('grid', params={'cell_size': cell_size, 'tile_cells': tile_cells,
+                                         'seismic_windows_years': SEISMIC_WINDOWS_YEARS,
+                                         'nearest_gempa_k': NEAREST_GEMPA_K},
+                         upstream=['gempa', 'poi', 'demografi', 'batas'])
+    recomputed['grid'] = cache.run('grid', grid_key,
+                                   lambda: build_grid(stage_paths, boundary, cell_size, tile_cells, workers))
+
+    outputs = {
+        'grid': FINAL_GRID_PATH, 'gempa': GD_GEMPA_JABAR_PATH,
+        'poi': GD_POI_JABAR_PATH, 'demografi': GD_DEMOGRAFI_JABAR_CLEAN_PATH,
+    }
+    published = {}
+    for stage, out_path in outputs.items():
+        if out_dir:
+            out_path = os.path.join(out_dir, os.path.basename(out_path))
+        published[stage] = cache.publish(stage, out_path)
+        outputs[stage] = out_path
+        if published[stage]:
+            print(f"  - '{out_path}' diperbarui.")
+    if _write_feature_columns(feature_columns_path):
+        print(f"  - '{feature_columns_path}' diperbarui ({len(MODEL_FEATURE_COLUMNS)} fitur).")
+
+    if tiles_dir is None:
+        tiles_dir = os.path.join(out_dir, 'risk_tiles') if out_dir else RISK_TILES_DIR
+    if tiles_dir:
+        recomputed['tiles'] = _publish_risk_tiles(outputs['grid'], tiles_dir, published['grid'])
+    return recomputed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Pipeline fitur offline: dari data mentah ke final_grid_data_processed.gpkg.")
+    parser.add_argument('--gempa', nargs='+', required=True, help="File CSV katalog gempa USGS")
+    parser.add_argument('--poi', required=True, help="File POI nasional (mis. poi_indonesia.geojson)")
+    parser.add_argument('--demografi', required=True, help="GeoPackage demografi kelurahan Jawa Barat (mentah)")
+    parser.add_argument('--batas', help="Batas provinsi Jawa Barat (default: gabungan poligon kelurahan)")
+    parser.add_argument('--out-dir', help=f"Folder output GeoPackage (default: '{DIR_DATA_FILES}')")
+    parser.add_argument('--feature-columns', default=FEATURE_COLUMNS_FILENAME, help="File daftar fitur model (.pkl)")
+    parser.add_argument('--cache-dir', default=PIPELINE_CACHE_DIR)
+    parser.add_argument('--cell-size', type=float, default=GRID_SIZE_DEGREE, help="Ukuran sel grid dalam derajat.")
+    parser.add_argument('--tile-cells', type=int, default=20, help="Jumlah sel per sisi tile yang diproses satu worker.")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses worker (default: jumlah CPU).")
+    parser.add_argument('--tiles-dir', default=None,
+                        help=f"Folder tile peta risiko (default: '{RISK_TILES_DIR}', atau <out-dir>/risk_tiles; '' untuk melewati)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    recomputed = run_pipeline(args.gempa, args.poi, args.demografi, args.batas, args.out_dir, args.feature_columns,
+                              args.cache_dir, args.cell_size, args.tile_cells, args.workers, args.tiles_dir)
+    print(f"Pipeline selesai dalam {time.perf_counter() - start:.1f} dtk.")
+    if any(recomputed.values()):
+        print("Bundel data dan grid kepadatan kini usang; bangun ulang dengan: "
+              "python -m siagagempa.data_bundle build, python -m siagagempa.density_grid build")
+
+
+if __name__ == '__main__':
+    main()
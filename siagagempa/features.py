@@ -0,0 +1,329 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+
+from siagagempa.config import (
+    BUFFER_GEMPA_KM, BUFFER_POI_METER,
+    DEMOG_FEATURE_COLUMNS, POI_CATEGORY_COLUMNS, SEISMIC_WINDOWS_YEARS, NEAREST_GEMPA_K
+)
+from siagagempa.spatial_index import SpatialIndex
+from siagagempa import metrics
+
+# Input pengguna per titik beserta nilai default-nya (sama dengan default di halaman prediksi)
+USER_INPUT_DEFAULTS = {
+    'jumlah_kk': 50,
+    'jumlah_laki': 75,
+    'jumlah_perempuan': 75,
+    'jumlah_anak': 20,
+    'jumlah_lansia': 10,
+    'ada_rs': 'Tidak',
+    'ada_sekolah': 'Tidak',
+    'ada_pemerintahan': 'Tidak',
+    'ada_bangunan_biasa': 'Tidak',
+    'ada_fasos_lain': 'Tidak',
+}
+# Jawaban yang diterima untuk kolom ada_* (huruf kecil, tanpa spasi)
+YA_ANSWERS = ('ya', 'y', '1', '1.0', 'true')
+TIDAK_ANSWERS = ('tidak', 'n', '0', '0.0', 'false')
+
+# Konfirmasi fasilitas dari pengguna -> kolom hitungan POI yang dipaksa minimal 1
+USER_POI_CONFIRMATION_COLUMNS = {
+    'ada_rs': 'count_poi_fasilitas_kesehatan',
+    'ada_sekolah': 'count_poi_sekolah',
+    'ada_pemerintahan': 'count_poi_pemerintahan/publik',
+    'ada_fasos_lain': 'count_poi_fasilitas_sosial/publik_lain',
+    'ada_bangunan_biasa': 'count_poi_bangunan_biasa',
+}
+
+LAT_COLUMN_CANDIDATES = ['latitude', 'lat', 'lintang']
+LON_COLUMN_CANDIDATES = ['longitude', 'lon', 'lng', 'long', 'bujur']
+
+
+def _is_ya(values):
+    """
+    Mengubah jawaban 'Ya'/'Tidak' (atau 1/0, true/false) menjadi array boolean.
+    """
+    normalized = pd.Series(values).astype(str).str.strip().str.lower()
+    return normalized.isin(YA_ANSWERS).to_numpy()
+
+
+def _prepare_user_inputs(user_inputs, n_points):
+    """
+    Melengkapi tabel input pengguna dengan nilai default untuk kolom yang tidak diisi.
+    """
+    if user_inputs is None:
+        user_inputs = pd.DataFrame(index=range(n_points))
+    user_inputs = pd.DataFrame(user_inputs).reset_index(drop=True)
+    if len(user_inputs) != n_points:
+        raise ValueError(f"Jumlah baris input pengguna ({len(user_inputs)}) tidak sama dengan jumlah titik ({n_points}).")
+
+    prepared = {}
+    for col, default in USER_INPUT_DEFAULTS.items():
+        if col in user_inputs.columns:
+            series = user_inputs[col]
+        else:
+            series = pd.Series([default] * n_points)
+        if isinstance(default, str):
+            prepared[col] = _is_ya(series.fillna(default))
+        else:
+            prepared[col] = pd.to_numeric(series, errors='coerce').fillna(default).to_numpy(dtype=float)
+    return prepared
+
+
+def _exact_gempa_features(spatial_index, gdf_gempa, points_metric):
+    """
+    count_gempa, max_mag, dan avg_depth dari semua gempa di dalam radius BUFFER_GEMPA_KM.
+    """
+    n_points = len(points_metric)
+    idx_point, idx_gempa = spatial_index.query_gempa(points_metric, BUFFER_GEMPA_KM * 1000)
+    count_gempa = np.bincount(idx_point, minlength=n_points)
+    max_mag = np.zeros(n_points)
+    avg_depth = np.zeros(n_points)
+    if len(idx_point):
+        mag = gdf_gempa['mag'].to_numpy(dtype=float)[idx_gempa]
+        depth = gdf_gempa['depth'].to_numpy(dtype=float)[idx_gempa]
+        max_mag.fill(-np.inf)
+        np.maximum.at(max_mag, idx_point, mag)
+        max_mag[count_gempa == 0] = 0.0
+        depth_sum = np.bincount(idx_point, weights=depth, minlength=n_points)
+        has_gempa = count_gempa > 0
+        avg_depth[has_gempa] = depth_sum[has_gempa] / count_gempa[has_gempa]
+    return count_gempa, max_mag, avg_depth
+
+
+def _exact_poi_features(spatial_index, gdf_poi, points_metric):
+    """
+    Jumlah POI per kategori di dalam radius BUFFER_POI_METER.
+    """
+    n_points = len(points_metric)
+    poi_features = {col: np.zeros(n_points, dtype=np.int64) for col in POI_CATEGORY_COLUMNS.values()}
+    poi_store = spatial_index.poi
+    if poi_store.categories is not None:
+        idx_point, idx_poi = spatial_index.query_poi(points_metric, BUFFER_POI_METER)
+        codes = poi_store.category_codes[idx_poi]
+        for category, col in POI_CATEGORY_COLUMNS.items():
+            code = poi_store.category_code(category)
+            if code is not None:
+                poi_features[col] = np.bincount(idx_point[codes == code], minlength=n_points)
+    return poi_features
+
+
+def compute_location_features(lats, lons, gdf_gempa, gdf_poi, gdf_demografi, spatial_index):
+    """
+    Fitur yang hanya bergantung pada lokasi: demografi kelurahan, gempa dalam BUFFER_GEMPA_KM,
+    dan POI per kategori dalam BUFFER_POI_METER. Mengembalikan {kolom: array}.
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    n_points = len(lats)
+    points = spatial_index.points(lons, lats)
+
+    # --- Fitur Demografi dari Kelurahan (satu point-in-polygon untuk semua titik) ---
+    demog = {col: np.zeros(n_points) for col in DEMOG_FEATURE_COLUMNS}
+    idx_kel = spatial_index.locate_kelurahan(points)
+    in_kel = idx_kel >= 0
+    kelurahan = spatial_index.kelurahan
+    for col in DEMOG_FEATURE_COLUMNS:
+        if col in kelurahan.columns:
+            demog[col][in_kel] = kelurahan.column(col)[idx_kel[in_kel]]
+
+    # --- Fitur Gempa & POI Terdekat: dari grid kepadatan (mode 'grid') atau kueri exact ---
+    density_grid = spatial_index.density_grid
+    if density_grid is not None:
+        x, y = spatial_index.metric_xy(lons, lats)
+        with metrics.stage('density_grid.lookup', points=n_points):
+            count_gempa, max_mag, avg_depth = density_grid.gempa_stats(x, y, BUFFER_GEMPA_KM * 1000)
+            poi_features = density_grid.poi_counts(x, y, BUFFER_POI_METER)
+    else:
+        points_metric = spatial_index.points_metric(lons, lats)
+        count_gempa, max_mag, avg_depth = _exact_gempa_features(spatial_index, gdf_gempa, points_metric)
+        poi_features = _exact_poi_features(spatial_index, gdf_poi, points_metric)
+
+    # Indeks kelurahan ikut disimpan agar halaman hasil tidak mengulang point-in-polygon yang sama
+    return {
+        **demog, 'count_gempa': count_gempa, 'max_mag': max_mag, 'avg_depth': avg_depth, **poi_features,
+        'kelurahan_index': idx_kel,
+    }
+
+
+def compute_seismic_window_features(lats, lons, spatial_index, windows_years=SEISMIC_WINDOWS_YEARS):
+    """
+    Jumlah gempa dan magnitudo maksimum dalam BUFFER_GEMPA_KM untuk setiap jendela `windows_years`
+    (tahun terakhir sebelum gempa terakhir di katalog), dari indeks waktu gempa. Bukan fitur model;
+    dict kosong jika katalog tidak memiliki kolom waktu.
+    """
+    time_index = spatial_index.gempa_time_index
+    if time_index is None:
+        return {}
+    x, y = spatial_index.metric_xy(lons, lats)
+    with metrics.stage('seismic_index.window_features', labels={'windows': len(windows_years)}, points=len(x)):
+        return time_index.window_features(x, y, windows_years=windows_years)
+
+
+def compute_nearest_features(lats, lons, spatial_index, k=NEAREST_GEMPA_K):
+    """
+    Jarak ke fasilitas kesehatan, sekolah, dan kantor pemerintahan terdekat serta ringkasan K gempa
+    terdekat (lihat siagagempa.nearest_index). Bukan fitur model.
+    """
+    x, y = spatial_index.metric_xy(lons, lats)
+    with metrics.stage('nearest_index.features', labels={'k': k}, points=len(x)):
+        return spatial_index.nearest_index.features(x, y, k_gempa=k)
+
+
+def predict_vulnerability_for_points(
+    lats, lons, user_inputs,
+    model_expected_features, gdf_gempa, gdf_poi, gdf_demografi, spatial_index=None, return_kelurahan_index=False
+):
+    """
+    Versi batch dari `predict_vulnerability_for_point`: menghitung fitur untuk N titik sekaligus
+    dengan spatial join massal, lalu mengembalikan satu matriks fitur (satu baris per titik).
+    Berikan `spatial_index` dari `load_all_resources` agar indeks tidak dibangun ulang.
+    Jika `spatial_index.feature_cache` aktif, fitur lokasi diambil dari cache koordinat terkuantisasi.
+    Dengan `return_kelurahan_index=True` mengembalikan (X, indeks kelurahan per titik; -1 jika di luar).
+    """
+    lats = np.asarray(lats, dtype=float)
+    lons = np.asarray(lons, dtype=float)
+    n_points = len(lats)
+    user = _prepare_user_inputs(user_inputs, n_points)
+
+    if spatial_index is None:
+        spatial_index = SpatialIndex(gdf_gempa, gdf_poi, gdf_demografi)
+
+    def compute(lats_, lons_):
+        return compute_location_features(lats_, lons_, gdf_gempa, gdf_poi, gdf_demografi, spatial_index)
+
+    feature_cache = spatial_index.feature_cache
+    with metrics.stage('features.location', points=n_points) as info:
+        if feature_cache is not None:
+            # Namespace per mode fitur agar hasil 'grid' dan 'exact' tidak tercampur
+            namespace = 'grid' if spatial_index.density_grid is not None else 'exact'
+            misses_before = feature_cache.misses
+            location = feature_cache.get_or_compute(lats, lons, compute, namespace)
+            info['cache_misses'] = feature_cache.misses - misses_before
+        else:
+            location = compute(lats, lons)
+
+    demog = {col: np.array(location[col], dtype=float) for col in DEMOG_FEATURE_COLUMNS}
+    count_gempa = np.asarray(location['count_gempa']).astype(np.int64)
+    max_mag = np.asarray(location['max_mag'], dtype=float)
+    avg_depth = np.asarray(location['avg_depth'], dtype=float)
+    poi_features = {col: np.asarray(location[col]).astype(np.int64) for col in POI_CATEGORY_COLUMNS.values()}
+
+    final_non_produktif = np.maximum(user['jumlah_anak'] + user['jumlah_lansia'], demog['jumlah_non_produktif'])
+    demog['jumlah_non_produktif'] = final_non_produktif
+    with np.errstate(divide='ignore', invalid='ignore'):
+        demog['rasio_produktif_nonproduktif'] = np.where(
+            final_non_produktif > 0, demog['jumlah_produktif'] / final_non_produktif, 1.0
+        )
+
+    # Gabungkan dengan input konfirmasi dari pengguna
+    for user_col, poi_col in USER_POI_CONFIRMATION_COLUMNS.items():
+        poi_features[poi_col] = np.where(user[user_col], np.maximum(1, poi_features[poi_col]), poi_features[poi_col])
+
+    # --- Fitur dari Input Pengguna ---
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rasio_lp_user = np.where(user['jumlah_perempuan'] > 0, user['jumlah_laki'] / user['jumlah_perempuan'], 1.0)
+    user_input_features = {'user_input_jumlah_kk': user['jumlah_kk'], 'user_input_rasio_lp': rasio_lp_user}
+
+    # --- Gabungkan Semua Fitur dan Siapkan untuk Model ---
+    all_features = {
+        **demog,
+        'count_gempa': count_gempa, 'max_mag': max_mag, 'avg_depth': avg_depth,
+        **poi_features, **user_input_features
+    }
+    X = pd.DataFrame(all_features).reindex(columns=model_expected_features, fill_value=0.0)
+    if return_kelurahan_index:
+        return X, np.asarray(location['kelurahan_index']).astype(np.int64)
+    return X
+
+
+def predict_vulnerability_for_point(
+    user_lat, user_lon,
+    user_jumlah_kk, user_jumlah_laki, user_jumlah_perempuan,
+    user_jumlah_anak, user_jumlah_lansia,
+    user_ada_rs, user_ada_sekolah, user_ada_pemerintahan, user_ada_bangunan_biasa, user_ada_fasos_lain,
+    model_expected_features, gdf_gempa, gdf_poi, gdf_demografi, spatial_index=None, return_kelurahan_index=False
+):
+    """
+    Fungsi utama untuk mengumpulkan semua fitur dan mempersiapkan data untuk prediksi.
+    """
+    user_inputs = pd.DataFrame([{
+        'jumlah_kk': user_jumlah_kk, 'jumlah_laki': user_jumlah_laki, 'jumlah_perempuan': user_jumlah_perempuan,
+        'jumlah_anak': user_jumlah_anak, 'jumlah_lansia': user_jumlah_lansia,
+        'ada_rs': user_ada_rs, 'ada_sekolah': user_ada_sekolah, 'ada_pemerintahan': user_ada_pemerintahan,
+        'ada_bangunan_biasa': user_ada_bangunan_biasa, 'ada_fasos_lain': user_ada_fasos_lain,
+    }])
+    return predict_vulnerability_for_points(
+        [user_lat], [user_lon], user_inputs,
+        model_expected_features, gdf_gempa, gdf_poi, gdf_demografi, spatial_index,
+        return_kelurahan_index=return_kelurahan_index
+    )
+
+
+def predict_vulnerability(X_new_predict, model, label_encoder):
+    """
+    Menjalankan prediksi pada data yang sudah disiapkan.
+    """
+    with metrics.stage('model.predict', rows=len(X_new_predict)):
+        prediction_encoded = model.predict(X_new_predict)[0]
+    return label_encoder.inverse_transform([prediction_encoded])[0]
+
+
+def predict_vulnerability_batch(X_batch, model, label_encoder):
+    """
+    Menjalankan satu kali `model.predict` untuk seluruh matriks fitur dan mengembalikan label teks.
+    """
+    if len(X_batch) == 0:
+        return np.array([], dtype=object)
+    with metrics.stage('model.predict', rows=len(X_batch)):
+        return label_encoder.inverse_transform(model.predict(X_batch))
+
+
+def read_points_table(file_name, file_obj):
+    """
+    Membaca file CSV atau GeoPackage berisi titik lokasi menjadi DataFrame
+    dengan kolom 'latitude' dan 'longitude' ditambah kolom input pengguna (jika ada).
+    """
+    if file_name.lower().endswith('.csv'):
+        df = pd.read_csv(file_obj)
+        columns_lower = {c.lower().strip(): c for c in df.columns}
+        lat_col = next((columns_lower[c] for c in LAT_COLUMN_CANDIDATES if c in columns_lower), None)
+        lon_col = next((columns_lower[c] for c in LON_COLUMN_CANDIDATES if c in columns_lower), None)
+        if lat_col is None or lon_col is None:
+            raise ValueError(
+                f"Kolom koordinat tidak ditemukan. Gunakan salah satu dari {LAT_COLUMN_CANDIDATES} "
+                f"dan {LON_COLUMN_CANDIDATES}. Kolom tersedia: {df.columns.tolist()}"
+            )
+        df = df.rename(columns={lat_col: 'latitude', lon_col: 'longitude'})
+        df['latitude'] = pd.to_numeric(df['latitude'], errors='coerce')
+        df['longitude'] = pd.to_numeric(df['longitude'], errors='coerce')
+        return df.dropna(subset=['latitude', 'longitude']).reset_index(drop=True)
+
+    if file_name.lower().endswith('.gpkg'):
+        gdf = gpd.read_file(file_obj)
+        if gdf.crs is not None and gdf.crs != "EPSG:4326":
+            gdf = gdf.to_crs("EPSG:4326")
+        gdf = gdf[gdf.geometry.notna() & ~gdf.geometry.is_empty]
+        # Geometri non-titik (mis. poligon gedung) diwakili oleh titik representatifnya
+        representative = gdf.geometry.representative_point()
+        df = pd.DataFrame(gdf.drop(columns=gdf.geometry.name))
+        df['latitude'] = representative.y.to_numpy()
+        df['longitude'] = representative.x.to_numpy()
+        return df.reset_index(drop=True)
+
+    raise ValueError(f"Format file '{file_name}' tidak didukung. Gunakan .csv atau .gpkg.")
+
+
+def points_table_to_gpkg_bytes(df):
+    """
+    Menulis tabel hasil (dengan kolom latitude/longitude) menjadi isi file GeoPackage.
+    """
+    gdf = gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df['longitude'], df['latitude']), crs="EPSG:4326")
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'hasil_prediksi.gpkg')
+        gdf.to_file(path, driver='GPKG')
+        with open(path, 'rb') as f:
+            return f.read()
@@ -0,0 +1,23 @@
+"""
+Sidik jari file sumber (ukuran dan waktu modifikasi) untuk mendeteksi artefak turunan yang sudah usang.
+Path relatif artefak dan file sumbernya diukur dari folder repo, bukan dari direktori kerja.
+"""
+import os
+
+# Folder repo (induk paket siagagempa)
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def repo_path(path):
+    """
+    Path absolut untuk `path` relatif terhadap folder repo (path absolut dikembalikan apa adanya).
+    """
+    return path if os.path.isabs(path) else os.path.join(REPO_DIR, path)
+
+
+def source_fingerprint(path):
+    """
+    Ukuran dan waktu modifikasi file sumber, untuk mendeteksi artefak yang sudah usang.
+    """
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime': int(stat.st_mtime)}
@@ -0,0 +1,202 @@
+"""
+Pembentukan grid dan agregasi fitur per sel, setara dengan Fase 1.3 di notebook
+(demografi dari kelurahan yang memuat centroid sel, gempa dalam buffer 10 km di sekitar sel,
+POI di dalam sel), tetapi tervektorisasi sehingga bisa dipakai untuk grid yang jauh lebih halus.
+"""
+import math
+
+import numpy as np
+import pandas as pd
+import shapely
+
+from siagagempa.config import (
+    BUFFER_GEMPA_KM, DEMOG_FEATURE_COLUMNS, POI_CATEGORY_COLUMNS, SEISMIC_WINDOWS_YEARS, NEAREST_GEMPA_K
+)
+from siagagempa.seismic_index import metric_xy
+
+# Ukuran grid bawaan notebook (sekitar 5 km)
+GRID_SIZE_DEGREE = 0.045
+
+GEMPA_FEATURE_COLUMNS = ['count_gempa', 'max_mag', 'avg_depth']
+GRID_FEATURE_COLUMNS = DEMOG_FEATURE_COLUMNS + GEMPA_FEATURE_COLUMNS + list(POI_CATEGORY_COLUMNS.values())
+
+# Kolom placeholder input pengguna yang dipakai saat pelatihan model (Fase 1.4)
+USER_PLACEHOLDER_FEATURES = {
+    'user_input_jumlah_kk': 0,
+    'user_input_rasio_lp': 1.0,
+    'user_ada_rs': 0,
+    'user_ada_sekolah': 0,
+    'user_ada_pemerintahan': 0,
+    'user_ada_bangunan_biasa': 0,
+    'user_ada_fasos_lain': 0,
+}
+
+
+class GridSpec:
+    """
+    Grid geografis EPSG:4326 yang sejajar dengan kelipatan `size` derajat, seperti di notebook.
+    Sel (row, col) memiliki sudut kiri bawah (x_start + col * size, y_start + row * size).
+    """
+
+    def __init__(self, bounds, size=GRID_SIZE_DEGREE):
+        min_lon, min_lat, max_lon, max_lat = bounds
+        self.size = size
+        self.x_start = math.floor(min_lon / size) * size
+        self.y_start = math.floor(min_lat / size) * size
+        self.n_cols = len(np.arange(self.x_start, math.ceil(max_lon / size) * size, size))
+        self.n_rows = len(np.arange(self.y_start, math.ceil(max_lat / size) * size, size))
+
+    def cells(self, row_start=0, row_end=None, col_start=0, col_end=None):
+        """
+        DataFrame sel untuk blok baris/kolom tertentu: grid_id, sudut, dan centroid.
+        """
+        row_end = self.n_rows if row_end is None else min(row_end, self.n_rows)
+        col_end = self.n_cols if col_end is None else min(col_end, self.n_cols)
+        cols, rows = np.meshgrid(np.arange(col_start, col_end), np.arange(row_start, row_end))
+        cols, rows = cols.ravel(), rows.ravel()
+        # Sama dengan np.arange(start, stop, size) di notebook: start + i * size
+        xmin = self.x_start + cols * self.size
+        ymin = self.y_start + rows * self.size
+        return pd.DataFrame({
+            'grid_id': [f"{y:.5f}_{x:.5f}" for y, x in zip(ymin, xmin)],
+            'xmin': xmin, 'ymin': ymin, 'xmax': xmin + self.size, 'ymax': ymin + self.size,
+        })
+
+    def tiles(self, tile_cells):
+        """
+        Membagi grid menjadi blok (row_start, row_end, col_start, col_end) berukuran tile_cells x tile_cells.
+        """
+        return [
+            (r, min(r + tile_cells, self.n_rows), c, min(c + tile_cells, self.n_cols))
+            for r in range(0, self.n_rows, tile_cells)
+            for c in range(0, self.n_cols, tile_cells)
+        ]
+
+
+def cell_polygons(cells):
+    return shapely.box(cells['xmin'], cells['ymin'], cells['xmax'], cells['ymax'])
+
+
+def cell_polygons_metric(cells, spatial_index):
+    """
+    Sel dalam CRS metrik. Sel persegi lon/lat tetap persegi di EPSG:3857, jadi cukup memproyeksikan sudutnya.
+    """
+    x_min, y_min = spatial_index.metric_xy(cells['xmin'], cells['ymin'])
+    x_max, y_max = spatial_index.metric_xy(cells['xmax'], cells['ymax'])
+    return shapely.box(x_min, y_min, x_max, y_max)
+
+
+def filter_cells_in_province(cells, spatial_index):
+    """
+    Menyisakan sel yang berpotongan dengan setidaknya satu poligon kelurahan (wilayah Jawa Barat).
+    """
+    idx_cell, _ = spatial_index.kelurahan_tree.query(cell_polygons(cells), predicate='intersects')
+    return cells.iloc[np.unique(idx_cell)].reset_index(drop=True)
+
+
+def compute_cell_features(cells, spatial_index, gdf_gempa, gdf_poi, gdf_demografi):
+    """
+    Menghitung fitur model untuk setiap sel grid. Mengembalikan DataFrame sejajar dengan `cells`
+    berisi kode_desa_spatial dan semua kolom GRID_FEATURE_COLUMNS.
+    """
+    n_cells = len(cells)
+    features = pd.DataFrame(index=cells.index)
+
+    # --- Demografi: kelurahan yang memuat centroid sel ---
+    centroids = shapely.points((cells['xmin'] + cells['xmax']) / 2, (cells['ymin'] + cells['ymax']) / 2)
+    idx_kel = spatial_index.locate_kelurahan(centroids)
+    in_kel = idx_kel >= 0
+    kelurahan = spatial_index.kelurahan
+    demog_cols = (['kode_desa_spatial'] if 'kode_desa_spatial' in kelurahan.columns else []) + DEMOG_FEATURE_COLUMNS
+    for col in demog_cols:
+        values = np.zeros(n_cells)
+        if col in kelurahan.columns:
+            values[in_kel] = kelurahan.column(col)[idx_kel[in_kel]]
+        features[col] = values
+
+    # --- Gempa: buffer BUFFER_GEMPA_KM di sekitar sel (di CRS metrik) ---
+    polygons_metric = cell_polygons_metric(cells, spatial_index)
+    idx_cell, idx_gempa = spatial_index.gempa_tree.query(
+        shapely.buffer(polygons_metric, BUFFER_GEMPA_KM * 1000, quad_segs=spatial_index.BUFFER_QUAD_SEGS),
+        predicate='intersects'
+    )
+    count_gempa = np.bincount(idx_cell, minlength=n_cells)
+    max_mag = np.full(n_cells, -np.inf)
+    np.maximum.at(max_mag, idx_cell, gdf_gempa['mag'].to_numpy(dtype=float)[idx_gempa])
+    depth_sum = np.bincount(idx_cell, weights=gdf_gempa['depth'].to_numpy(dtype=float)[idx_gempa], minlength=n_cells)
+    has_gempa = count_gempa > 0
+    features['count_gempa'] = count_gempa
+    features['max_mag'] = np.where(has_gempa, max_mag, 0.0)
+    features['avg_depth'] = np.divide(depth_sum, count_gempa, out=np.zeros(n_cells), where=has_gempa)
+
+    # --- POI di dalam sel, per kategori ---
+    idx_cell, idx_poi = spatial_index.poi_tree.query(polygons_metric, predicate='intersects')
+    poi_store = spatial_index.poi
+    for category, col in POI_CATEGORY_COLUMNS.items():
+        code = poi_store.category_code(category)
+        features[col] = np.bincount(idx_cell[poi_store.category_codes[idx_poi] == code], minlength=n_cells) if code is not None else 0
+
+    # Pembersihan NaN/inf seperti Fase 1.4
+    numeric = features.columns
+    features[numeric] = features[numeric].replace([np.inf, -np.inf], np.nan).fillna(0)
+    return features
+
+
+def compute_cell_window_features(cells, time_index, windows_years=SEISMIC_WINDOWS_YEARS):
+    """
+    Jumlah gempa dan magnitudo maksimum per jendela waktu untuk gempa berjarak <= BUFFER_GEMPA_KM dari sel
+    (kotak sel di CRS metrik, padanan buffer sel pada count_gempa/max_mag). `cells` berisi kolom
+    xmin/ymin/xmax/ymax EPSG:4326. Mengembalikan DataFrame sejajar dengan `cells`.
+    """
+    x_min, y_min = metric_xy(cells['xmin'], cells['ymin'])
+    x_max, y_max = metric_xy(cells['xmax'], cells['ymax'])
+    features = time_index.window_features(x_min, y_min, x_max, y_max, windows_years, BUFFER_GEMPA_KM * 1000)
+    return pd.DataFrame(features, index=cells.index)
+
+
+def compute_cell_nearest_features(cells, nearest_index, k=NEAREST_GEMPA_K, include_poi=True):
+    """
+    Jarak dari titik tengah sel ke fasilitas terdekat per kategori dan ringkasan K gempa terdekat
+    (lihat siagagempa.nearest_index). Mengembalikan DataFrame sejajar dengan `cells`.
+    """
+    x, y = metric_xy((cells['xmin'] + cells['xmax']) / 2, (cells['ymin'] + cells['ymax']) / 2)
+    return pd.DataFrame(nearest_index.features(x, y, k_gempa=k, include_poi=include_poi), index=cells.index)
+
+
+def drop_empty_cells(cells, features):
+    """
+    Membuang sel yang semua fitur numeriknya nol (langkah 5 di Fase 1.3).
+    """
+    keep = (features[GRID_FEATURE_COLUMNS].sum(axis=1) != 0).to_numpy()
+    return cells[keep].reset_index(drop=True), features[keep].reset_index(drop=True)
+
+
+def update_cell_aggregates(gdf_grid, idx_cell, mags, depths):
+    """
+    Memperbarui count_gempa, avg_depth (rata-rata berjalan), dan max_mag untuk sel terdampak (in place).
+    Mengembalikan indeks sel yang berubah.
+    """
+    n_cells = len(gdf_grid)
+    added = np.bincount(idx_cell, minlength=n_cells)
+    depth_sum = np.bincount(idx_cell, weights=depths, minlength=n_cells)
+    new_max = np.full(n_cells, -np.inf)
+    np.maximum.at(new_max, idx_cell, mags)
+    changed = np.flatnonzero(added)
+
+    count_old = gdf_grid['count_gempa'].to_numpy(dtype=float)[changed]
+    depth_old = gdf_grid['avg_depth'].to_numpy(dtype=float)[changed]
+    count_new = count_old + added[changed]
+    gdf_grid.loc[gdf_grid.index[changed], 'avg_depth'] = (depth_old * count_old + depth_sum[changed]) / count_new
+    gdf_grid.loc[gdf_grid.index[changed], 'count_gempa'] = count_new.astype(np.int64)
+    # Sel tanpa gempa sebelumnya menyimpan max_mag 0 sebagai pengisi, bukan magnitudo sebenarnya
+    max_old = gdf_grid['max_mag'].to_numpy(dtype=float)[changed]
+    gdf_grid.loc[gdf_grid.index[changed], 'max_mag'] = np.where(count_old > 0, np.maximum(max_old, new_max[changed]), new_max[changed])
+    return changed
+
+
+def model_input_frame(features, model_expected_features):
+    """
+    Menambahkan placeholder input pengguna lalu menyusun kolom sesuai urutan yang diharapkan model.
+    """
+    X = features.assign(**USER_PLACEHOLDER_FEATURES)
+    return X.reindex(columns=model_expected_features, fill_value=0.0)
@@ -0,0 +1,283 @@
+"""
+Ingestion katalog gempa secara inkremental, tanpa menjalankan ulang notebook.
+
+    python -m siagagempa.ingest_gempa query_2025.csv [query_2026.csv ...] [--dry-run]
+
+Langkah-langkahnya:
+1. Membaca CSV katalog USGS dan membersihkannya seperti notebook (dropna lat/lon/mag/depth/place,
+   mag/depth numerik), lalu menyisakan gempa di dalam wilayah Jawa Barat (poligon kelurahan).
+2. Membuang gempa yang sudah ada (berdasarkan `id` USGS, atau time+lat+lon jika id kosong).
+3. Menghitung ulang agregat gempa (count_gempa, avg_depth, max_mag) dari katalog gabungan hanya untuk sel
+   final_grid yang buffer BUFFER_GEMPA_KM-nya memuat gempa baru, lalu memprediksi ulang level risiko
+   sel-sel tersebut saja dan merender ulang tile peta risiko yang terdampak.
+4. Jika grid memuat fitur gempa berjendela waktu (count_gempa_<N>th, max_mag_<N>th), fitur tersebut dihitung
+   ulang untuk semua sel dari indeks waktu katalog gabungan, karena acuan jendelanya (gempa terakhir) bergeser.
+5. Jika grid memuat fitur K gempa terdekat (jarak_gempa_terdekat_km, dst.), fitur tersebut dihitung ulang untuk
+   semua sel dari KDTree katalog gabungan (lihat siagagempa.nearest_index); jarak fasilitas tidak berubah.
+6. Menulis tile dan grid, lalu terakhir menambahkan gempa baru ke gdf_gempa_jabar_processed.gpkg. Jika proses
+   terputus sebelum langkah terakhir, menjalankan ulang ingest menghitung ulang sel yang sama dari katalog.
+
+File ditulis ke berkas sementara lalu diganti secara atomik, sehingga aplikasi yang sedang berjalan
+tidak pernah membaca file setengah jadi; aplikasi memuat ulang data sendiri saat sidik jari file berubah.
+Sel yang sebelumnya dibuang karena semua fiturnya nol tidak ditambahkan ke grid.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+
+from siagagempa.config import (
+    GD_GEMPA_JABAR_PATH, GD_DEMOGRAFI_JABAR_CLEAN_PATH, BUFFER_GEMPA_KM, METRIC_CRS
+)
+from siagagempa.spatial_index import SpatialIndex
+from siagagempa.seismic_index import SeismicTimeIndex, window_columns
+from siagagempa.risk_tiles import RISK_TILES_DIR, DEFAULT_GRID_SOURCE, update_tiles
+from siagagempa.nearest_index import NearestIndex, nearest_gempa_columns
+from siagagempa.grid import update_cell_aggregates, compute_cell_window_features, compute_cell_nearest_features
+
+REQUIRED_COLUMNS = ['latitude', 'longitude', 'mag', 'depth', 'place']
+DEDUPE_FALLBACK_COLUMNS = ['time', 'latitude', 'longitude']
+
+
+def read_catalog(paths):
+    """
+    Membaca dan membersihkan CSV katalog USGS seperti di notebook. Mengembalikan GeoDataFrame EPSG:4326.
+    """
+    df = pd.concat([pd.read_csv(path) for path in paths], ignore_index=True)
+    df = df.dropna(subset=REQUIRED_COLUMNS)
+    df['mag'] = pd.to_numeric(df['mag'], errors='coerce')
+    df['depth'] = pd.to_numeric(df['depth'], errors='coerce')
+    df = df.dropna(subset=['mag', 'depth']).reset_index(drop=True)
+    return gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df['longitude'], df['latitude']), crs="EPSG:4326")
+
+
+def filter_in_province(gdf_new, gdf_demografi):
+    """
+    Menyisakan gempa yang berpotongan dengan poligon kelurahan (pengganti batas provinsi di notebook).
+    """
+    if gdf_demografi.crs is not None and gdf_demografi.crs != "EPSG:4326":
+        gdf_demografi = gdf_demografi.to_crs("EPSG:4326")
+    tree = shapely.STRtree(np.asarray(gdf_demografi.geometry.values))
+    idx_gempa, _ = tree.query(np.asarray(gdf_new.geometry.values), predicate='intersects')
+    return gdf_new.iloc[np.unique(idx_gempa)].reset_index(drop=True)
+
+
+def _dedupe_keys(df):
+    """
+    Kunci unik per gempa: id USGS, atau gabungan time+lat+lon jika id kosong.
+    """
+    ids = df['id'].astype(object) if 'id' in df.columns else pd.Series(np.nan, index=df.index, dtype=object)
+    fallback = df.reindex(columns=DEDUPE_FALLBACK_COLUMNS).astype(str).agg('|'.join, axis=1)
+    return ids.where(ids.notna(), fallback).astype(str)
+
+
+def select_new_events(gdf_new, gdf_existing):
+    """
+    Membuang gempa yang sudah ada di katalog maupun duplikat di dalam CSV baru (menyimpan versi `updated` terbaru).
+    """
+    if 'updated' in gdf_new.columns:
+        gdf_new = gdf_new.sort_values('updated', kind='stable')
+    keys = _dedupe_keys(gdf_new)
+    gdf_new = gdf_new[~keys.duplicated(keep='last')]
+    keys = keys[gdf_new.index]
+    known = set(_dedupe_keys(gdf_existing))
+    return gdf_new[~keys.isin(known).to_numpy()].reset_index(drop=True)
+
+
+def _conform_schema(gdf_new, gdf_existing):
+    """
+    Menyamakan kolom dan tipe data dengan GeoPackage gempa yang sudah ada.
+    """
+    geometry_name = gdf_existing.geometry.name
+    columns = [col for col in gdf_existing.columns if col != geometry_name]
+    out = pd.DataFrame(gdf_new).reindex(columns=columns)
+    for col in columns:
+        if pd.api.types.is_numeric_dtype(gdf_existing[col]):
+            out[col] = pd.to_numeric(out[col], errors='coerce')
+    out[geometry_name] = gdf_new.geometry.values
+    return gpd.GeoDataFrame(out, geometry=geometry_name, crs=gdf_new.crs)
+
+
+def _replace_atomic(path, write):
+    """
+    Menjalankan `write(tmp_path)` pada salinan di folder yang sama lalu mengganti file asli secara atomik.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(suffix=os.path.splitext(path)[1], dir=directory)
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def append_events(gdf_new, gempa_path=GD_GEMPA_JABAR_PATH, layer=None):
+    """
+    Menambahkan gempa baru ke GeoPackage tanpa menulis ulang baris yang sudah ada.
+    """
+    if layer is None:
+        layer = gpd.list_layers(gempa_path)['name'].iloc[0]
+
+    def write(tmp_path):
+        shutil.copyfile(gempa_path, tmp_path)
+        gdf_new.to_file(tmp_path, layer=layer, driver='GPKG', mode='a')
+
+    _replace_atomic(gempa_path, write)
+
+
+def affected_cells(gdf_grid, gdf_new):
+    """
+    Pasangan (indeks sel, indeks gempa baru) untuk sel yang buffer BUFFER_GEMPA_KM-nya memuat gempa baru,
+    dengan predikat dan resolusi buffer yang sama seperti pembangunan grid.
+    """
+    buffers = shapely.buffer(
+        np.asarray(gdf_grid.geometry.to_crs(METRIC_CRS).values), BUFFER_GEMPA_KM * 1000,
+        quad_segs=SpatialIndex.BUFFER_QUAD_SEGS
+    )
+    tree = shapely.STRtree(buffers)
+    idx_gempa, idx_cell = tree.query(np.asarray(gdf_new.geometry.to_crs(METRIC_CRS).values), predicate='intersects')
+    return idx_cell, idx_gempa
+
+
+def recompute_cell_aggregates(gdf_grid, cells, gdf_catalog):
+    """
+    Menghitung ulang count_gempa, avg_depth, dan max_mag sel `cells` dari katalog lengkap (in place),
+    mulai dari nilai pengisi 0. Hasilnya sama walau gempa yang sama diproses dua kali, sehingga ingest
+    yang terputus aman dijalankan ulang. Mengembalikan indeks sel yang berubah.
+    """
+    rows = gdf_grid.index[cells]
+    gdf_grid.loc[rows, 'count_gempa'] = 0
+    gdf_grid.loc[rows, 'avg_depth'] = 0.0
+    gdf_grid.loc[rows, 'max_mag'] = 0.0
+    sub_cell, idx_gempa = affected_cells(gdf_grid.iloc[cells], gdf_catalog)
+    update_cell_aggregates(
+        gdf_grid, cells[sub_cell],
+        gdf_catalog['mag'].to_numpy(dtype=float)[idx_gempa], gdf_catalog['depth'].to_numpy(dtype=float)[idx_gempa]
+    )
+    return cells
+
+
+def predict_cell_levels(gdf_grid, rows=None):
+    """
+    Level risiko sel grid (semua, atau hanya indeks `rows`) dengan placeholder input pengguna seperti saat pelatihan.
+    """
+    from siagagempa.grid import model_input_frame
+    from siagagempa.resources import load_model
+
+    model, label_encoder, model_expected_features = load_model()
+    subset = gdf_grid if rows is None else gdf_grid.iloc[rows]
+    X = model_input_frame(pd.DataFrame(subset.drop(columns=[gdf_grid.geometry.name, 'vulnerability_level'], errors='ignore')),
+                          model_expected_features)
+    return label_encoder.inverse_transform(model.predict(X))
+
+
+def update_cell_window_features(gdf_grid, gdf_catalog):
+    """
+    Menghitung ulang fitur gempa berjendela waktu untuk semua sel dari katalog lengkap (in place).
+    """
+    time_index = SeismicTimeIndex.from_geodataframe(gdf_catalog)
+    bounds = gdf_grid.geometry.to_crs("EPSG:4326").bounds
+    cells = bounds.rename(columns={'minx': 'xmin', 'miny': 'ymin', 'maxx': 'xmax', 'maxy': 'ymax'})
+    features = compute_cell_window_features(cells, time_index)
+    for col in features.columns:
+        gdf_grid[col] = features[col].to_numpy()
+
+
+def update_cell_nearest_gempa_features(gdf_grid, gdf_catalog):
+    """
+    Menghitung ulang fitur K gempa terdekat untuk semua sel dari katalog lengkap (in place).
+    """
+    gempa_metric = gdf_catalog.geometry.to_crs(METRIC_CRS).values
+    nearest_index = NearestIndex(gempa_xy=(shapely.get_x(gempa_metric), shapely.get_y(gempa_metric)),
+                                 gempa_mag=gdf_catalog['mag'].to_numpy(dtype=float))
+    bounds = gdf_grid.geometry.to_crs("EPSG:4326").bounds
+    cells = bounds.rename(columns={'minx': 'xmin', 'miny': 'ymin', 'maxx': 'xmax', 'maxy': 'ymax'})
+    features = compute_cell_nearest_features(cells, nearest_index, include_poi=False)
+    for col in features.columns:
+        gdf_grid[col] = features[col].to_numpy()
+
+
+def ingest(csv_paths, gempa_path=GD_GEMPA_JABAR_PATH, grid_path=DEFAULT_GRID_SOURCE,
+           demografi_path=GD_DEMOGRAFI_JABAR_CLEAN_PATH, tiles_dir=RISK_TILES_DIR, dry_run=False):
+    """
+    Menjalankan seluruh langkah ingestion. Mengembalikan dict ringkasan.
+    """
+    gdf_catalog = read_catalog(csv_paths)
+    gdf_in_province = filter_in_province(gdf_catalog, gpd.read_file(demografi_path))
+    gdf_existing = gpd.read_file(gempa_path)
+    gdf_new = select_new_events(gdf_in_province, gdf_existing)
+    summary = {
+        'rows_read': len(gdf_catalog), 'in_province': len(gdf_in_province), 'new_events': len(gdf_new),
+        'cells_updated': 0, 'levels_changed': {}, 'tiles_rendered': 0,
+    }
+    if gdf_new.empty:
+        return summary
+
+    gdf_grid = gpd.read_file(grid_path)
+    gdf_catalog = pd.concat([gdf_existing, _conform_schema(gdf_new, gdf_existing)], ignore_index=True)
+    if 'vulnerability_level' not in gdf_grid.columns:
+        # Sekali saja: simpan level semua sel agar ingestion berikutnya cukup memprediksi sel terdampak
+        gdf_grid['vulnerability_level'] = predict_cell_levels(gdf_grid)
+    changed = recompute_cell_aggregates(gdf_grid, np.unique(affected_cells(gdf_grid, gdf_new)[0]), gdf_catalog)
+    old_levels = gdf_grid['vulnerability_level'].to_numpy(dtype=object)[changed]
+    new_levels = predict_cell_levels(gdf_grid, changed)
+    gdf_grid.loc[gdf_grid.index[changed], 'vulnerability_level'] = new_levels
+    summary['cells_updated'] = len(changed)
+    has_window_columns = any(col in gdf_grid.columns for col in window_columns())
+    has_nearest_columns = all(col in gdf_grid.columns for col in nearest_gempa_columns())
+    if has_window_columns:
+        update_cell_window_features(gdf_grid, gdf_catalog)
+    if has_nearest_columns:
+        update_cell_nearest_gempa_features(gdf_grid, gdf_catalog)
+    summary['levels_changed'] = {
+        gdf_grid['grid_id'].iloc[i]: f"{old} -> {new}" for i, old, new in zip(changed, old_levels, new_levels) if old != new
+    }
+    if dry_run:
+        return summary
+
+    # Urutan penulisan: tile, grid, lalu katalog. Selama katalog belum memuat gempa baru, ingest ulang
+    # memilih gempa yang sama lagi dan menghitung ulang sel dari katalog, jadi hasilnya tetap sama
+    if tiles_dir:
+        level_changed = np.zeros(len(gdf_grid), dtype=bool)
+        level_changed[changed] = old_levels != new_levels
+        # Tile hanya bergantung pada level risiko, jadi cukup render ulang tile berisi sel yang levelnya berubah
+        rendered = update_tiles(gdf_grid, level_changed, tiles_dir, source=grid_path)
+        summary['tiles_rendered'] = rendered or 0
+    layer = gpd.list_layers(grid_path)['name'].iloc[0]
+    _replace_atomic(grid_path, lambda tmp_path: gdf_grid.to_file(tmp_path, layer=layer, driver='GPKG'))
+    append_events(_conform_schema(gdf_new, gdf_existing), gempa_path)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Menambahkan gempa baru dari CSV katalog USGS secara inkremental.")
+    parser.add_argument('csv', nargs='+', help="File CSV katalog USGS (format query.csv)")
+    parser.add_argument('--gempa', default=GD_GEMPA_JABAR_PATH)
+    parser.add_argument('--grid', default=DEFAULT_GRID_SOURCE)
+    parser.add_argument('--demografi', default=GD_DEMOGRAFI_JABAR_CLEAN_PATH)
+    parser.add_argument('--tiles', default=RISK_TILES_DIR, help="Folder tile peta risiko ('' untuk melewati)")
+    parser.add_argument('--dry-run', action='store_true', help="Hanya melaporkan perubahan tanpa menulis file")
+    args = parser.parse_args()
+
+    summary = ingest(args.csv, args.gempa, args.grid, args.demografi, args.tiles, dry_run=args.dry_run)
+    print(f"{summary['rows_read']} baris dibaca, {summary['in_province']} di Jawa Barat, {summary['new_events']} gempa baru.")
+    print(f"{summary['cells_updated']} sel grid diperbarui, {len(summary['levels_changed'])} berubah level risiko.")
+    for grid_id, change in summary['levels_changed'].items():
+        print(f"  - {grid_id}: {change}")
+    if summary['tiles_rendered']:
+        print(f"{summary['tiles_rendered']} tile peta risiko dirender ulang.")
+    if summary['new_events'] and not args.dry_run:
+        print("Grid kepadatan (mode 'grid') kini usang; bangun ulang dengan: python -m siagagempa.density_grid build")
+        print("Bundel data startup kini usang; bangun ulang dengan: python -m siagagempa.data_bundle build")
+        print("Ringkasan wilayah kini usang; bangun ulang dengan: python -m siagagempa.admin_rollup build")
+
+
+if __name__ == '__main__':
+    main()
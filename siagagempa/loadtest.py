@@ -0,0 +1,693 @@
+"""
+Uji beban: N pengguna simulasi bersamaan terhadap satu instance lokal.
+
+Target:
+    app      server Streamlit (`streamlit run 1_🏠_Beranda.py`) lewat websocket-nya sendiri (/_stcore/stream),
+             seperti browser: setiap pengguna memegang satu sesi di halaman Prediksi Risiko dan mengulang alur
+             klik peta -> konfirmasi titik -> ubah isian -> prediksi (sampai hasil dan peta hasil terkirim).
+             Interaksi di dalam fragment dikirim sebagai rerun fragment, sama seperti frontend.
+    service  layanan HTTP siagagempa.service: satu POST /predict per alur.
+
+Dengan --start, server dijalankan sebagai proses anak di port bebas lalu dimatikan setelah uji; tanpa --start
+gunakan --url dan --pid (untuk pemantauan sumber daya). Pengguna ditambah bertahap (--users 1 2 4 8), setiap
+tingkat berjalan --duration detik dengan jeda berpikir --think-s antar langkah. CPU dan RSS proses server
+(beserta proses anaknya) direkam per --interval detik.
+
+Target app bergantung pada protokol internal Streamlit, bukan API publik: pesan protobuf BackMsg/ForwardMsg
+(streamlit.proto), rerun_script dengan fragment_id/page_script_hash, pesan navigation, dan nama komponen
+streamlit_folium. Protokol ini bisa berubah di rilis minor mana pun, jadi versi Streamlit lokal dicek saat
+start terhadap rentang yang sudah diuji (SUPPORTED_STREAMLIT_VERSIONS, mulai dari versi di requirements.txt).
+Dengan --url, server harus memakai versi Streamlit yang sama dengan klien ini.
+
+Laporan JSON berisi distribusi latensi per langkah dan per alur, deret waktu sumber daya, dan estimasi
+kapasitas: tingkat pengguna terbesar yang p95 alurnya masih di bawah --slo-ms tanpa galat, serta proyeksi
+memori (RSS dasar + kenaikan per pengguna) terhadap --memory-budget-mb.
+
+Pemakaian:
+    python -m siagagempa.loadtest app --start --users 1 2 4 8 --duration 30 --output loadtest.json
+    python -m siagagempa.loadtest service --start --users 4 16 64 --think-s 0 --slo-ms 500
+    python -m siagagempa.loadtest app --url http://localhost:8501 --pid 12345
+"""
+import argparse
+import asyncio
+import base64
+import datetime
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlsplit
+
+import numpy as np
+
+from siagagempa.config import FEATURE_MODE
+from siagagempa.risk_tiles import DEFAULT_GRID_SOURCE
+
+HOME_SCRIPT = '1_🏠_Beranda.py'
+PREDICTION_PAGE = 'Prediksi_Risiko'
+DEFAULT_USERS = [1, 2, 4, 8]
+DEFAULT_THINK_S = {'app': 2.0, 'service': 0.0}
+DEFAULT_SLO_MS = {'app': 3000.0, 'service': 500.0}
+STARTUP_TIMEOUT_S = 180
+
+# Label widget di halaman Prediksi Risiko yang dipakai alur simulasi
+LABEL_CONFIRM = "✅ Konfirmasi Pilihan Titik"
+LABEL_PREDICT = "Prediksi Tingkat Risiko Fisik dan Sosial"
+LABEL_JUMLAH_KK = "**Jumlah Kepala Keluarga (KK) di lokasi**"
+RESULT_HEADER = "📊 Hasil Prediksi"
+FOLIUM_COMPONENT = 'streamlit_folium.st_folium'
+# Rentang versi Streamlit (major, minor) yang protokol websocket-nya sudah diuji dengan target app
+SUPPORTED_STREAMLIT_VERSIONS = ((1, 46), (1, 65))
+
+
+# --- TITIK UJI ---
+def sample_points(n_points, seed=0, grid_path=DEFAULT_GRID_SOURCE):
+    """
+    Titik acak di sekitar centroid sel grid risiko (tersebar di seluruh Jawa Barat), tanpa memuat data spasial lain.
+    """
+    import geopandas as gpd
+
+    grid = gpd.read_file(grid_path).to_crs("EPSG:4326")
+    centroids = grid.geometry.representative_point()
+    rng = np.random.default_rng(seed)
+    idx = rng.integers(0, len(grid), n_points)
+    jitter = rng.uniform(-0.005, 0.005, (n_points, 2))
+    return np.column_stack([centroids.y.to_numpy()[idx], centroids.x.to_numpy()[idx]]) + jitter
+
+
+# --- PEMANTAUAN SUMBER DAYA ---
+def _process_tree(pid):
+    """
+    [(cpu_detik_kumulatif, rss_byte)] untuk proses `pid` dan semua turunannya; psutil bila tersedia, selain itu /proc.
+    """
+    try:
+        import psutil
+    except ImportError:
+        return _process_tree_from_proc(pid)
+
+    try:
+        root = psutil.Process(pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return []
+    usage = []
+    for process in processes:
+        try:
+            cpu = process.cpu_times()
+            usage.append((cpu.user + cpu.system, process.memory_info().rss))
+        except psutil.NoSuchProcess:
+            continue
+    return usage
+
+
+def _process_tree_from_proc(pid):
+    if not os.path.isdir('/proc'):
+        return []
+    ticks, page_size = os.sysconf('SC_CLK_TCK'), os.sysconf('SC_PAGE_SIZE')
+    stats = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # Nama proses di dalam tanda kurung bisa mengandung spasi, jadi field dihitung setelah ')'
+                fields = f.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        stats[int(entry)] = (int(fields[1]), (int(fields[11]) + int(fields[12])) / ticks, int(fields[21]) * page_size)
+    tree, frontier = set(), {pid}
+    while frontier:
+        tree |= frontier
+        frontier = {p for p, (ppid, _, _) in stats.items() if ppid in frontier and p not in tree}
+    return [(stats[p][1], stats[p][2]) for p in tree if p in stats]
+
+
+class ResourceMonitor:
+    """
+    Sampler latar belakang: CPU (% satu core, dijumlah atas proses) dan RSS proses server per interval,
+    ditandai dengan tingkat pengguna yang sedang berjalan.
+    """
+
+    def __init__(self, pid, interval=1.0):
+        self.pid = pid
+        self.interval = interval
+        self.samples = []
+        self.label = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        start = previous_t = time.perf_counter()
+        previous_cpu = sum(cpu for cpu, _ in _process_tree(self.pid))
+        while not self._stop.wait(self.interval):
+            usage = _process_tree(self.pid)
+            now, cpu = time.perf_counter(), sum(cpu for cpu, _ in usage)
+            self.samples.append({
+                't_s': round(now - start, 3), 'users': self.label,
+                'cpu_percent': round(100 * max(cpu - previous_cpu, 0.0) / (now - previous_t), 1),
+                'rss_mb': round(sum(rss for _, rss in usage) / 2**20, 1), 'processes': len(usage),
+            })
+            previous_t, previous_cpu = now, cpu
+
+    def summary(self, label):
+        samples = [s for s in self.samples if s['users'] == label]
+        if not samples:
+            return {}
+        cpu = np.array([s['cpu_percent'] for s in samples])
+        rss = np.array([s['rss_mb'] for s in samples])
+        return {'cpu_percent_mean': float(cpu.mean()), 'cpu_percent_max': float(cpu.max()),
+                'rss_mb_mean': float(rss.mean()), 'rss_mb_max': float(rss.max())}
+
+
+# --- KLIEN WEBSOCKET MINIMAL ---
+class WebSocket:
+    """
+    Klien websocket minimal (RFC 6455, frame biner tanpa ekstensi) di atas asyncio streams.
+    """
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+
+    @classmethod
+    async def connect(cls, host, port, path, subprotocol=None):
+        reader, writer = await asyncio.open_connection(host, port, limit=2**26)
+        key = base64.b64encode(os.urandom(16)).decode('ascii')
+        lines = [f"GET {path} HTTP/1.1", f"Host: {host}:{port}", "Upgrade: websocket", "Connection: Upgrade",
+                 f"Sec-WebSocket-Key: {key}", "Sec-WebSocket-Version: 13"]
+        if subprotocol:
+            lines.append(f"Sec-WebSocket-Protocol: {subprotocol}")
+        writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        status = await reader.readline()
+        if b' 101 ' not in status:
+            writer.close()
+            raise ConnectionError(f"Handshake websocket gagal: {status.decode('latin-1').strip()}")
+        while (await reader.readline()) not in (b'\r\n', b'\n', b''):
+            pass
+        return cls(reader, writer)
+
+    async def send(self, payload, opcode=0x2):
+        n = len(payload)
+        header = bytearray([0x80 | opcode])
+        if n < 126:
+            header.append(0x80 | n)
+        elif n < 2**16:
+            header += bytes([0x80 | 126]) + n.to_bytes(2, 'big')
+        else:
+            header += bytes([0x80 | 127]) + n.to_bytes(8, 'big')
+        mask = os.urandom(4)
+        masked = np.frombuffer(payload, dtype=np.uint8) ^ np.resize(np.frombuffer(mask, dtype=np.uint8), n)
+        self.writer.write(bytes(header) + mask + masked.tobytes())
+        await self.writer.drain()
+
+    async def recv(self):
+        message = bytearray()
+        while True:
+            b0, b1 = await self.reader.readexactly(2)
+            opcode, n = b0 & 0x0F, b1 & 0x7F
+            if n >= 126:
+                n = int.from_bytes(await self.reader.readexactly(2 if n == 126 else 8), 'big')
+            mask = await self.reader.readexactly(4) if b1 & 0x80 else None
+            data = await self.reader.readexactly(n)
+            if mask is not None:
+                data = (np.frombuffer(data, dtype=np.uint8) ^ np.resize(np.frombuffer(mask, dtype=np.uint8), n)).tobytes()
+            if opcode == 0x8:
+                raise ConnectionError("Websocket ditutup oleh server.")
+            if opcode == 0x9:
+                await self.send(data, opcode=0xA)
+                continue
+            if opcode == 0xA:
+                continue
+            message += data
+            if b0 & 0x80:
+                return bytes(message)
+
+    async def close(self):
+        try:
+            await self.send(b'', opcode=0x8)
+        except ConnectionError:
+            pass
+        self.writer.close()
+
+
+# --- SESI STREAMLIT ---
+def check_streamlit_version():
+    """
+    Menghentikan uji beban dengan pesan jelas jika versi Streamlit di luar SUPPORTED_STREAMLIT_VERSIONS.
+    Mengembalikan string versi yang terpasang.
+    """
+    from importlib.metadata import version, PackageNotFoundError
+
+    try:
+        installed = version('streamlit')
+    except PackageNotFoundError:
+        raise SystemExit("Target app membutuhkan paket streamlit, tetapi paket tersebut tidak terpasang.")
+    major_minor = tuple(int(part) for part in installed.split('.')[:2])
+    (lo_major, lo_minor), (hi_major, hi_minor) = SUPPORTED_STREAMLIT_VERSIONS
+    if not (lo_major, lo_minor) <= major_minor <= (hi_major, hi_minor):
+        raise SystemExit(
+            f"Streamlit {installed} belum didukung uji beban app (diuji untuk {lo_major}.{lo_minor}-{hi_major}.{hi_minor}). "
+            "Klien ini memakai protobuf internal BackMsg/ForwardMsg yang bisa berubah antar versi; pasang versi "
+            "yang didukung, atau uji ulang lalu perbarui SUPPORTED_STREAMLIT_VERSIONS."
+        )
+    return installed
+
+
+class StreamlitSession:
+    """
+    Satu sesi browser: mengirim BackMsg rerun_script dengan state widget dan membaca ForwardMsg sampai skrip selesai.
+    Widget ditemukan dari delta yang diterima (id beserta fragment tempatnya), nilainya disimpan seperti di frontend.
+    """
+
+    def __init__(self, ws, page_name):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        self._BackMsg, self._ForwardMsg, self._WidgetState = BackMsg, ForwardMsg, WidgetState
+        self.ws = ws
+        self.page_name = page_name
+        self.page_script_hash = ''
+        self.widgets = {}
+        self.values = {}
+        self.headings = []
+
+    @classmethod
+    async def open(cls, host, port, page_name=PREDICTION_PAGE):
+        session = cls(await WebSocket.connect(host, port, '/_stcore/stream', subprotocol='streamlit'), page_name)
+        await session.rerun()
+        return session
+
+    def widget(self, kind, label):
+        if (kind, label) not in self.widgets:
+            raise LookupError(f"Widget {kind} '{label}' tidak ditemukan di halaman.")
+        return self.widgets[(kind, label)]
+
+    def set_value(self, kind, label, field, value):
+        widget_id, fragment_id = self.widget(kind, label)
+        state = self._WidgetState(id=widget_id)
+        setattr(state, field, value)
+        self.values[widget_id] = state
+        return fragment_id
+
+    async def click(self, label):
+        widget_id, fragment_id = self.widget('button', label)
+        await self.rerun([self._WidgetState(id=widget_id, trigger_value=True)], fragment_id)
+
+    async def rerun(self, triggers=(), fragment_id=''):
+        message = self._BackMsg()
+        client_state = message.rerun_script
+        # Seperti browser: nama halaman di run pertama, lalu hash halaman dari new_session
+        if self.page_script_hash:
+            client_state.page_script_hash = self.page_script_hash
+        else:
+            client_state.page_name = self.page_name
+        client_state.fragment_id = fragment_id
+        client_state.widget_states.widgets.extend(list(self.values.values()) + list(triggers))
+        await self.ws.send(message.SerializeToString())
+
+        self.headings = []
+        while True:
+            forward = self._ForwardMsg()
+            forward.ParseFromString(await self.ws.recv())
+            kind = forward.WhichOneof('type')
+            if kind == 'delta' and forward.delta.WhichOneof('type') == 'new_element':
+                self._register(forward.delta.new_element, forward.delta.fragment_id)
+            elif kind == 'new_session':
+                self.page_script_hash = forward.new_session.page_script_hash
+            elif kind == 'navigation':
+                # Aplikasi multipage: hash halaman aktif dikirim di pesan navigation setelah new_session
+                self.page_script_hash = forward.navigation.page_script_hash
+            elif kind == 'page_not_found':
+                raise LookupError(f"Halaman '{self.page_name}' tidak ditemukan.")
+            elif kind == 'script_finished':
+                if forward.script_finished == self._ForwardMsg.FINISHED_WITH_COMPILE_ERROR:
+                    raise RuntimeError("Skrip gagal dikompilasi di server.")
+                # Rerun yang dipicu st.rerun() berlanjut dengan run baru; tunggu sampai run terakhir selesai
+                if forward.script_finished != self._ForwardMsg.FINISHED_EARLY_FOR_RERUN:
+                    return
+
+    def _register(self, element, fragment_id):
+        kind = element.WhichOneof('type')
+        if kind == 'exception':
+            raise RuntimeError(f"Exception di aplikasi: {element.exception.type}: {element.exception.message}")
+        if kind == 'heading':
+            self.headings.append(element.heading.body)
+        elif kind in ('button', 'number_input', 'radio'):
+            widget = getattr(element, kind)
+            self.widgets[(kind, widget.label)] = (widget.id, fragment_id)
+        elif kind == 'component_instance' and element.component_instance.component_name == FOLIUM_COMPONENT:
+            # Satu-satunya st_folium adalah peta input (peta hasil berupa HTML statis); id-nya berubah
+            # setiap marker berpindah, jadi selalu diperbarui
+            self.widgets[('component_instance', 'peta_input')] = (element.component_instance.id, fragment_id)
+
+    async def close(self):
+        await self.ws.close()
+
+
+# --- STATISTIK ---
+def _latency_stats(samples):
+    samples = np.asarray(samples, dtype=float) * 1000
+    if not len(samples):
+        return {'n': 0}
+    return {
+        'n': int(len(samples)), 'mean_ms': float(samples.mean()),
+        'p50_ms': float(np.percentile(samples, 50)), 'p95_ms': float(np.percentile(samples, 95)),
+        'p99_ms': float(np.percentile(samples, 99)), 'max_ms': float(samples.max()),
+    }
+
+
+class LevelStats:
+    def __init__(self):
+        self.steps = {}
+        self.flows = []
+        self.errors = []
+
+    def step(self, name, seconds):
+        self.steps.setdefault(name, []).append(seconds)
+
+    def error(self, step, exc):
+        self.errors.append({'step': step, 'error': f"{type(exc).__name__}: {exc}"})
+
+
+async def _timed(stats, name, coroutine):
+    start = time.perf_counter()
+    await coroutine
+    elapsed = time.perf_counter() - start
+    stats.step(name, elapsed)
+    return elapsed
+
+
+# --- ALUR PENGGUNA ---
+async def _app_user(host, port, points, rng, deadline, think_s, stats):
+    """
+    Satu pengguna Streamlit: buka halaman sekali, lalu ulangi alur prediksi sampai `deadline`.
+    """
+    loop = asyncio.get_running_loop()
+    step = 'buka_halaman'
+    session = None
+    try:
+        start = time.perf_counter()
+        session = await StreamlitSession.open(host, port)
+        stats.step(step, time.perf_counter() - start)
+        while True:
+            lat, lon = points[rng.integers(len(points))]
+            flow_s = 0.0
+
+            step = 'klik_peta'
+            await asyncio.sleep(rng.uniform(0, think_s))
+            click = {'last_clicked': {'lat': float(lat), 'lng': float(lon)}, 'zoom': 10}
+            fragment_id = session.set_value('component_instance', 'peta_input', 'json_value', json.dumps(click))
+            flow_s += await _timed(stats, step, session.rerun(fragment_id=fragment_id))
+
+            step = 'konfirmasi'
+            await asyncio.sleep(rng.uniform(0, think_s))
+            flow_s += await _timed(stats, step, session.click(LABEL_CONFIRM))
+
+            step = 'isi_data'
+            await asyncio.sleep(rng.uniform(0, think_s))
+            fragment_id = session.set_value('number_input', LABEL_JUMLAH_KK, 'int_value', int(rng.integers(10, 200)))
+            flow_s += await _timed(stats, step, session.rerun(fragment_id=fragment_id))
+
+            step = 'prediksi'
+            await asyncio.sleep(rng.uniform(0, think_s))
+            flow_s += await _timed(stats, step, session.click(LABEL_PREDICT))
+            if RESULT_HEADER not in session.headings:
+                raise RuntimeError("Hasil prediksi tidak tampil.")
+            stats.flows.append(flow_s)
+            if loop.time() >= deadline:
+                break
+    except Exception as e:
+        stats.error(step, e)
+    finally:
+        if session is not None:
+            await session.close()
+
+
+async def _http_post(reader, writer, host, path, payload):
+    body = json.dumps(payload).encode('utf-8')
+    writer.write((f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                  f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1') + body)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        key, _, value = line.decode('latin-1').partition(':')
+        if key.strip().lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length) or b'null')
+
+
+async def _service_user(host, port, points, rng, deadline, think_s, stats):
+    """
+    Satu klien layanan HTTP: POST /predict berulang di satu koneksi keep-alive sampai `deadline`.
+    """
+    loop = asyncio.get_running_loop()
+    writer = None
+    try:
+        reader, writer = await asyncio.open_connection(host, port)
+        while True:
+            lat, lon = points[rng.integers(len(points))]
+            await asyncio.sleep(rng.uniform(0, think_s))
+            payload = {'latitude': float(lat), 'longitude': float(lon), 'jumlah_kk': int(rng.integers(10, 200))}
+            start = time.perf_counter()
+            status, response = await _http_post(reader, writer, host, '/predict', payload)
+            elapsed = time.perf_counter() - start
+            if status != 200:
+                stats.error('prediksi', RuntimeError(f"HTTP {status}: {response.get('error')}"))
+            else:
+                stats.step('prediksi', elapsed)
+                stats.flows.append(elapsed)
+            if loop.time() >= deadline:
+                break
+    except Exception as e:
+        stats.error('prediksi', e)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+USER_FUNCTIONS = {'app': _app_user, 'service': _service_user}
+
+
+# --- MENJALANKAN SERVER LOKAL ---
+def _free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def _health_ok(host, port, path):
+    try:
+        with socket.create_connection((host, port), timeout=2) as s:
+            s.sendall(f"GET {path} HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode('latin-1'))
+            return b' 200 ' in s.recv(64)
+    except OSError:
+        return False
+
+
+HEALTH_PATHS = {'app': '/_stcore/health', 'service': '/health'}
+
+
+def start_server(target, port, log_path):
+    """
+    Menjalankan aplikasi Streamlit atau layanan HTTP sebagai proses anak dan menunggu sampai sehat.
+    """
+    if target == 'app':
+        command = [sys.executable, '-m', 'streamlit', 'run', HOME_SCRIPT, '--server.headless', 'true',
+                   '--server.port', str(port), '--browser.gatherUsageStats', 'false']
+    else:
+        command = [sys.executable, '-m', 'siagagempa.service', '--port', str(port)]
+    log = open(log_path, 'w')
+    process = subprocess.Popen(command, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + STARTUP_TIMEOUT_S
+    while not _health_ok('127.0.0.1', port, HEALTH_PATHS[target]):
+        if process.poll() is not None or time.monotonic() > deadline:
+            process.kill()
+            raise RuntimeError(f"Server {target} gagal start; lihat '{log_path}'.")
+        time.sleep(0.5)
+    return process
+
+
+# --- UJI BEBAN ---
+async def _run_level(target, host, port, users, duration, think_s, points, seed):
+    stats = LevelStats()
+    deadline = asyncio.get_running_loop().time() + duration
+    user_function = USER_FUNCTIONS[target]
+    await asyncio.gather(*(
+        user_function(host, port, points, np.random.default_rng([seed, users, i]), deadline, think_s, stats)
+        for i in range(users)
+    ))
+    return stats
+
+
+async def _warm_up(target, host, port, points):
+    """
+    Satu alur tanpa dicatat agar cache sumber daya (model, data, indeks) sudah terisi sebelum diukur.
+    """
+    stats = LevelStats()
+    await USER_FUNCTIONS[target](host, port, points, np.random.default_rng(0), 0, 0.0, stats)
+    if stats.errors:
+        raise RuntimeError(f"Pemanasan gagal: {stats.errors[0]['error']}")
+
+
+def estimate_capacity(levels, slo_ms, memory_budget_mb):
+    """
+    Kapasitas dari hasil per tingkat: tingkat terbesar yang lolos SLO (p95 alur, tanpa galat) dan proyeksi memori
+    dari regresi linear RSS maksimum terhadap jumlah pengguna.
+    """
+    passing = [lv for lv in levels if not lv['errors'] and lv['flow'].get('n') and lv['flow']['p95_ms'] <= slo_ms]
+    failing = [lv['users'] for lv in levels if lv not in passing]
+    capacity = {
+        'slo_p95_ms': slo_ms,
+        'max_users_within_slo': max((lv['users'] for lv in passing), default=None),
+        'first_failing_users': min(failing, default=None),
+    }
+    memory = [(lv['users'], lv['resources']['rss_mb_max']) for lv in levels if lv['resources']]
+    if len({u for u, _ in memory}) >= 2:
+        per_user, base = np.polyfit(*np.array(memory).T, 1)
+        capacity.update({'rss_base_mb': float(base), 'rss_per_user_mb': float(per_user)})
+        if per_user > 0 and memory_budget_mb:
+            capacity['max_users_by_memory'] = int((memory_budget_mb - base) // per_user)
+    estimates = [capacity['max_users_within_slo'], capacity.get('max_users_by_memory')]
+    capacity['estimated_users'] = min((e for e in estimates if e is not None), default=None)
+    # Jika semua tingkat lolos, kapasitas sebenarnya bisa lebih besar dari tingkat tertinggi yang diuji
+    capacity['lower_bound_only'] = not failing
+    return capacity
+
+
+def _total_memory_mb():
+    try:
+        return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES') / 2**20
+    except (ValueError, OSError, AttributeError):
+        return None
+
+
+def run_load_test(target, host, port, pid, users_levels, duration, think_s, slo_ms, interval,
+                  memory_budget_mb, seed=42):
+    points = sample_points(5000, seed)
+    asyncio.run(_warm_up(target, host, port, points))
+    monitor = ResourceMonitor(pid, interval).start() if pid else None
+    levels = []
+    try:
+        for users in users_levels:
+            print(f"  - {users} pengguna selama {duration:g} dtk...", flush=True)
+            if monitor is not None:
+                monitor.label = users
+            client_cpu, wall = time.process_time(), time.perf_counter()
+            stats = asyncio.run(_run_level(target, host, port, users, duration, think_s, points, seed))
+            wall = time.perf_counter() - wall
+            levels.append({
+                'users': users, 'wall_s': wall,
+                'flows': len(stats.flows), 'flows_per_s': len(stats.flows) / wall,
+                'flow': _latency_stats(stats.flows),
+                'steps': {name: _latency_stats(samples) for name, samples in stats.steps.items()},
+                'errors': len(stats.errors), 'error_samples': stats.errors[:5],
+                'resources': monitor.summary(users) if monitor is not None else {},
+                # CPU generator beban sendiri; jika mendekati 100% hasil dibatasi oleh klien, bukan server
+                'client_cpu_percent': 100 * (time.process_time() - client_cpu) / wall,
+            })
+    finally:
+        if monitor is not None:
+            monitor.stop()
+
+    return {
+        'meta': {
+            'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+            'target': target, 'host': host, 'port': port, 'pid': pid,
+            'duration_s': duration, 'think_s': think_s, 'seed': seed, 'feature_mode': FEATURE_MODE,
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpu_count': os.cpu_count(),
+            'streamlit': check_streamlit_version() if target == 'app' else None,
+            'memory_budget_mb': memory_budget_mb,
+        },
+        'levels': levels,
+        'capacity': estimate_capacity(levels, slo_ms, memory_budget_mb),
+        'resource_samples': monitor.samples if monitor is not None else [],
+    }
+
+
+def print_report(report):
+    print(f"\n{'pengguna':>8} {'alur':>6} {'galat':>6} {'alur/dtk':>9} {'p50 ms':>9} {'p95 ms':>9} "
+          f"{'CPU% rata':>9} {'CPU% maks':>9} {'RSS maks':>9}")
+    for lv in report['levels']:
+        res, flow = lv['resources'], lv['flow']
+        print(f"{lv['users']:>8} {lv['flows']:>6} {lv['errors']:>6} {lv['flows_per_s']:>9.2f} "
+              f"{flow.get('p50_ms', float('nan')):>9.0f} {flow.get('p95_ms', float('nan')):>9.0f} "
+              f"{res.get('cpu_percent_mean', float('nan')):>9.0f} {res.get('cpu_percent_max', float('nan')):>9.0f} "
+              f"{res.get('rss_mb_max', float('nan')):>9.0f}")
+        for error in lv['error_samples'][:2]:
+            print(f"{'':>8} ! {error['step']}: {error['error']}")
+    capacity = report['capacity']
+    print(f"\nSLO p95 alur: {capacity['slo_p95_ms']:.0f} ms")
+    print(f"Pengguna maksimum dalam SLO: {capacity['max_users_within_slo']}"
+          + (" (semua tingkat lolos; kapasitas sebenarnya bisa lebih tinggi)" if capacity['lower_bound_only'] else ""))
+    if 'rss_per_user_mb' in capacity:
+        print(f"Memori: dasar {capacity['rss_base_mb']:.0f} MB + {capacity['rss_per_user_mb']:.1f} MB per pengguna"
+              + (f" -> maks {capacity['max_users_by_memory']} pengguna" if 'max_users_by_memory' in capacity else ""))
+    print(f"Estimasi kapasitas per instance: {capacity['estimated_users']} pengguna bersamaan")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Uji beban pengguna bersamaan terhadap instance SiagaGempa lokal.")
+    parser.add_argument('target', choices=['app', 'service'], help="Aplikasi Streamlit atau layanan HTTP.")
+    parser.add_argument('--start', action='store_true', help="Jalankan server sebagai proses anak di port bebas.")
+    parser.add_argument('--url', help="URL server yang sudah berjalan (tanpa --start).")
+    parser.add_argument('--pid', type=int, help="PID server yang sudah berjalan, untuk pemantauan CPU/RSS.")
+    parser.add_argument('--users', type=int, nargs='+', default=DEFAULT_USERS, help="Tingkat jumlah pengguna.")
+    parser.add_argument('--duration', type=float, default=30, help="Lama setiap tingkat (detik).")
+    parser.add_argument('--think-s', type=float, help="Jeda berpikir maksimum antar langkah (detik).")
+    parser.add_argument('--slo-ms', type=float, help="Batas p95 latensi alur untuk estimasi kapasitas.")
+    parser.add_argument('--interval', type=float, default=1.0, help="Interval sampling CPU/RSS (detik).")
+    parser.add_argument('--memory-budget-mb', type=float, default=_total_memory_mb(),
+                        help="Memori yang tersedia untuk instance (default: RAM host).")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--server-log', default='loadtest_server.log', help="Log server saat --start.")
+    parser.add_argument('--output', default='loadtest.json', help="File JSON laporan.")
+    args = parser.parse_args()
+    if not args.start and not args.url:
+        parser.error("Gunakan --start atau --url.")
+    if args.target == 'app':
+        check_streamlit_version()
+
+    think_s = DEFAULT_THINK_S[args.target] if args.think_s is None else args.think_s
+    slo_ms = DEFAULT_SLO_MS[args.target] if args.slo_ms is None else args.slo_ms
+    process = None
+    if args.start:
+        host, port = '127.0.0.1', _free_port()
+        print(f"Menjalankan server {args.target} di port {port}...", flush=True)
+        process = start_server(args.target, port, args.server_log)
+        pid = process.pid
+    else:
+        url = urlsplit(args.url)
+        host, port, pid = url.hostname, url.port or 80, args.pid
+    try:
+        report = run_load_test(args.target, host, port, pid, args.users, args.duration, think_s, slo_ms,
+                               args.interval, args.memory_budget_mb, args.seed)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=30)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_report(report)
+    print(f"\nLaporan disimpan di '{args.output}'.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,197 @@
+"""
+Registry metrik ringan di dalam proses untuk mengukur tahap-tahap hot path.
+
+Setiap tahap dibungkus `stage(nama, labels={...}, **hitungan)`; durasi dan hitungan (mis. rows_scanned,
+rows_matched) dijumlahkan per nama tahap. Label adalah parameter tahap (mis. radius_m, k, layer) yang
+tidak dijumlahkan: agregat hanya menyimpan label panggilan terakhir. Tahap yang terjadi di dalam
+`request(nama)` juga dikumpulkan sebagai jejak per permintaan dan ditulis sebagai satu baris log JSON.
+Tahap di dalam `capture()` juga dikumpulkan mentah agar bisa digabung ke registry proses lain
+(mis. worker layanan -> proses induk) dengan `REGISTRY.merge`.
+
+    with metrics.request('prediksi_titik'):
+        with metrics.stage('model.predict', labels={'backend': 'compiled'}, rows=len(X)) as info:
+            ...
+            info['rows_matched'] = n
+"""
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import numpy as np
+
+from siagagempa.config import METRICS_LOG
+
+logger = logging.getLogger('siagagempa.metrics')
+if not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+class _StageStats:
+    def __init__(self, window):
+        self.calls = 0
+        self.total_s = 0.0
+        self.max_s = 0.0
+        self.last_s = 0.0
+        self.recent = deque(maxlen=window)
+        self.counters = {}
+        self.labels = {}
+
+    def add(self, seconds, counts, labels=None):
+        self.calls += 1
+        self.total_s += seconds
+        self.max_s = max(self.max_s, seconds)
+        self.last_s = seconds
+        self.recent.append(seconds)
+        for key, value in counts.items():
+            if isinstance(value, (int, float, np.integer, np.floating)) and not isinstance(value, bool):
+                self.counters[key] = self.counters.get(key, 0) + value
+        if labels:
+            self.labels = dict(labels)
+
+
+class MetricsRegistry:
+    """
+    Agregat durasi per tahap (jumlah panggilan, total, p50/p95 dari jendela terbaru, maksimum)
+    beserta total hitungan, ditambah jejak permintaan terbaru dan info dinamis (mis. statistik cache).
+    """
+
+    def __init__(self, window=500, max_requests=50):
+        self.window = window
+        self._stages = {}
+        self._requests = deque(maxlen=max_requests)
+        self._info_providers = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, seconds, labels=None, **counts):
+        with self._lock:
+            stats = self._stages.get(name)
+            if stats is None:
+                stats = self._stages[name] = _StageStats(self.window)
+            stats.add(seconds, counts, labels)
+
+    def merge(self, records):
+        """
+        Menggabungkan rekaman (nama, detik, label, hitungan) dari `capture()` di proses lain.
+        """
+        for name, seconds, labels, counts in records:
+            self.record(name, seconds, labels, **counts)
+
+    def record_request(self, trace):
+        with self._lock:
+            self._requests.append(trace)
+
+    def register_info(self, name, provider):
+        """
+        Mendaftarkan fungsi tanpa argumen yang mengembalikan dict info untuk panel diagnostik.
+        """
+        with self._lock:
+            self._info_providers[name] = provider
+
+    def snapshot(self):
+        with self._lock:
+            rows = []
+            for name, stats in sorted(self._stages.items()):
+                recent = np.asarray(stats.recent)
+                rows.append({
+                    'stage': name,
+                    'calls': stats.calls,
+                    'total_ms': stats.total_s * 1000,
+                    'mean_ms': stats.total_s / stats.calls * 1000,
+                    'p50_ms': float(np.percentile(recent, 50) * 1000),
+                    'p95_ms': float(np.percentile(recent, 95) * 1000),
+                    'max_ms': stats.max_s * 1000,
+                    'last_ms': stats.last_s * 1000,
+                    'labels': ', '.join(f'{k}={_to_log_value(v)}' for k, v in stats.labels.items()),
+                    **stats.counters,
+                })
+            return rows
+
+    def recent_requests(self):
+        with self._lock:
+            return list(self._requests)
+
+    def info(self):
+        with self._lock:
+            providers = dict(self._info_providers)
+        return {name: provider() for name, provider in providers.items()}
+
+    def reset(self):
+        with self._lock:
+            self._stages.clear()
+            self._requests.clear()
+
+
+REGISTRY = MetricsRegistry()
+_current_request = contextvars.ContextVar('siagagempa_request', default=None)
+_current_capture = contextvars.ContextVar('siagagempa_capture', default=None)
+
+
+def _to_log_value(value):
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+@contextmanager
+def stage(name, labels=None, **counts):
+    """
+    Mengukur satu tahap. `labels` adalah parameter tahap yang tidak dijumlahkan; `counts` dijumlahkan
+    antar panggilan. Dict yang di-yield boleh diisi hitungan tambahan sebelum blok selesai.
+    """
+    labels = dict(labels or {})
+    info = dict(counts)
+    start = time.perf_counter()
+    try:
+        yield info
+    finally:
+        elapsed = time.perf_counter() - start
+        REGISTRY.record(name, elapsed, labels, **info)
+        records = _current_capture.get()
+        if records is not None:
+            records.append((name, elapsed, labels, {k: _to_log_value(v) for k, v in info.items()}))
+        trace = _current_request.get()
+        if trace is not None:
+            trace['stages'].append({'stage': name, 'ms': round(elapsed * 1000, 3),
+                                    **{k: _to_log_value(v) for k, v in {**labels, **info}.items()}})
+
+
+@contextmanager
+def capture():
+    """
+    Mengumpulkan rekaman mentah semua tahap di dalam blok ke list yang di-yield (untuk `REGISTRY.merge`).
+    """
+    records = []
+    token = _current_capture.set(records)
+    try:
+        yield records
+    finally:
+        _current_capture.reset(token)
+
+
+@contextmanager
+def request(name, **fields):
+    """
+    Mengumpulkan semua tahap di dalam blok sebagai satu permintaan dan menulis satu baris log JSON.
+    """
+    trace = {'request': name, **fields, 'stages': []}
+    token = _current_request.set(trace)
+    start = time.perf_counter()
+    try:
+        yield trace
+    finally:
+        elapsed = time.perf_counter() - start
+        _current_request.reset(token)
+        trace['total_ms'] = round(elapsed * 1000, 3)
+        trace['ts'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+        REGISTRY.record(f'request.{name}', elapsed)
+        REGISTRY.record_request(trace)
+        if METRICS_LOG:
+            logger.info(json.dumps({'event': 'siagagempa.request', **trace}, default=str))
@@ -0,0 +1,119 @@
+"""
+Indeks tetangga terdekat per kategori POI dan untuk katalog gempa, untuk fitur "jarak ke fasilitas terdekat"
+dan "K gempa terdekat".
+
+Fitur hitungan POI hanya melihat buffer tetap BUFFER_POI_METER, sehingga lokasi 600 m dan 15 km dari rumah
+sakit sama-sama bernilai 0. Di sini satu KDTree (scikit-learn) dibangun sekali per kategori dari koordinat
+metrik yang sudah ada di SpatialIndex; setiap kueri O(log n) per titik, jadi seluruh grid provinsi cukup
+beberapa detik tanpa buffer dan spatial join.
+
+Jarak di EPSG:3857 membesar sebesar 1/cos(lintang). Urutan tetangga tidak terpengaruh pada skala lokal,
+dan jarak yang dilaporkan dikoreksi dengan cos(lintang titik) = 1/cosh(y/R) sehingga menjadi meter di
+permukaan bola (selisih terhadap jarak geodesik WGS84 di bawah 1% di Jawa Barat).
+
+scikit-learn baru diimpor saat NearestIndex dibuat (SpatialIndex membangunnya saat pertama dipakai), agar
+start dingin dari bundel data tidak ikut memuat sklearn.
+"""
+import numpy as np
+
+from siagagempa.config import NEAREST_POI_COLUMNS, NEAREST_GEMPA_K
+
+# Jari-jari bola Web Mercator (EPSG:3857)
+MERCATOR_RADIUS_M = 6378137.0
+
+
+def nearest_gempa_columns(k=NEAREST_GEMPA_K):
+    return ['jarak_gempa_terdekat_km', f'rata_jarak_{k}_gempa_km', f'max_mag_{k}_gempa_terdekat']
+
+
+def nearest_columns(k=NEAREST_GEMPA_K):
+    """
+    Semua kolom fitur tetangga terdekat, urut seperti hasil `NearestIndex.features`.
+    """
+    return list(NEAREST_POI_COLUMNS.values()) + nearest_gempa_columns(k)
+
+
+def ground_scale(y):
+    """
+    Faktor jarak Mercator -> jarak permukaan pada koordinat y metrik (cos lintang).
+    """
+    return 1.0 / np.cosh(np.asarray(y, dtype=float) / MERCATOR_RADIUS_M)
+
+
+class NearestIndex:
+    """
+    KDTree per kategori POI (hanya kategori di NEAREST_POI_COLUMNS) dan satu KDTree gempa, semuanya di CRS metrik.
+    `poi_codes`/`poi_categories` mengikuti PoiStore; POI atau gempa boleh None jika hanya salah satu yang diperlukan.
+    """
+
+    def __init__(self, poi_xy=None, poi_codes=None, poi_categories=None, gempa_xy=None, gempa_mag=None,
+                 categories=tuple(NEAREST_POI_COLUMNS)):
+        # Import lokal: sklearn cukup berat dan tidak diperlukan sebelum fitur tetangga terdekat dipakai
+        from sklearn.neighbors import KDTree
+
+        self.poi_trees = {}
+        if poi_xy is not None and poi_codes is not None and poi_categories is not None:
+            poi_xy = np.column_stack([np.asarray(c, dtype=float) for c in poi_xy])
+            for category in categories:
+                if category not in poi_categories:
+                    continue
+                rows = np.flatnonzero(poi_codes == list(poi_categories).index(category))
+                if len(rows):
+                    self.poi_trees[category] = (KDTree(poi_xy[rows]), rows)
+
+        self.gempa_tree = None
+        self.gempa_mag = None
+        if gempa_xy is not None and len(gempa_xy[0]):
+            self.gempa_tree = KDTree(np.column_stack([np.asarray(c, dtype=float) for c in gempa_xy]))
+            self.gempa_mag = np.asarray(gempa_mag, dtype=float) if gempa_mag is not None else None
+
+    @property
+    def n_gempa(self):
+        return self.gempa_tree.data.shape[0] if self.gempa_tree is not None else 0
+
+    def nearest_poi(self, x, y, category, k=1):
+        """
+        (jarak meter (n, k), indeks baris PoiStore (n, k)) untuk K POI terdekat kategori `category`.
+        Kategori tanpa POI menghasilkan jarak NaN dan indeks -1; n = 0 menghasilkan array kosong.
+        """
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        if category not in self.poi_trees or len(x) == 0:
+            return np.full((len(x), k), np.nan), np.full((len(x), k), -1, dtype=np.int64)
+        tree, rows = self.poi_trees[category]
+        k = min(k, len(rows))
+        dist, idx = tree.query(np.column_stack([x, y]), k=k)
+        return dist * ground_scale(y)[:, None], rows[idx]
+
+    def nearest_gempa(self, x, y, k=NEAREST_GEMPA_K):
+        """
+        (jarak meter (n, k), indeks baris katalog gempa (n, k)) untuk K gempa terdekat; k dibatasi jumlah gempa.
+        """
+        x, y = np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        k = min(k, self.n_gempa)
+        if k == 0 or len(x) == 0:
+            # KDTree.query menolak kueri tanpa baris
+            return np.full((len(x), k), np.nan), np.full((len(x), k), -1, dtype=np.int64)
+        dist, idx = self.gempa_tree.query(np.column_stack([x, y]), k=k)
+        return dist * ground_scale(y)[:, None], idx
+
+    def features(self, x, y, k_gempa=NEAREST_GEMPA_K, include_poi=True):
+        """
+        {kolom: array}: jarak (m) ke fasilitas terdekat per kategori, jarak (km) ke gempa terdekat,
+        rata-rata jarak (km) dan magnitudo maksimum K gempa terdekat. Nilai NaN jika layernya kosong.
+        `include_poi=False` hanya menghitung kolom gempa (dipakai ingest gempa inkremental).
+        """
+        n_points = len(np.asarray(x))
+        features = {}
+        if include_poi:
+            for category, col in NEAREST_POI_COLUMNS.items():
+                features[col] = self.nearest_poi(x, y, category)[0][:, 0]
+        nearest_col, mean_col, mag_col = nearest_gempa_columns(k_gempa)
+        dist, idx = self.nearest_gempa(x, y, k_gempa)
+        if dist.shape[1]:
+            features[nearest_col] = dist[:, 0] / 1000
+            features[mean_col] = dist.mean(axis=1) / 1000
+            features[mag_col] = self.gempa_mag[idx].max(axis=1) if self.gempa_mag is not None else np.full(n_points, np.nan)
+        else:
+            for col in (nearest_col, mean_col, mag_col):
+                features[col] = np.full(n_points, np.nan)
+        return features
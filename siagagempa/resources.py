@@ -0,0 +1,155 @@
+import os
+
+import joblib
+import geopandas as gpd
+
+from siagagempa.config import (
+    MODEL_FILENAME, LABEL_ENCODER_FILENAME, FEATURE_COLUMNS_FILENAME,
+    GD_GEMPA_JABAR_PATH, GD_POI_JABAR_PATH, GD_DEMOGRAFI_JABAR_CLEAN_PATH,
+    FEATURE_MODE, DENSITY_GRID_DIR, COMPILED_MODEL_DIR, FEATURE_CACHE_PRECISION, FEATURE_CACHE_SIZE,
+    FEATURE_CACHE_MAX_BATCH_POINTS, DATA_BUNDLE_DIR
+)
+from siagagempa.spatial_index import SpatialIndex
+from siagagempa.compiled_forest import CompiledForest, compiled_forest_is_current
+from siagagempa.feature_cache import LocationFeatureCache
+from siagagempa.compact_store import KelurahanStore, KELURAHAN_STORE_COLUMNS, read_poi_store
+from siagagempa.data_bundle import (
+    bundle_is_current, load_bundle_model, load_bundle_geodata, MODEL_SOURCE_PATHS
+)
+from siagagempa.fingerprint import source_fingerprint
+from siagagempa import metrics
+
+
+GEODATA_PATHS = [GD_GEMPA_JABAR_PATH, GD_POI_JABAR_PATH, GD_DEMOGRAFI_JABAR_CLEAN_PATH]
+
+
+def data_version(paths=GEODATA_PATHS):
+    """
+    Sidik jari (ukuran, mtime) file data. Dipakai sebagai kunci cache agar aplikasi memuat ulang
+    data setelah ingestion (lihat siagagempa.ingest_gempa) tanpa restart.
+    """
+    return tuple(
+        (path, *source_fingerprint(path).values()) if os.path.exists(path) else (path, None, None)
+        for path in paths
+    )
+
+
+def load_model():
+    """
+    Memuat model, label encoder, dan daftar fitur yang diharapkan model.
+    Bundel data dipakai lebih dulu, lalu model terkompilasi (memory-mapped), bila masih sesuai dengan file .pkl.
+    """
+    with metrics.stage('resources.load_model') as info:
+        if bundle_is_current(DATA_BUNDLE_DIR, MODEL_SOURCE_PATHS):
+            model, label_encoder, model_expected_features = load_bundle_model(DATA_BUNDLE_DIR)
+            info['backend'] = 'bundle'
+            return model, label_encoder, model_expected_features
+        if compiled_forest_is_current(COMPILED_MODEL_DIR):
+            model = CompiledForest.load(COMPILED_MODEL_DIR)
+        else:
+            model = joblib.load(MODEL_FILENAME)
+        label_encoder = joblib.load(LABEL_ENCODER_FILENAME)
+        feature_cols_model = joblib.load(FEATURE_COLUMNS_FILENAME)
+        info['backend'] = type(model).__name__
+
+    if hasattr(model, 'feature_names_in_'):
+        model_expected_features = model.feature_names_in_.tolist()
+    else:
+        model_expected_features = feature_cols_model
+    return model, label_encoder, model_expected_features
+
+
+def _read_layer(layer, path, columns=None):
+    """
+    Membaca satu layer dan memastikan CRS-nya EPSG:4326.
+    """
+    target_crs = "EPSG:4326"
+    with metrics.stage('resources.read_file', labels={'layer': layer}) as info:
+        gdf = gpd.read_file(path, columns=columns)
+        info['rows'] = len(gdf)
+    if gdf.crs != target_crs:
+        with metrics.stage('resources.to_crs', labels={'layer': layer}, rows=len(gdf)):
+            gdf = gdf.to_crs(target_crs)
+    return gdf
+
+
+def load_geodata():
+    """
+    Memuat data gempa, POI, dan demografi, lalu memastikan semuanya ber-CRS EPSG:4326.
+    """
+    gdf_gempa_jabar, gdf_poi_jabar, gdf_demografi_jabar_clean = [
+        _read_layer(layer, path) for layer, path in zip(['gempa', 'poi', 'demografi'], GEODATA_PATHS)
+    ]
+    return gdf_gempa_jabar, gdf_poi_jabar, gdf_demografi_jabar_clean
+
+
+def load_compact_geodata():
+    """
+    Seperti `load_geodata`, tetapi POI dan demografi langsung dijadikan PoiStore/KelurahanStore
+    dengan hanya membaca kolom yang dipakai model dan peta.
+    """
+    gdf_gempa_jabar = _read_layer('gempa', GD_GEMPA_JABAR_PATH)
+    with metrics.stage('resources.read_file', labels={'layer': 'poi'}) as info:
+        poi_store = read_poi_store(GD_POI_JABAR_PATH)
+        info['rows'] = len(poi_store)
+    kelurahan_store = KelurahanStore.from_geodataframe(
+        _read_layer('demografi', GD_DEMOGRAFI_JABAR_CLEAN_PATH, KELURAHAN_STORE_COLUMNS)
+    )
+    return gdf_gempa_jabar, poi_store, kelurahan_store
+
+
+def load_density_grid_if_enabled(feature_mode=FEATURE_MODE):
+    """
+    Memuat grid kepadatan jika mode fitur 'grid' dipilih dan file-nya masih sesuai dengan data sumber.
+    Mengembalikan None (mode exact) jika tidak.
+    """
+    if feature_mode != 'grid':
+        return None
+    # Import lokal agar mode exact tidak bergantung pada modul grid
+    from siagagempa.density_grid import DensityGrid, density_grid_is_current
+
+    if not density_grid_is_current(DENSITY_GRID_DIR):
+        print(f"Grid kepadatan di '{DENSITY_GRID_DIR}' tidak ada atau usang, kembali ke mode exact. "
+              "Bangun ulang dengan: python -m siagagempa.density_grid build")
+        return None
+    return DensityGrid.load(DENSITY_GRID_DIR)
+
+
+def load_feature_cache(max_entries=FEATURE_CACHE_SIZE, precision=FEATURE_CACHE_PRECISION):
+    """
+    Cache fitur lokasi bersama untuk satu proses, atau None jika dinonaktifkan (max_entries 0).
+    """
+    if max_entries <= 0:
+        return None
+    feature_cache = LocationFeatureCache(
+        precision, max_entries,
+        source_paths=GEODATA_PATHS, max_batch_points=FEATURE_CACHE_MAX_BATCH_POINTS
+    )
+    metrics.REGISTRY.register_info('feature_cache', feature_cache.stats)
+    return feature_cache
+
+
+def load_resources(feature_mode=FEATURE_MODE, feature_cache_size=FEATURE_CACHE_SIZE):
+    """
+    Memuat semua sumber daya tanpa bergantung pada Streamlit: model, data geografis,
+    dan SpatialIndex (beserta grid kepadatan bila mode 'grid' aktif dan cache fitur lokasi).
+    POI dan demografi dikembalikan sebagai PoiStore/KelurahanStore yang ringkas, bukan GeoDataFrame.
+    Data dibaca dari bundel (lihat siagagempa.data_bundle) bila masih sesuai, selain itu dari GeoPackage.
+    """
+    with metrics.stage('resources.load_resources', labels={'feature_mode': feature_mode}) as info:
+        model, label_encoder, model_expected_features = load_model()
+        if bundle_is_current(DATA_BUNDLE_DIR, GEODATA_PATHS):
+            gdf_gempa_jabar, gdf_poi_jabar, gdf_demografi_jabar_clean, metric_xy = load_bundle_geodata(DATA_BUNDLE_DIR)
+            info['source'] = 'bundle'
+        else:
+            gdf_gempa_jabar, gdf_poi_jabar, gdf_demografi_jabar_clean = load_compact_geodata()
+            metric_xy = {}
+            info['source'] = 'geopackage'
+        spatial_index = SpatialIndex(
+            gdf_gempa_jabar, gdf_poi_jabar, gdf_demografi_jabar_clean,
+            density_grid=load_density_grid_if_enabled(feature_mode),
+            feature_cache=load_feature_cache(feature_cache_size),
+            **metric_xy
+        )
+    return model, label_encoder, model_expected_features, gdf_gempa_jabar, \
+           gdf_poi_jabar, gdf_demografi_jabar_clean, spatial_index
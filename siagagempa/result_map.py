@@ -0,0 +1,227 @@
+"""
+Peta kontekstual hasil prediksi (batas kelurahan, gempa dan POI terdekat, fasilitas terdekat per kategori,
+lokasi pengguna).
+Dipisahkan dari halaman Streamlit agar bisa dipakai ulang dan diukur di luar Streamlit.
+"""
+import json
+
+import numpy as np
+import shapely
+import folium
+from folium.plugins import FastMarkerCluster
+
+from siagagempa.config import RESULT_MAP_RENDER_MODE, RESULT_MAP_MAX_GEMPA, RESULT_MAP_MAX_POI, NEAREST_POI_COLUMNS
+from siagagempa import metrics
+
+# Radius data kontekstual pada peta hasil (lebih luas dari radius fitur model)
+RESULT_MAP_GEMPA_RADIUS_M = 20000
+RESULT_MAP_POI_RADIUS_M = 1000
+# Garis ke fasilitas terdekat hanya digambar sampai jarak ini; fasilitas yang lebih jauh cukup diberi label
+RESULT_MAP_NEAREST_LINE_MAX_M = 5000
+
+POI_ICON_MAP = {
+    'Fasilitas Kesehatan': {'color': 'red', 'icon': 'plus-sign'},
+    'Sekolah': {'color': 'blue', 'icon': 'education'},
+    'Pemerintahan/Publik': {'color': 'darkblue', 'icon': 'bank'},
+    'Fasilitas Sosial/Publik Lain': {'color': 'green', 'icon': 'tree-conifer'},
+    'Bangunan Biasa': {'color': 'gray', 'icon': 'home'}
+}
+POI_ICON_DEFAULT = {'color': 'purple', 'icon': 'info-sign'}
+
+# Cluster POI dilepas pada zoom dekat agar setiap fasilitas terlihat
+POI_CLUSTER_OPTIONS = {'disableClusteringAtZoom': 17, 'maxClusterRadius': 50, 'chunkedLoading': True}
+
+# Gaya gempa (radius sebanding magnitudo) dan ikon POI per kategori diterapkan di browser
+GEMPA_ON_EACH_FEATURE = folium.JsCode("""
+function (feature, layer) {
+    var p = feature.properties;
+    layer.setRadius(p.mag * 1.5);
+    layer.bindTooltip('Gempa M' + p.mag.toFixed(1));
+    layer.bindPopup('<b>Magnitudo: ' + p.mag.toFixed(1) + '</b><br>Kedalaman: ' + p.depth.toFixed(1) + ' km');
+}
+""")
+POI_MARKER_CALLBACK = """(function () {
+    var styles = %s;
+    var fallback = %s;
+    return function (row) {
+        var style = styles[row[2]] || fallback;
+        var icon = L.AwesomeMarkers.icon({icon: style.icon, markerColor: style.color, prefix: 'glyphicon'});
+        return L.marker(new L.LatLng(row[0], row[1]), {icon: icon}).bindTooltip(row[2]);
+    };
+})()""" % (json.dumps(POI_ICON_MAP), json.dumps(POI_ICON_DEFAULT))
+
+
+def find_kelurahan_info(latitude, longitude, spatial_index, gdf_demografi, idx_kel=None):
+    """
+    Kelurahan yang memuat titik: (GeoDataFrame satu baris atau None, nama_kab, nama_kec, nama_kel).
+    Berikan `idx_kel` dari perhitungan fitur agar point-in-polygon tidak diulang.
+    """
+    kab_name, kec_name, kel_name = "Tidak Terdeteksi", "Tidak Terdeteksi", "Tidak Terdeteksi"
+    kelurahan_info = None
+    kelurahan = spatial_index.kelurahan
+    if all(col in kelurahan.columns for col in ['nama_kab', 'nama_kec', 'nama_kel']):
+        if idx_kel is None:
+            idx_kel = spatial_index.locate_kelurahan(spatial_index.points([longitude], [latitude]))[0]
+        if idx_kel >= 0:
+            kelurahan_info = kelurahan.frame([idx_kel], ['nama_kab', 'nama_kec', 'nama_kel'])
+            kab_name = kelurahan_info.iloc[0]['nama_kab']
+            kec_name = kelurahan_info.iloc[0]['nama_kec']
+            kel_name = kelurahan_info.iloc[0]['nama_kel']
+    return kelurahan_info, kab_name, kec_name, kel_name
+
+
+def _nearest_first(geoms, point_metric, limit):
+    """
+    Urutan indeks dari yang terdekat ke titik, dibatasi `limit`.
+    """
+    order = np.argsort(shapely.distance(geoms, point_metric), kind='stable')
+    return order[:limit]
+
+
+def _add_gempa_markers(group, nearby_gempa):
+    for _, row in nearby_gempa.iterrows():
+        folium.CircleMarker(
+            location=[row['latitude'], row['longitude']], radius=row['mag'] * 1.5,
+            color='red', fill=True, fill_color='darkred', fill_opacity=0.6,
+            tooltip=f"Gempa M{row['mag']:.1f}",
+            popup=f"<b>Magnitudo: {row['mag']:.1f}</b><br>Kedalaman: {row['depth']:.1f} km"
+        ).add_to(group)
+
+
+def _add_poi_markers(group, nearby_poi):
+    for _, poi in nearby_poi.iterrows():
+        category = poi.get('category', 'Lainnya') # Gunakan .get() untuk keamanan
+        icon_style = POI_ICON_MAP.get(category, POI_ICON_DEFAULT)
+        folium.Marker(
+            location=[poi.geometry.y, poi.geometry.x], tooltip=category,
+            icon=folium.Icon(color=icon_style['color'], icon=icon_style['icon'], prefix='glyphicon')
+        ).add_to(group)
+
+
+def _add_gempa_layer(group, nearby_gempa):
+    """
+    Semua gempa sebagai satu FeatureCollection yang disusun langsung dari array kolom.
+    """
+    lats = nearby_gempa['latitude'].to_numpy(dtype=float).round(5).tolist()
+    lons = nearby_gempa['longitude'].to_numpy(dtype=float).round(5).tolist()
+    mags = nearby_gempa['mag'].to_numpy(dtype=float).round(2).tolist()
+    depths = nearby_gempa['depth'].to_numpy(dtype=float).round(2).tolist()
+    features = [
+        {'type': 'Feature', 'geometry': {'type': 'Point', 'coordinates': [lon, lat]}, 'properties': {'mag': mag, 'depth': depth}}
+        for lat, lon, mag, depth in zip(lats, lons, mags, depths)
+    ]
+    folium.GeoJson(
+        {'type': 'FeatureCollection', 'features': features},
+        marker=folium.CircleMarker(color='red', fill=True, fill_color='darkred', fill_opacity=0.6),
+        on_each_feature=GEMPA_ON_EACH_FEATURE,
+    ).add_to(group)
+
+
+def _add_poi_layer(group, nearby_poi):
+    """
+    Semua POI sebagai satu layer cluster; data dikirim sebagai baris [lat, lon, kategori].
+    """
+    geoms = nearby_poi.geometry.values
+    lats = shapely.get_y(geoms).round(6).tolist()
+    lons = shapely.get_x(geoms).round(6).tolist()
+    categories = nearby_poi['category'].astype(str).tolist() if 'category' in nearby_poi.columns else ['Lainnya'] * len(lats)
+    FastMarkerCluster(
+        [list(row) for row in zip(lats, lons, categories)],
+        callback=POI_MARKER_CALLBACK, options=POI_CLUSTER_OPTIONS,
+    ).add_to(group)
+
+
+def _add_nearest_facility_markers(group, spatial_index, user_point_metric, latitude, longitude):
+    """
+    Fasilitas terdekat per kategori NEAREST_POI_COLUMNS dari KDTree (berapa pun jaraknya). Garis ke lokasi
+    pengguna hanya untuk fasilitas dalam RESULT_MAP_NEAREST_LINE_MAX_M; yang lebih jauh hanya diberi label jarak.
+    Mengembalikan jumlah marker.
+    """
+    x, y = shapely.get_x(user_point_metric), shapely.get_y(user_point_metric)
+    n_markers = 0
+    for category in NEAREST_POI_COLUMNS:
+        dist, idx = spatial_index.nearest_index.nearest_poi(x, y, category)
+        if idx[0, 0] < 0:
+            continue
+        poi_lat, poi_lon = float(spatial_index.poi.lat[idx[0, 0]]), float(spatial_index.poi.lon[idx[0, 0]])
+        label = f"{category} terdekat: {dist[0, 0] / 1000:.2f} km"
+        icon_style = POI_ICON_MAP.get(category, POI_ICON_DEFAULT)
+        if dist[0, 0] <= RESULT_MAP_NEAREST_LINE_MAX_M:
+            folium.PolyLine([[latitude, longitude], [poi_lat, poi_lon]], color=icon_style['color'], weight=2,
+                            dash_array='6', tooltip=label).add_to(group)
+        else:
+            label += f" (lebih dari {RESULT_MAP_NEAREST_LINE_MAX_M / 1000:g} km dari lokasi Anda)"
+        folium.Marker(
+            location=[poi_lat, poi_lon], tooltip=label,
+            icon=folium.Icon(color=icon_style['color'], icon=icon_style['icon'], prefix='glyphicon')
+        ).add_to(group)
+        n_markers += 1
+    return n_markers
+
+
+def build_result_map(latitude, longitude, predicted_level, spatial_index, gdf_gempa, gdf_poi,
+                     kelurahan_info=None, kel_name=None, render_mode=RESULT_MAP_RENDER_MODE):
+    """
+    Membangun peta folium hasil prediksi. Mengembalikan (peta, gempa terdekat, POI terdekat).
+    Mode 'vector' mengirim setiap layer titik sebagai satu objek; mode 'markers' satu marker per baris.
+    """
+    user_point_metric = spatial_index.points_metric([longitude], [latitude])
+    m_results = folium.Map(location=[latitude, longitude], zoom_start=15, tiles="cartodbpositron")
+
+    # Layer Batas Kelurahan
+    if kelurahan_info is not None:
+        style = {'fillColor': '#3186cc', 'color': '#3186cc', 'weight': 2, 'fillOpacity': 0.2}
+        folium.GeoJson(
+            kelurahan_info.geometry, style_function=lambda x: style,
+            tooltip=f"<b>Kelurahan: {kel_name}</b>", name="Batas Kelurahan"
+        ).add_to(m_results)
+
+    # Layer Gempa Terdekat
+    _, idx_gempa_map = spatial_index.query_gempa(user_point_metric, RESULT_MAP_GEMPA_RADIUS_M)
+    nearby_gempa_map = gdf_gempa.iloc[np.sort(idx_gempa_map)]
+    gempa_group = folium.FeatureGroup(name="Gempa Terdekat (Radius 20 km)", show=True).add_to(m_results)
+    with metrics.stage('result_map.gempa_markers', labels={'mode': render_mode}, markers=len(nearby_gempa_map)) as info:
+        if not nearby_gempa_map.empty:
+            if render_mode == 'markers':
+                _add_gempa_markers(gempa_group, nearby_gempa_map)
+            else:
+                # Gempa terbesar diutamakan jika melebihi batas
+                shown = nearby_gempa_map
+                if len(shown) > RESULT_MAP_MAX_GEMPA:
+                    order = np.argsort(-shown['mag'].to_numpy(dtype=float), kind='stable')[:RESULT_MAP_MAX_GEMPA]
+                    shown = shown.iloc[np.sort(order)]
+                info['markers'] = len(shown)
+                _add_gempa_layer(gempa_group, shown)
+
+    # Layer POI Terdekat
+    _, idx_poi_map = spatial_index.query_poi(user_point_metric, RESULT_MAP_POI_RADIUS_M)
+    idx_poi_map = np.sort(idx_poi_map)
+    nearby_poi_map = spatial_index.poi.frame(idx_poi_map)
+    poi_group = folium.FeatureGroup(name="Fasilitas Umum Terdekat (Radius 1 km)", show=True).add_to(m_results)
+    with metrics.stage('result_map.poi_markers', labels={'mode': render_mode}, markers=len(nearby_poi_map)) as info:
+        if not nearby_poi_map.empty:
+            if render_mode == 'markers':
+                _add_poi_markers(poi_group, nearby_poi_map)
+            else:
+                # POI terdekat diutamakan jika melebihi batas
+                shown = nearby_poi_map
+                if len(shown) > RESULT_MAP_MAX_POI:
+                    keep = _nearest_first(spatial_index.poi_geoms[idx_poi_map], user_point_metric[0], RESULT_MAP_MAX_POI)
+                    shown = shown.iloc[np.sort(keep)]
+                info['markers'] = len(shown)
+                _add_poi_layer(poi_group, shown)
+
+    # Layer Fasilitas Terdekat per Kategori (tanpa batas radius); disembunyikan default, bisa dinyalakan di LayerControl
+    nearest_group = folium.FeatureGroup(name="Fasilitas Terdekat per Kategori", show=False).add_to(m_results)
+    with metrics.stage('result_map.nearest_facilities') as info:
+        info['markers'] = _add_nearest_facility_markers(nearest_group, spatial_index, user_point_metric, latitude, longitude)
+
+    # Marker Lokasi Pengguna
+    folium.Marker(
+        [latitude, longitude], tooltip="Lokasi Anda",
+        popup=f"<b>Prediksi: {predicted_level}</b>",
+        icon=folium.Icon(color="orange", icon="star")
+    ).add_to(m_results)
+
+    folium.LayerControl().add_to(m_results)
+    return m_results, nearby_gempa_map, nearby_poi_map
@@ -0,0 +1,130 @@
+"""
+Generator permukaan risiko se-provinsi beresolusi tinggi.
+
+Grid dibagi menjadi tile; setiap tile dihitung fiturnya dan diprediksi oleh
+random_forest_model.pkl di dalam process pool, lalu hasilnya langsung ditulis
+ke output sehingga memori per worker hanya sebesar satu tile.
+
+Pemakaian:
+    python -m siagagempa.risk_surface --cell-size 0.0045 --out data/risk_surface_500m.gpkg
+    python -m siagagempa.risk_surface --cell-size 0.0045 --out data/risk_surface_500m.parquet --workers 8
+
+Output .gpkg ditulis dengan mode append per tile; output .parquet berupa direktori
+GeoParquet dengan satu file part per tile (membutuhkan pyarrow).
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import time
+
+import geopandas as gpd
+
+from siagagempa.grid import (
+    GRID_SIZE_DEGREE, GridSpec, cell_polygons, filter_cells_in_province,
+    compute_cell_features, drop_empty_cells, model_input_frame
+)
+from siagagempa.resources import load_resources
+
+# Sumber daya per proses worker (diwarisi saat fork, dimuat ulang saat spawn)
+_WORKER_RESOURCES = None
+
+
+def _init_worker():
+    global _WORKER_RESOURCES
+    if _WORKER_RESOURCES is None:
+        _WORKER_RESOURCES = load_resources('exact')
+
+
+def process_tile(task):
+    """
+    Menghitung fitur dan prediksi untuk satu tile. Mengembalikan GeoDataFrame (bisa kosong).
+    """
+    grid_spec, tile = task
+    model, label_encoder, model_expected_features, gdf_gempa, gdf_poi, gdf_demografi, spatial_index = _WORKER_RESOURCES
+
+    cells = filter_cells_in_province(grid_spec.cells(*tile), spatial_index)
+    if cells.empty:
+        return None
+    features = compute_cell_features(cells, spatial_index, gdf_gempa, gdf_poi, gdf_demografi)
+    cells, features = drop_empty_cells(cells, features)
+    if cells.empty:
+        return None
+
+    X = model_input_frame(features, model_expected_features)
+    features['vulnerability_level'] = label_encoder.inverse_transform(model.predict(X))
+    features.insert(0, 'grid_id', cells['grid_id'].to_numpy())
+    return gpd.GeoDataFrame(features, geometry=cell_polygons(cells), crs="EPSG:4326")
+
+
+class _TileWriter:
+    """
+    Menulis hasil per tile secara bertahap ke GeoPackage (append) atau direktori GeoParquet.
+    """
+
+    def __init__(self, out_path, layer='risk_surface'):
+        self.out_path = out_path
+        self.layer = layer
+        self.is_parquet = out_path.lower().endswith('.parquet')
+        self.n_parts = 0
+        if os.path.isdir(out_path):
+            shutil.rmtree(out_path)
+        elif os.path.exists(out_path):
+            os.remove(out_path)
+        if self.is_parquet:
+            os.makedirs(out_path)
+
+    def write(self, gdf):
+        if self.is_parquet:
+            gdf.to_parquet(os.path.join(self.out_path, f'part-{self.n_parts:05d}.parquet'), index=False)
+        else:
+            gdf.to_file(self.out_path, layer=self.layer, driver='GPKG', mode='a' if self.n_parts else 'w')
+        self.n_parts += 1
+
+
+def generate_risk_surface(out_path, cell_size=GRID_SIZE_DEGREE, tile_cells=200, workers=None):
+    """
+    Membangun permukaan risiko untuk seluruh Jawa Barat pada ukuran sel `cell_size` derajat.
+    """
+    global _WORKER_RESOURCES
+    _WORKER_RESOURCES = load_resources('exact')
+    gdf_demografi = _WORKER_RESOURCES[5]
+
+    grid_spec = GridSpec(gdf_demografi.total_bounds, cell_size)
+    tiles = grid_spec.tiles(tile_cells)
+    print(f"Grid {grid_spec.n_rows} x {grid_spec.n_cols} sel ({cell_size} derajat), {len(tiles)} tile, "
+          f"{workers or os.cpu_count()} worker.")
+
+    writer = _TileWriter(out_path)
+    n_cells = 0
+    level_counts = {}
+    start = time.perf_counter()
+    with multiprocessing.Pool(processes=workers, initializer=_init_worker) as pool:
+        # imap_unordered + chunksize 1: paling banyak satu tile per worker yang sedang diproses
+        for i, gdf_tile in enumerate(pool.imap_unordered(process_tile, [(grid_spec, tile) for tile in tiles]), start=1):
+            if gdf_tile is not None:
+                writer.write(gdf_tile)
+                n_cells += len(gdf_tile)
+                for level, count in gdf_tile['vulnerability_level'].value_counts().items():
+                    level_counts[level] = level_counts.get(level, 0) + int(count)
+            print(f"  - Tile {i}/{len(tiles)} selesai, total {n_cells} sel ({time.perf_counter() - start:.1f} dtk)")
+
+    print(f"Selesai: {n_cells} sel ditulis ke '{out_path}'. Distribusi: {level_counts}")
+    return n_cells
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bangun permukaan risiko gempa se-Jawa Barat beresolusi tinggi.")
+    parser.add_argument('--cell-size', type=float, default=GRID_SIZE_DEGREE,
+                        help="Ukuran sel dalam derajat (0.045 = grid notebook, 0.0045 ~ 500 m).")
+    parser.add_argument('--tile-cells', type=int, default=200,
+                        help="Jumlah sel per sisi tile; membatasi memori per worker.")
+    parser.add_argument('--workers', type=int, default=None, help="Jumlah proses worker (default: jumlah CPU).")
+    parser.add_argument('--out', default=os.path.join('data', 'risk_surface.gpkg'),
+                        help="File output .gpkg atau direktori .parquet.")
+    args = parser.parse_args()
+    generate_risk_surface(args.out, args.cell_size, args.tile_cells, args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,269 @@
+"""
+Membangun piramida tile PNG (skema XYZ/slippy map) dari grid risiko, sebagai pengganti
+peta folium monolitik yang menyisipkan GeoJSON seluruh sel ke dalam satu file HTML.
+
+Tile disimpan di static/risk_tiles/{z}/{x}/{y}.png dan dilayani oleh static file serving
+Streamlit (`enableStaticServing`) di /app/static/risk_tiles/... sehingga peta hanya
+mengunduh tile yang terlihat pada zoom dan viewport saat itu. Tile tanpa sel tidak ditulis.
+Tile tidak disimpan di git: pipeline fitur (siagagempa.feature_pipeline) membangunnya setiap kali grid
+berubah, atau bangun manual dengan perintah di bawah. metadata.json mencatat grid sumber dan ukuran selnya
+agar halaman peta mencari sel yang diklik di grid yang sama.
+
+Pemakaian:
+    python -m siagagempa.risk_tiles
+    python -m siagagempa.risk_tiles --source data/risk_surface_500m.gpkg --max-zoom 14
+"""
+import argparse
+import json
+import math
+import os
+import shutil
+
+import numpy as np
+import geopandas as gpd
+from PIL import Image
+
+from siagagempa.config import DIR_DATA_FILES
+
+TILE_SIZE = 256
+RISK_TILES_DIR = os.path.join('static', 'risk_tiles')
+RISK_TILES_URL = '/app/static/risk_tiles/{z}/{x}/{y}.png'
+DEFAULT_GRID_SOURCE = os.path.join(DIR_DATA_FILES, 'final_grid_data_processed.gpkg')
+
+# Panjang satu derajat lintang (km), untuk melaporkan ukuran sel grid
+KM_PER_DEGREE = 111.32
+
+# Warna level risiko, sama dengan peta di notebook
+RISK_LEVEL_COLORS = {
+    'Tinggi': '#ff0000',
+    'Sedang': '#ffa500',
+    'Rendah': '#008000',
+}
+FILL_ALPHA = 160
+OUTLINE_MIN_CELL_PX = 8
+
+
+def _hex_to_rgb(color):
+    color = color.lstrip('#')
+    return tuple(int(color[i:i + 2], 16) for i in (0, 2, 4))
+
+
+def lonlat_to_pixel(lon, lat, zoom):
+    """
+    Koordinat piksel global Web Mercator pada tingkat zoom tertentu.
+    """
+    scale = TILE_SIZE * (2 ** zoom)
+    lat_rad = np.radians(np.clip(lat, -85.05112878, 85.05112878))
+    x = (np.asarray(lon) + 180.0) / 360.0 * scale
+    y = (1.0 - np.log(np.tan(lat_rad) + 1.0 / np.cos(lat_rad)) / math.pi) / 2.0 * scale
+    return x, y
+
+
+def load_risk_grid(source=DEFAULT_GRID_SOURCE):
+    """
+    Memuat grid risiko. Jika belum ada kolom vulnerability_level (mis. final_grid_data_processed.gpkg),
+    level diprediksi dengan random_forest_model.pkl memakai placeholder input pengguna seperti saat pelatihan.
+    Sumber GeoParquet (output siagagempa.risk_surface) harus sudah memiliki kolom tersebut.
+    """
+    if source.lower().endswith('.parquet'):
+        gdf = gpd.read_parquet(source)
+        if 'vulnerability_level' not in gdf.columns:
+            raise ValueError("Sumber GeoParquet harus memiliki kolom 'vulnerability_level'.")
+    else:
+        gdf = gpd.read_file(source)
+    if gdf.crs is not None and gdf.crs != "EPSG:4326":
+        gdf = gdf.to_crs("EPSG:4326")
+    if 'vulnerability_level' not in gdf.columns:
+        from siagagempa.grid import model_input_frame
+        from siagagempa.resources import load_model
+
+        model, label_encoder, model_expected_features = load_model()
+        X = model_input_frame(gdf.drop(columns=gdf.geometry.name), model_expected_features)
+        gdf['vulnerability_level'] = label_encoder.inverse_transform(model.predict(X))
+    return gdf
+
+
+def _encode_tile(pixels, outline):
+    """
+    Menyimpan tile sebagai PNG berpalet: 0 = transparan, 1..n = warna level, n+1.. = garis tepi.
+    """
+    image = Image.fromarray(pixels, mode='P')
+    palette = [0, 0, 0]
+    for color in RISK_LEVEL_COLORS.values():
+        palette += list(_hex_to_rgb(color))
+    palette += [0, 0, 0]
+    image.putpalette(palette + [0] * (768 - len(palette)))
+    alpha = [0] + [FILL_ALPHA] * len(RISK_LEVEL_COLORS) + [90 if outline else 0]
+    image.info['transparency'] = bytes(alpha)
+    return image
+
+
+def _cell_pixel_bounds(gdf, zoom):
+    """
+    Batas piksel global (x0, y0, x1, y1) setiap sel pada zoom tertentu, minimal satu piksel.
+    """
+    bounds = gdf.geometry.bounds
+    px0, py0 = lonlat_to_pixel(bounds['minx'].to_numpy(), bounds['maxy'].to_numpy(), zoom)
+    px1, py1 = lonlat_to_pixel(bounds['maxx'].to_numpy(), bounds['miny'].to_numpy(), zoom)
+    # Minimal satu piksel agar sel tetap terlihat pada zoom rendah
+    px0, py0 = np.floor(px0).astype(np.int64), np.floor(py0).astype(np.int64)
+    px1 = np.maximum(np.ceil(px1).astype(np.int64), px0 + 1)
+    py1 = np.maximum(np.ceil(py1).astype(np.int64), py0 + 1)
+    return px0, py0, px1, py1
+
+
+def _tiles_of_cells(px0, py0, px1, py1, mask):
+    """
+    Himpunan tile (tx, ty) yang disentuh sel-sel terpilih.
+    """
+    tiles = set()
+    for i in np.flatnonzero(mask):
+        for tx in range(px0[i] // TILE_SIZE, (px1[i] - 1) // TILE_SIZE + 1):
+            for ty in range(py0[i] // TILE_SIZE, (py1[i] - 1) // TILE_SIZE + 1):
+                tiles.add((tx, ty))
+    return tiles
+
+
+def render_zoom(gdf, out_dir, zoom, only_tiles=None):
+    """
+    Merender semua tile berisi sel pada satu zoom (atau hanya `only_tiles`). Mengembalikan (jumlah tile, byte).
+    """
+    level_codes = {level: i + 1 for i, level in enumerate(RISK_LEVEL_COLORS)}
+    outline_code = len(RISK_LEVEL_COLORS) + 1
+    codes = gdf['vulnerability_level'].map(level_codes).fillna(0).to_numpy(dtype=np.uint8)
+    px0, py0, px1, py1 = _cell_pixel_bounds(gdf, zoom)
+    outline = float(np.median(px1 - px0)) >= OUTLINE_MIN_CELL_PX
+
+    tiles = {}
+    for i in range(len(codes)):
+        if codes[i] == 0:
+            continue
+        for tx in range(px0[i] // TILE_SIZE, (px1[i] - 1) // TILE_SIZE + 1):
+            for ty in range(py0[i] // TILE_SIZE, (py1[i] - 1) // TILE_SIZE + 1):
+                if only_tiles is not None and (tx, ty) not in only_tiles:
+                    continue
+                tile = tiles.get((tx, ty))
+                if tile is None:
+                    tile = tiles[(tx, ty)] = np.zeros((TILE_SIZE, TILE_SIZE), dtype=np.uint8)
+                x0, y0 = max(px0[i] - tx * TILE_SIZE, 0), max(py0[i] - ty * TILE_SIZE, 0)
+                x1, y1 = min(px1[i] - tx * TILE_SIZE, TILE_SIZE), min(py1[i] - ty * TILE_SIZE, TILE_SIZE)
+                tile[y0:y1, x0:x1] = codes[i]
+                if outline:
+                    # Garis tepi tipis hanya di sisi kiri dan atas sel agar tidak dobel dengan sel tetangga
+                    if px0[i] >= tx * TILE_SIZE:
+                        tile[y0:y1, x0] = outline_code
+                    if py0[i] >= ty * TILE_SIZE:
+                        tile[y0, x0:x1] = outline_code
+
+    n_bytes = 0
+    for (tx, ty), pixels in tiles.items():
+        tile_dir = os.path.join(out_dir, str(zoom), str(tx))
+        os.makedirs(tile_dir, exist_ok=True)
+        path = os.path.join(tile_dir, f'{ty}.png')
+        _encode_tile(pixels, outline).save(path, optimize=True)
+        n_bytes += os.path.getsize(path)
+    return len(tiles), n_bytes
+
+
+def _write_metadata(gdf, out_dir, min_zoom, max_zoom, n_tiles, n_bytes, source):
+    total_bounds = gdf.total_bounds
+    bounds = gdf.geometry.bounds
+    cell_size_deg = float(np.median(bounds['maxy'] - bounds['miny'])) if len(gdf) else 0.0
+    meta = {
+        'source': source,
+        'cell_size_deg': cell_size_deg,
+        'cell_size_km': round(cell_size_deg * KM_PER_DEGREE, 2),
+        'min_zoom': min_zoom,
+        'max_zoom': max_zoom,
+        'bounds': [[float(total_bounds[1]), float(total_bounds[0])], [float(total_bounds[3]), float(total_bounds[2])]],
+        'colors': RISK_LEVEL_COLORS,
+        'level_counts': {k: int(v) for k, v in gdf['vulnerability_level'].value_counts().items()},
+        'n_tiles': n_tiles,
+        'total_bytes': n_bytes,
+    }
+    with open(os.path.join(out_dir, 'metadata.json'), 'w') as f:
+        json.dump(meta, f, indent=2)
+    return meta
+
+
+def load_tiles_metadata(out_dir=RISK_TILES_DIR):
+    """
+    metadata.json piramida tile, atau None jika belum dibangun.
+    """
+    path = os.path.join(out_dir, 'metadata.json')
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def tiles_built_from(source, out_dir=RISK_TILES_DIR):
+    """
+    True jika piramida tile di `out_dir` sudah ada dan dibangun dari grid `source`.
+    """
+    meta = load_tiles_metadata(out_dir)
+    return meta is not None and os.path.abspath(meta.get('source', DEFAULT_GRID_SOURCE)) == os.path.abspath(source)
+
+
+def build_tiles(gdf, out_dir=RISK_TILES_DIR, min_zoom=7, max_zoom=12, source=DEFAULT_GRID_SOURCE):
+    """
+    Merender sel grid (persegi lon/lat) ke tile PNG untuk setiap zoom. Mengembalikan metadata piramida.
+    `source` (path grid) dicatat di metadata untuk pencarian sel di halaman peta.
+    """
+    if os.path.isdir(out_dir):
+        shutil.rmtree(out_dir)
+    os.makedirs(out_dir)
+
+    n_tiles, n_bytes = 0, 0
+    for zoom in range(min_zoom, max_zoom + 1):
+        zoom_tiles, zoom_bytes = render_zoom(gdf, out_dir, zoom)
+        n_tiles += zoom_tiles
+        n_bytes += zoom_bytes
+        print(f"  - Zoom {zoom}: {zoom_tiles} tile")
+    return _write_metadata(gdf, out_dir, min_zoom, max_zoom, n_tiles, n_bytes, source)
+
+
+def update_tiles(gdf, changed_mask, out_dir=RISK_TILES_DIR, source=DEFAULT_GRID_SOURCE):
+    """
+    Merender ulang hanya tile yang memuat sel berubah (`changed_mask`), pada rentang zoom piramida yang ada.
+    Mengembalikan jumlah tile yang ditulis ulang, atau None jika piramida belum dibangun atau dibangun
+    dari grid selain `source`.
+    """
+    if not tiles_built_from(source, out_dir):
+        return None
+    meta = load_tiles_metadata(out_dir)
+    changed_mask = np.asarray(changed_mask, dtype=bool)
+    n_rendered = 0
+    for zoom in range(meta['min_zoom'], meta['max_zoom'] + 1):
+        affected = _tiles_of_cells(*_cell_pixel_bounds(gdf, zoom), changed_mask)
+        if affected:
+            n_rendered += render_zoom(gdf, out_dir, zoom, only_tiles=affected)[0]
+    n_tiles, n_bytes = 0, 0
+    for root, _, files in os.walk(out_dir):
+        for name in files:
+            if name.endswith('.png'):
+                n_tiles += 1
+                n_bytes += os.path.getsize(os.path.join(root, name))
+    _write_metadata(gdf, out_dir, meta['min_zoom'], meta['max_zoom'], n_tiles, n_bytes, source)
+    return n_rendered
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bangun piramida tile PNG peta risiko untuk aplikasi Streamlit.")
+    parser.add_argument('--source', default=DEFAULT_GRID_SOURCE,
+                        help="GeoPackage/GeoParquet grid risiko (mis. output siagagempa.risk_surface).")
+    parser.add_argument('--out', default=RISK_TILES_DIR)
+    parser.add_argument('--min-zoom', type=int, default=7)
+    parser.add_argument('--max-zoom', type=int, default=12)
+    args = parser.parse_args()
+
+    try:
+        gdf = load_risk_grid(args.source)
+    except ValueError as e:
+        raise SystemExit(str(e))
+    meta = build_tiles(gdf, args.out, args.min_zoom, args.max_zoom, source=args.source)
+    print(f"{meta['n_tiles']} tile ({meta['total_bytes'] / 1024:.0f} KB) ditulis ke '{args.out}'.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,170 @@
+"""
+Simulasi skenario "bagaimana jika": gempa hipotetis (episentrum, magnitudo, kedalaman) disuntikkan ke
+fitur gempa setiap sel final_grid yang buffer BUFFER_GEMPA_KM-nya memuat episentrum, lalu hanya sel-sel
+tersebut yang diprediksi ulang dalam satu batch.
+
+    python -m siagagempa.scenario --lat -6.9 --lon 107.6 --mag 6.5 --depth 10
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+import geopandas as gpd
+import shapely
+from pyproj import Transformer
+
+from siagagempa.config import BUFFER_GEMPA_KM, METRIC_CRS, GD_DEMOGRAFI_JABAR_CLEAN_PATH
+from siagagempa.grid import model_input_frame, update_cell_aggregates
+from siagagempa.compact_store import KELURAHAN_NAME_COLUMNS
+from siagagempa.spatial_index import SpatialIndex
+from siagagempa.risk_tiles import DEFAULT_GRID_SOURCE, RISK_LEVEL_COLORS
+from siagagempa import metrics
+
+# Urutan keparahan untuk peringkat (semakin besar semakin parah)
+LEVEL_SEVERITY = {'Rendah': 0, 'Sedang': 1, 'Tinggi': 2}
+
+
+class ScenarioSimulator:
+    """
+    Grid risiko beserta buffer sel terproyeksi (STRtree), matriks fitur model, dan level dasar setiap sel.
+    Dibangun sekali, lalu `run` untuk setiap skenario hanya menyentuh sel terdampak.
+    """
+
+    def __init__(self, gdf_grid, model, label_encoder, model_expected_features, kelurahan_names=None):
+        if gdf_grid.crs is not None and gdf_grid.crs != "EPSG:4326":
+            gdf_grid = gdf_grid.to_crs("EPSG:4326")
+        self.grid = gdf_grid.reset_index(drop=True)
+        self.model = model
+        self.label_encoder = label_encoder
+        self.model_expected_features = model_expected_features
+        self._to_metric = Transformer.from_crs("EPSG:4326", METRIC_CRS, always_xy=True)
+
+        self.cells_metric = np.asarray(self.grid.geometry.to_crs(METRIC_CRS).values)
+        # Buffer dengan resolusi yang sama seperti pembangunan grid, agar sel terdampak konsisten dengan fitur
+        self.cell_buffers = shapely.buffer(self.cells_metric, BUFFER_GEMPA_KM * 1000, quad_segs=SpatialIndex.BUFFER_QUAD_SEGS)
+        self.buffer_tree = shapely.STRtree(self.cell_buffers)
+
+        self.features = pd.DataFrame(self.grid.drop(columns=[self.grid.geometry.name, 'vulnerability_level'], errors='ignore'))
+        if 'vulnerability_level' in self.grid.columns:
+            self.baseline_levels = self.grid['vulnerability_level'].to_numpy(dtype=object)
+        else:
+            self.baseline_levels = self._predict(self.features)[0]
+
+        # Nama kab/kec/kel per kode_desa_spatial (jika data demografi memuatnya)
+        self.kelurahan_names = None
+        if kelurahan_names is not None and 'kode_desa_spatial' in self.features.columns:
+            self.kelurahan_names = (
+                self.features[['kode_desa_spatial']]
+                .merge(kelurahan_names.drop_duplicates('kode_desa_spatial'), on='kode_desa_spatial', how='left')
+                [KELURAHAN_NAME_COLUMNS].reset_index(drop=True)
+            )
+
+    @classmethod
+    def load(cls, grid_path=DEFAULT_GRID_SOURCE, demografi_path=GD_DEMOGRAFI_JABAR_CLEAN_PATH):
+        from siagagempa.resources import load_model
+
+        model, label_encoder, model_expected_features = load_model()
+        kelurahan_names = None
+        if demografi_path:
+            try:
+                demografi = gpd.read_file(demografi_path, ignore_geometry=True)
+            except Exception:
+                demografi = None
+            if demografi is not None and all(col in demografi.columns for col in ['kode_desa_spatial'] + KELURAHAN_NAME_COLUMNS):
+                kelurahan_names = demografi[['kode_desa_spatial'] + KELURAHAN_NAME_COLUMNS]
+        return cls(gpd.read_file(grid_path), model, label_encoder, model_expected_features, kelurahan_names)
+
+    def _predict(self, features):
+        X = model_input_frame(features, self.model_expected_features)
+        proba = self.model.predict_proba(X)
+        levels = self.label_encoder.inverse_transform(self.model.classes_[np.argmax(proba, axis=1)])
+        tinggi = list(self.label_encoder.classes_).index('Tinggi') if 'Tinggi' in self.label_encoder.classes_ else -1
+        prob_tinggi = proba[:, list(self.model.classes_).index(tinggi)] if tinggi >= 0 else np.zeros(len(X))
+        return levels, prob_tinggi
+
+    def run(self, latitude, longitude, magnitude, depth):
+        """
+        Menjalankan satu skenario. Mengembalikan GeoDataFrame sel terdampak, diurutkan dari yang paling
+        terpapar (level setelah skenario, peluang 'Tinggi', lalu jarak ke episentrum).
+        """
+        with metrics.stage('scenario.run') as info:
+            epicenter = shapely.points(*self._to_metric.transform(longitude, latitude))
+            idx_cell = np.sort(self.buffer_tree.query(epicenter, predicate='intersects'))
+            info['cells_affected'] = len(idx_cell)
+
+            affected = self.features.iloc[idx_cell].reset_index(drop=True)
+            update_cell_aggregates(
+                affected, np.arange(len(affected)), np.full(len(affected), float(magnitude)), np.full(len(affected), float(depth))
+            )
+            levels_after, prob_tinggi = self._predict(affected) if len(affected) else (np.array([], dtype=object), np.zeros(0))
+
+            result = gpd.GeoDataFrame({
+                'grid_id': affected['grid_id'].to_numpy() if 'grid_id' in affected.columns else idx_cell,
+                'jarak_episentrum_km': shapely.distance(self.cells_metric[idx_cell], epicenter) / 1000,
+                'level_sebelum': self.baseline_levels[idx_cell],
+                'level_sesudah': levels_after,
+                'peluang_tinggi': prob_tinggi,
+                'count_gempa': affected['count_gempa'].to_numpy(),
+                'max_mag': affected['max_mag'].to_numpy(),
+                'avg_depth': affected['avg_depth'].to_numpy(),
+                'jumlah_penduduk': affected['jumlah_penduduk'].to_numpy() if 'jumlah_penduduk' in affected.columns else 0,
+            }, geometry=self.grid.geometry.values[idx_cell], crs="EPSG:4326")
+            result['berubah'] = result['level_sebelum'] != result['level_sesudah']
+            if self.kelurahan_names is not None:
+                names = self.kelurahan_names.iloc[idx_cell].reset_index(drop=True)
+                for col in KELURAHAN_NAME_COLUMNS:
+                    result[col] = names[col].to_numpy()
+
+            result['_severity'] = result['level_sesudah'].map(LEVEL_SEVERITY).fillna(-1)
+            result = result.sort_values(
+                ['_severity', 'peluang_tinggi', 'jarak_episentrum_km'], ascending=[False, False, True], kind='stable'
+            ).drop(columns='_severity').reset_index(drop=True)
+            info['cells_changed'] = int(result['berubah'].sum())
+        return result
+
+
+def summarize_by_kelurahan(result):
+    """
+    Ringkasan per kelurahan: jumlah sel terdampak, berubah level, dan berlevel 'Tinggi' setelah skenario.
+    """
+    if not all(col in result.columns for col in KELURAHAN_NAME_COLUMNS):
+        return None
+    named = result.dropna(subset=['nama_kel'])
+    summary = named.groupby(KELURAHAN_NAME_COLUMNS).agg(
+        sel_terdampak=('grid_id', 'size'),
+        sel_berubah=('berubah', 'sum'),
+        sel_tinggi=('level_sesudah', lambda levels: int((levels == 'Tinggi').sum())),
+        peluang_tinggi_maks=('peluang_tinggi', 'max'),
+        jarak_terdekat_km=('jarak_episentrum_km', 'min'),
+    ).reset_index()
+    return summary.sort_values(['sel_tinggi', 'peluang_tinggi_maks'], ascending=False, kind='stable').reset_index(drop=True)
+
+
+def scenario_style(feature):
+    level = feature['properties'].get('level_sesudah')
+    color = RISK_LEVEL_COLORS.get(level, '#808080')
+    return {'fillColor': color, 'color': color, 'weight': 1, 'fillOpacity': 0.6}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulasi skenario gempa hipotetis pada seluruh grid provinsi.")
+    parser.add_argument('--lat', type=float, required=True)
+    parser.add_argument('--lon', type=float, required=True)
+    parser.add_argument('--mag', type=float, required=True)
+    parser.add_argument('--depth', type=float, required=True)
+    parser.add_argument('--grid', default=DEFAULT_GRID_SOURCE)
+    parser.add_argument('--top', type=int, default=20, help="Jumlah sel teratas yang ditampilkan")
+    args = parser.parse_args()
+
+    simulator = ScenarioSimulator.load(args.grid)
+    start = time.perf_counter()
+    result = simulator.run(args.lat, args.lon, args.mag, args.depth)
+    elapsed = time.perf_counter() - start
+    print(f"{len(result)} sel terdampak, {int(result['berubah'].sum())} berubah level ({elapsed * 1000:.1f} ms).")
+    with pd.option_context('display.width', 200, 'display.max_columns', 20):
+        print(pd.DataFrame(result.drop(columns='geometry')).head(args.top).to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
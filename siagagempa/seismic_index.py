@@ -0,0 +1,250 @@
+"""
+Indeks spatio-temporal katalog gempa untuk fitur berjendela waktu, mis. "jumlah gempa dan magnitudo
+maksimum dalam radius R km selama N tahun terakhir".
+
+Gempa dikelompokkan ke bucket persegi di CRS metrik lalu diurutkan menurut waktu di dalam setiap bucket
+(satu array global berurutan (bucket, waktu) dengan kunci int64). Jendela "N tahun terakhir" selalu berupa
+akhiran (suffix) dari setiap bucket, sehingga batasnya cukup dicari dengan pencarian biner; jumlah dan total
+kedalaman diambil dari prefix-sum, magnitudo maksimum dari suffix-max per bucket. Bucket yang seluruhnya
+berada di dalam radius tidak dipindai sama sekali, hanya gempa di dalam jendela pada bucket tepi yang dicek
+jaraknya satu per satu. Tidak ada pemindaian seluruh katalog per kueri. Jika `as_of` diberikan, jendela juga
+dibatasi di akhir (gempa setelah `as_of` tidak dihitung); magnitudo maksimum rentang seperti itu diambil dari
+sparse table (range-max) yang dibangun saat pertama kali diperlukan.
+
+Waktu acuan jendela default-nya adalah gempa terakhir di katalog, sehingga fitur tetap bermakna (dan
+deterministik untuk pipeline grid) meskipun katalog belum diperbarui hingga hari ini.
+"""
+import numpy as np
+import pandas as pd
+import shapely
+from pyproj import Transformer
+
+from siagagempa.config import BUFFER_GEMPA_KM, METRIC_CRS, SEISMIC_WINDOWS_YEARS
+
+SECONDS_PER_YEAR = 365.25 * 24 * 3600
+# Bit untuk offset waktu (detik sejak gempa pertama) di kunci int64; 2**40 detik ~ 34.000 tahun
+_TIME_BITS = 40
+
+_TO_METRIC = Transformer.from_crs("EPSG:4326", METRIC_CRS, always_xy=True)
+
+
+def metric_xy(lons, lats):
+    """
+    Koordinat x, y di CRS metrik (sama dengan SpatialIndex.metric_xy).
+    """
+    x, y = _TO_METRIC.transform(np.asarray(lons, dtype=float), np.asarray(lats, dtype=float))
+    return np.asarray(x), np.asarray(y)
+
+
+def window_column(prefix, years):
+    """
+    Nama kolom fitur berjendela, mis. window_column('count_gempa', 5) -> 'count_gempa_5th'.
+    """
+    return f"{prefix}_{years:g}th"
+
+
+def window_columns(windows_years=SEISMIC_WINDOWS_YEARS):
+    return [window_column(prefix, years) for years in windows_years for prefix in ('count_gempa', 'max_mag')]
+
+
+def _box_distance(px, py, xmin, ymin, xmax, ymax):
+    """
+    Jarak titik ke kotak sejajar sumbu (0 jika titik di dalam kotak).
+    """
+    dx = np.maximum(np.maximum(xmin - px, px - xmax), 0.0)
+    dy = np.maximum(np.maximum(ymin - py, py - ymax), 0.0)
+    return np.hypot(dx, dy)
+
+
+class SeismicTimeIndex:
+    """
+    Gempa terurut (bucket, waktu) beserta prefix-sum kedalaman dan suffix-max magnitudo per bucket.
+    Gempa tanpa waktu yang valid tidak diindeks.
+    """
+
+    def __init__(self, x, y, times, mag, depth, bucket_m=BUFFER_GEMPA_KM * 1000):
+        seconds = pd.to_datetime(pd.Series(np.asarray(times)), utc=True, errors='coerce', format='ISO8601')
+        valid = seconds.notna().to_numpy()
+        x, y = np.asarray(x, dtype=float)[valid], np.asarray(y, dtype=float)[valid]
+        mag, depth = np.asarray(mag, dtype=float)[valid], np.asarray(depth, dtype=float)[valid]
+        seconds = seconds[valid].to_numpy(dtype='datetime64[s]').astype(np.int64)
+
+        self.bucket_m = float(bucket_m)
+        self.t_min = int(seconds.min()) if len(seconds) else 0
+        self.t_max = int(seconds.max()) if len(seconds) else 0
+        self.x0 = float(x.min()) if len(x) else 0.0
+        self.y0 = float(y.min()) if len(y) else 0.0
+        bx, by = self._bucket_xy(x, y)
+        self.n_bx = int(bx.max()) + 1 if len(bx) else 0
+        self.n_by = int(by.max()) + 1 if len(by) else 0
+        code = bx * self.n_by + by
+        offset = seconds - self.t_min
+
+        order = np.lexsort((offset, code))
+        code, offset = code[order], offset[order]
+        self.x, self.y, self.mag, self.depth = x[order], y[order], mag[order], depth[order]
+        self.keys = (code << _TIME_BITS) | offset
+        self.bucket_codes, self.bucket_start = np.unique(code, return_index=True)
+        self.bucket_end = np.append(self.bucket_start[1:], len(code)).astype(np.int64)
+        self.depth_prefix = np.concatenate([[0.0], np.cumsum(self.depth)])
+        self.mag_suffix_max = np.empty(len(self.mag))
+        for start, end in zip(self.bucket_start, self.bucket_end):
+            self.mag_suffix_max[start:end] = np.maximum.accumulate(self.mag[start:end][::-1])[::-1]
+        self._mag_sparse_table = None
+
+    @classmethod
+    def from_geodataframe(cls, gdf_gempa, gempa_xy=None, bucket_m=BUFFER_GEMPA_KM * 1000):
+        """
+        Indeks dari GeoDataFrame gempa (kolom time, mag, depth). `gempa_xy` adalah koordinat metrik
+        yang sudah dihitung (mis. milik SpatialIndex); tanpa itu geometri diproyeksikan di sini.
+        """
+        if gempa_xy is None:
+            geoms = gdf_gempa.geometry.to_crs("EPSG:4326").values
+            gempa_xy = metric_xy(shapely.get_x(geoms), shapely.get_y(geoms))
+        return cls(gempa_xy[0], gempa_xy[1], gdf_gempa['time'], gdf_gempa['mag'], gdf_gempa['depth'], bucket_m)
+
+    def __len__(self):
+        return len(self.keys)
+
+    @property
+    def latest(self):
+        """
+        Waktu gempa terakhir di katalog (acuan default jendela), sebagai pd.Timestamp UTC.
+        """
+        return pd.Timestamp(self.t_max, unit='s', tz='UTC') if len(self) else None
+
+    def _bucket_xy(self, x, y):
+        bx = np.floor((np.asarray(x) - self.x0) / self.bucket_m).astype(np.int64)
+        by = np.floor((np.asarray(y) - self.y0) / self.bucket_m).astype(np.int64)
+        return bx, by
+
+    def _range_max_mag(self, lo, hi):
+        """
+        Magnitudo maksimum mag[lo:hi] untuk setiap pasangan (lo < hi), dari sparse table: level k menyimpan
+        maksimum 2**k gempa berurutan, sehingga setiap rentang cukup dua lookup yang tumpang tindih.
+        """
+        if self._mag_sparse_table is None:
+            table = [self.mag]
+            width = 1
+            while 2 * width <= len(self.mag):
+                table.append(np.maximum(table[-1][:-width], table[-1][width:]))
+                width *= 2
+            self._mag_sparse_table = table
+        level = np.floor(np.log2(hi - lo)).astype(np.int64)
+        result = np.empty(len(lo))
+        for k in np.unique(level):
+            rows = level == k
+            values = self._mag_sparse_table[k]
+            result[rows] = np.maximum(values[lo[rows]], values[hi[rows] - (1 << int(k))])
+        return result
+
+    def _until_offset(self, as_of):
+        """
+        Offset waktu akhir jendela (inklusif) terhadap gempa pertama; None berarti sampai gempa terakhir.
+        """
+        if as_of is None:
+            return None
+        return int(np.clip(int(pd.Timestamp(as_of).timestamp()) - self.t_min, -1, (1 << _TIME_BITS) - 1))
+
+    def _since_offset(self, years, as_of):
+        """
+        Offset waktu awal jendela terhadap gempa pertama (0 = seluruh katalog).
+        """
+        if years is None:
+            return 0
+        end = self.t_max if as_of is None else int(pd.Timestamp(as_of).timestamp())
+        return int(np.clip(end - years * SECONDS_PER_YEAR - self.t_min, 0, (1 << _TIME_BITS) - 1))
+
+    def window_stats(self, xmin, ymin, xmax=None, ymax=None, years=None, radius_m=BUFFER_GEMPA_KM * 1000, as_of=None):
+        """
+        (count, max_mag, avg_depth) gempa berjarak <= radius_m dari setiap titik (xmin, ymin) atau kotak
+        (xmin, ymin, xmax, ymax) di CRS metrik, dalam `years` tahun terakhir sebelum `as_of`
+        (default: gempa terakhir di katalog; years=None berarti seluruh katalog). max_mag dan avg_depth
+        bernilai 0 jika tidak ada gempa, seperti fitur count_gempa/max_mag/avg_depth.
+        """
+        xmin, ymin = np.atleast_1d(np.asarray(xmin, dtype=float)), np.atleast_1d(np.asarray(ymin, dtype=float))
+        xmax = xmin if xmax is None else np.atleast_1d(np.asarray(xmax, dtype=float))
+        ymax = ymin if ymax is None else np.atleast_1d(np.asarray(ymax, dtype=float))
+        n_queries = len(xmin)
+        count = np.zeros(n_queries, dtype=np.int64)
+        max_mag = np.full(n_queries, -np.inf)
+        depth_sum = np.zeros(n_queries)
+        if not len(self) or not n_queries:
+            return count, np.zeros(n_queries), depth_sum
+
+        # --- Pasangan (kueri, bucket) di sekitar kotak kueri yang diperluas radius ---
+        bx_lo, by_lo = self._bucket_xy(xmin - radius_m, ymin - radius_m)
+        bx_hi, by_hi = self._bucket_xy(xmax + radius_m, ymax + radius_m)
+        bx_lo, by_lo = np.maximum(bx_lo, 0), np.maximum(by_lo, 0)
+        bx_hi, by_hi = np.minimum(bx_hi, self.n_bx - 1), np.minimum(by_hi, self.n_by - 1)
+        n_x = np.maximum(bx_hi - bx_lo + 1, 0)
+        n_y = np.maximum(by_hi - by_lo + 1, 0)
+        n_pairs = n_x * n_y
+        query = np.repeat(np.arange(n_queries), n_pairs)
+        local = np.arange(n_pairs.sum()) - np.repeat(np.cumsum(n_pairs) - n_pairs, n_pairs)
+        bx = bx_lo[query] + local // n_y[query]
+        by = by_lo[query] + local % n_y[query]
+
+        # Hanya bucket yang berisi gempa
+        code = bx * self.n_by + by
+        pos = np.minimum(np.searchsorted(self.bucket_codes, code), len(self.bucket_codes) - 1)
+        occupied = self.bucket_codes[pos] == code
+        query, bx, by, code, pos = query[occupied], bx[occupied], by[occupied], code[occupied], pos[occupied]
+
+        # Jarak terdekat/terjauh bucket ke kotak kueri: dibuang, dihitung utuh, atau dipindai (tepi)
+        qx0, qy0, qx1, qy1 = xmin[query], ymin[query], xmax[query], ymax[query]
+        cx0, cy0 = self.x0 + bx * self.bucket_m, self.y0 + by * self.bucket_m
+        cx1, cy1 = cx0 + self.bucket_m, cy0 + self.bucket_m
+        d_min = np.hypot(np.maximum(np.maximum(cx0 - qx1, qx0 - cx1), 0.0), np.maximum(np.maximum(cy0 - qy1, qy0 - cy1), 0.0))
+        d_max = np.hypot(np.maximum(np.maximum(qx0 - cx0, cx1 - qx1), 0.0), np.maximum(np.maximum(qy0 - cy0, cy1 - qy1), 0.0))
+        near = d_min <= radius_m
+        query, code, pos, d_max = query[near], code[near], pos[near], d_max[near]
+
+        # --- Jendela waktu: akhiran setiap bucket (dipotong di as_of bila ada), dicari dengan pencarian biner ---
+        lo = np.searchsorted(self.keys, (code << _TIME_BITS) | self._since_offset(years, as_of))
+        until = self._until_offset(as_of)
+        if until is None:
+            hi = self.bucket_end[pos]
+        elif until < 0:
+            # as_of sebelum gempa pertama: jendela kosong
+            hi = lo
+        else:
+            hi = np.searchsorted(self.keys, (code << _TIME_BITS) | until, side='right')
+        has_events = lo < hi
+        query, lo, hi, d_max = query[has_events], lo[has_events], hi[has_events], d_max[has_events]
+
+        inside = d_max <= radius_m
+        q_in, lo_in, hi_in = query[inside], lo[inside], hi[inside]
+        count += np.bincount(q_in, weights=hi_in - lo_in, minlength=n_queries).astype(np.int64)
+        depth_sum += np.bincount(q_in, weights=self.depth_prefix[hi_in] - self.depth_prefix[lo_in], minlength=n_queries)
+        if until is None:
+            np.maximum.at(max_mag, q_in, self.mag_suffix_max[lo_in])
+        elif len(q_in):
+            np.maximum.at(max_mag, q_in, self._range_max_mag(lo_in, hi_in))
+
+        # Bucket tepi: cek jarak setiap gempa di dalam jendela
+        q_edge, lo_edge, hi_edge = query[~inside], lo[~inside], hi[~inside]
+        lengths = hi_edge - lo_edge
+        q_event = np.repeat(q_edge, lengths)
+        event = np.repeat(lo_edge - (np.cumsum(lengths) - lengths), lengths) + np.arange(lengths.sum())
+        hit = _box_distance(self.x[event], self.y[event], xmin[q_event], ymin[q_event], xmax[q_event], ymax[q_event]) <= radius_m
+        q_event, event = q_event[hit], event[hit]
+        count += np.bincount(q_event, minlength=n_queries)
+        depth_sum += np.bincount(q_event, weights=self.depth[event], minlength=n_queries)
+        np.maximum.at(max_mag, q_event, self.mag[event])
+
+        has_gempa = count > 0
+        avg_depth = np.divide(depth_sum, count, out=np.zeros(n_queries), where=has_gempa)
+        return count, np.where(has_gempa, max_mag, 0.0), avg_depth
+
+    def window_features(self, xmin, ymin, xmax=None, ymax=None, windows_years=SEISMIC_WINDOWS_YEARS,
+                        radius_m=BUFFER_GEMPA_KM * 1000, as_of=None):
+        """
+        {count_gempa_<N>th: ..., max_mag_<N>th: ...} untuk setiap jendela di `windows_years`.
+        """
+        features = {}
+        for years in windows_years:
+            count, max_mag, _ = self.window_stats(xmin, ymin, xmax, ymax, years, radius_m, as_of)
+            features[window_column('count_gempa', years)] = count
+            features[window_column('max_mag', years)] = max_mag
+        return features
@@ -0,0 +1,472 @@
+"""
+Layanan HTTP/JSON lokal untuk prediksi risiko tanpa antarmuka Streamlit.
+
+    python -m siagagempa.service [--host 127.0.0.1] [--port 8765] [--workers 4]
+
+Endpoint:
+    POST /predict        {"latitude": -6.9, "longitude": 107.6, "jumlah_kk": 50, "ada_rs": "Ya", ...}
+    POST /predict/batch  {"points": [{"latitude": ..., "longitude": ...}, ...]}
+    GET  /health         status, jumlah worker, dan antrean; HTTP 503 selama pool worker rusak/dimuat ulang
+    GET  /metrics        metrik per tahap (lihat siagagempa.metrics), termasuk tahap di dalam worker
+
+Kolom input pengguna sama dengan unggahan batch di halaman prediksi (USER_INPUT_DEFAULTS);
+kolom yang tidak diisi memakai nilai default. Nilai jumlah yang bukan angka atau jawaban selain Ya/Tidak
+ditolak dengan HTTP 400 yang menyebut nama kolomnya. Titik di luar poligon kelurahan Jawa Barat tidak
+punya fitur demografi, sehingga hasilnya ditandai "dalam_cakupan": false dengan "tingkat_risiko": null.
+Permintaan ditangani secara async di satu event loop,
+sedangkan fitur dan model dihitung di pool proses berukuran tetap yang masing-masing memuat model,
+data, dan SpatialIndex sekali saat start. Permintaan yang datang dalam jendela singkat digabung menjadi
+satu batch per worker, dan jika titik yang mengantre melebihi batas, permintaan baru langsung ditolak
+dengan HTTP 503 + Retry-After agar latensi tetap terkendali. Jika sebuah worker mati (mis. kehabisan
+memori), pool dibuat ulang; batch yang sedang berjalan gagal dan /health melaporkan 'degraded' sampai
+worker baru selesai memuat data.
+"""
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import numpy as np
+import pandas as pd
+
+from siagagempa.config import (
+    FEATURE_MODE, SERVICE_HOST, SERVICE_PORT, SERVICE_WORKERS, SERVICE_MAX_BATCH_POINTS,
+    SERVICE_COALESCE_MS, SERVICE_MAX_PENDING_POINTS
+)
+from siagagempa.features import (
+    predict_vulnerability_for_points, predict_vulnerability_batch,
+    USER_INPUT_DEFAULTS, LAT_COLUMN_CANDIDATES, LON_COLUMN_CANDIDATES, YA_ANSWERS, TIDAK_ANSWERS
+)
+from siagagempa.resources import load_resources, data_version
+from siagagempa import metrics
+
+MAX_BODY_BYTES = 16 * 1024 * 1024
+HTTP_REASONS = {
+    200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+    413: 'Payload Too Large', 500: 'Internal Server Error', 503: 'Service Unavailable',
+}
+
+
+class Overloaded(Exception):
+    """Antrean titik sudah penuh; klien sebaiknya mencoba lagi nanti."""
+
+
+# --- WORKER (berjalan di proses pool) ---
+_worker = {}
+
+
+def _load_worker_resources():
+    _worker['version'] = data_version()
+    _worker['resources'] = load_resources(_worker['feature_mode'])
+
+
+def _init_worker(feature_mode):
+    _worker['feature_mode'] = feature_mode
+    _load_worker_resources()
+
+
+def _worker_ready():
+    return True
+
+
+def _predict_in_worker(lats, lons, user_records):
+    """
+    Menghitung level risiko untuk satu batch gabungan. Data dimuat ulang jika file sumber berubah (ingestion).
+    Mengembalikan (level, rekaman tahap) agar metrik worker bisa digabung di proses induk; level None untuk
+    titik di luar cakupan kelurahan.
+    """
+    with metrics.capture() as records:
+        if data_version() != _worker['version']:
+            _load_worker_resources()
+        model, label_encoder, model_expected_features, gdf_gempa, gdf_poi, gdf_demografi, spatial_index = _worker['resources']
+        X, idx_kel = predict_vulnerability_for_points(
+            lats, lons, pd.DataFrame(user_records, index=range(len(lats))),
+            model_expected_features, gdf_gempa, gdf_poi, gdf_demografi, spatial_index, return_kelurahan_index=True
+        )
+        levels = predict_vulnerability_batch(X, model, label_encoder)
+    return [level if kel >= 0 else None for level, kel in zip(levels.tolist(), idx_kel)], records
+
+
+# --- VALIDASI INPUT ---
+def _parse_user_value(col, value):
+    """
+    Memvalidasi satu nilai input pengguna sesuai tipe default-nya (jumlah >= 0, atau jawaban Ya/Tidak).
+    """
+    if isinstance(USER_INPUT_DEFAULTS[col], str):
+        if str(value).strip().lower() not in YA_ANSWERS + TIDAK_ANSWERS:
+            raise ValueError(f"Kolom '{col}' harus 'Ya' atau 'Tidak', bukan {value!r}.")
+        return value
+    try:
+        if isinstance(value, bool):
+            raise ValueError
+        number = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Kolom '{col}' harus berupa angka, bukan {value!r}.")
+    if not (math.isfinite(number) and number >= 0):
+        raise ValueError(f"Kolom '{col}' harus berupa angka >= 0, bukan {value!r}.")
+    return number
+
+
+def parse_point(obj):
+    """
+    Memvalidasi satu titik JSON. Mengembalikan (lat, lon, input_pengguna) atau ValueError.
+    """
+    if not isinstance(obj, dict):
+        raise ValueError("Setiap titik harus berupa objek JSON.")
+    keys = {k.lower().strip(): k for k in obj}
+    lat_key = next((keys[c] for c in LAT_COLUMN_CANDIDATES if c in keys), None)
+    lon_key = next((keys[c] for c in LON_COLUMN_CANDIDATES if c in keys), None)
+    if lat_key is None or lon_key is None:
+        raise ValueError(f"Koordinat tidak ditemukan. Gunakan salah satu dari {LAT_COLUMN_CANDIDATES} dan {LON_COLUMN_CANDIDATES}.")
+    try:
+        lat, lon = float(obj[lat_key]), float(obj[lon_key])
+    except (TypeError, ValueError):
+        raise ValueError("Latitude dan longitude harus berupa angka.")
+    if not (math.isfinite(lat) and math.isfinite(lon) and -90 <= lat <= 90 and -180 <= lon <= 180):
+        raise ValueError(f"Koordinat di luar rentang: ({lat}, {lon}).")
+    user = {col: _parse_user_value(col, obj[col]) for col in USER_INPUT_DEFAULTS if obj.get(col) is not None}
+    return lat, lon, user
+
+
+# --- PENGGABUNGAN BATCH & BACKPRESSURE ---
+class _Job:
+    __slots__ = ('lats', 'lons', 'users', 'future', 'enqueued')
+
+    def __init__(self, lats, lons, users, future):
+        self.lats, self.lons, self.users, self.future = lats, lons, users, future
+        self.enqueued = time.perf_counter()
+
+
+class PredictionService:
+    """
+    Antrean titik di event loop yang dikirim ke pool proses dalam batch gabungan berukuran
+    hingga `max_batch_points`. Maksimal dua batch per worker berjalan bersamaan; sisanya menunggu
+    di antrean yang dibatasi `max_pending_points`.
+    """
+
+    def __init__(self, workers=SERVICE_WORKERS, max_batch_points=SERVICE_MAX_BATCH_POINTS,
+                 coalesce_ms=SERVICE_COALESCE_MS, max_pending_points=SERVICE_MAX_PENDING_POINTS,
+                 feature_mode=FEATURE_MODE):
+        self.workers = max(1, int(workers))
+        self.max_batch_points = max(1, int(max_batch_points))
+        self.coalesce_s = max(0.0, coalesce_ms) / 1000
+        self.max_pending_points = int(max_pending_points)
+        self.feature_mode = feature_mode
+        self.pending_points = 0
+        self.rejected = 0
+        self.pool_restarts = 0
+        # True sejak pool rusak sampai pool pengganti siap
+        self.degraded = False
+        self._queue = deque()
+        self._queued_points = 0
+        self._pool = None
+        self._wakeup = None
+        self._slots = None
+        self._batcher = None
+        self._recovery = None
+        self._tasks = set()
+
+    async def start(self):
+        self._wakeup = asyncio.Event()
+        self._slots = asyncio.Semaphore(self.workers * 2)
+        self._pool = self._new_pool()
+        await self._warm_up(self._pool)
+        self._batcher = asyncio.create_task(self._run_batcher())
+
+    def _new_pool(self):
+        # 'spawn' agar setiap worker memuat GDAL/GEOS sendiri, bukan salinan fork dari proses yang sudah berjalan
+        return ProcessPoolExecutor(
+            self.workers, mp_context=multiprocessing.get_context('spawn'),
+            initializer=_init_worker, initargs=(self.feature_mode,)
+        )
+
+    async def _warm_up(self, pool):
+        loop = asyncio.get_running_loop()
+        with metrics.stage('service.start_workers', labels={'workers': self.workers}):
+            await asyncio.gather(*[loop.run_in_executor(pool, _worker_ready) for _ in range(self.workers)])
+
+    def _restart_pool(self, broken_pool):
+        """
+        Mengganti pool yang rusak (sekali per pool) dan memuat worker baru di latar belakang.
+        """
+        if broken_pool is not self._pool:
+            return
+        self.degraded = True
+        self.pool_restarts += 1
+        broken_pool.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._new_pool()
+        self._recovery = asyncio.create_task(self._recover(self._pool))
+
+    async def _recover(self, pool):
+        try:
+            await self._warm_up(pool)
+        except BrokenProcessPool:
+            # Worker pengganti juga gagal dimuat: tetap 'degraded', batch berikutnya memicu penggantian lagi
+            return
+        if pool is self._pool:
+            self.degraded = False
+
+    async def close(self):
+        for task in (self._batcher, self._recovery):
+            if task is not None:
+                task.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+
+    async def predict(self, points):
+        """
+        Memprediksi daftar (lat, lon, input_pengguna). Memunculkan Overloaded jika antrean penuh.
+        """
+        n_points = len(points)
+        if n_points == 0:
+            return []
+        if self.pending_points + n_points > self.max_pending_points:
+            self.rejected += 1
+            raise Overloaded(f"Antrean penuh ({self.pending_points} titik menunggu).")
+
+        loop = asyncio.get_running_loop()
+        self.pending_points += n_points
+        futures = []
+        # Batch besar dipecah agar bisa dikerjakan beberapa worker sekaligus
+        for start in range(0, n_points, self.max_batch_points):
+            chunk = points[start:start + self.max_batch_points]
+            future = loop.create_future()
+            self._queue.append(_Job(
+                np.array([p[0] for p in chunk]), np.array([p[1] for p in chunk]), [p[2] for p in chunk], future
+            ))
+            self._queued_points += len(chunk)
+            futures.append(future)
+        self._wakeup.set()
+        try:
+            results = await asyncio.gather(*futures)
+        finally:
+            self.pending_points -= n_points
+        return [level for chunk in results for level in chunk]
+
+    def _take_batch(self):
+        jobs, n_points = [], 0
+        while self._queue and (not jobs or n_points + len(self._queue[0].lats) <= self.max_batch_points):
+            job = self._queue.popleft()
+            jobs.append(job)
+            n_points += len(job.lats)
+        self._queued_points -= n_points
+        return jobs
+
+    async def _run_batcher(self):
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            # Jendela singkat agar permintaan yang datang hampir bersamaan masuk ke batch yang sama
+            if self.coalesce_s and self._queued_points < self.max_batch_points:
+                await asyncio.sleep(self.coalesce_s)
+            while self._queue:
+                await self._slots.acquire()
+                jobs = self._take_batch()
+                if not jobs:
+                    self._slots.release()
+                    break
+                task = asyncio.create_task(self._dispatch(jobs))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _dispatch(self, jobs):
+        loop = asyncio.get_running_loop()
+        pool = self._pool
+        try:
+            lats = np.concatenate([job.lats for job in jobs])
+            lons = np.concatenate([job.lons for job in jobs])
+            users = [user for job in jobs for user in job.users]
+            now = time.perf_counter()
+            metrics.REGISTRY.record('service.queue_wait', max(now - job.enqueued for job in jobs))
+            with metrics.stage('service.batch', jobs=len(jobs), points=len(lats)):
+                levels, records = await loop.run_in_executor(pool, _predict_in_worker, lats, lons, users)
+            metrics.REGISTRY.merge(records)
+            start = 0
+            for job in jobs:
+                end = start + len(job.lats)
+                if not job.future.done():
+                    job.future.set_result(levels[start:end])
+                start = end
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                self._restart_pool(pool)
+            for job in jobs:
+                if not job.future.done():
+                    job.future.set_exception(e)
+        finally:
+            self._slots.release()
+
+    def health(self):
+        return {
+            'status': 'degraded' if self.degraded else 'ok',
+            'workers': self.workers,
+            'pending_points': self.pending_points,
+            'queued_points': self._queued_points,
+            'max_pending_points': self.max_pending_points,
+            'in_flight_batches': len(self._tasks),
+            'rejected_requests': self.rejected,
+            'pool_restarts': self.pool_restarts,
+        }
+
+
+# --- HTTP ---
+class HttpError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _json_body(body):
+    try:
+        return json.loads(body or b'null')
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        raise HttpError(400, "Body bukan JSON yang valid.")
+
+
+async def route(service, method, path, body):
+    """
+    Menangani satu permintaan. Mengembalikan (status, payload, header tambahan).
+    """
+    path = path.split('?', 1)[0].rstrip('/') or '/'
+    if path == '/health':
+        if method != 'GET':
+            raise HttpError(405, "Gunakan GET.")
+        health = service.health()
+        return (200 if health['status'] == 'ok' else 503), health, {}
+    if path == '/metrics':
+        if method != 'GET':
+            raise HttpError(405, "Gunakan GET.")
+        return 200, {'stages': metrics.REGISTRY.snapshot()}, {}
+    if path not in ('/predict', '/predict/batch'):
+        raise HttpError(404, f"Endpoint {path} tidak ditemukan.")
+    if method != 'POST':
+        raise HttpError(405, "Gunakan POST.")
+
+    payload = _json_body(body)
+    try:
+        if path == '/predict':
+            points = [parse_point(payload)]
+        else:
+            items = payload.get('points') if isinstance(payload, dict) else payload
+            if not isinstance(items, list):
+                raise ValueError("Body harus berupa {\"points\": [...]} atau daftar titik.")
+            points = []
+            for i, item in enumerate(items):
+                try:
+                    points.append(parse_point(item))
+                except ValueError as e:
+                    raise ValueError(f"Titik ke-{i}: {e}")
+    except ValueError as e:
+        raise HttpError(400, str(e))
+    if len(points) > service.max_pending_points:
+        raise HttpError(413, f"Maksimal {service.max_pending_points} titik per permintaan.")
+
+    try:
+        levels = await service.predict(points)
+    except Overloaded as e:
+        return 503, {'error': str(e)}, {'Retry-After': '1'}
+    results = [
+        {'latitude': lat, 'longitude': lon, 'tingkat_risiko': level, 'dalam_cakupan': level is not None}
+        for (lat, lon, _), level in zip(points, levels)
+    ]
+    if path == '/predict':
+        return 200, results[0], {}
+    return 200, {'count': len(results), 'results': results}, {}
+
+
+def _response(status, payload, headers, keep_alive):
+    body = json.dumps(payload, default=str).encode('utf-8')
+    lines = [f"HTTP/1.1 {status} {HTTP_REASONS.get(status, '')}",
+             'Content-Type: application/json', f'Content-Length: {len(body)}',
+             f"Connection: {'keep-alive' if keep_alive else 'close'}"]
+    lines += [f'{key}: {value}' for key, value in headers.items()]
+    return ('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1') + body
+
+
+async def handle_connection(service, reader, writer):
+    """
+    Loop HTTP/1.1 sederhana dengan keep-alive untuk satu koneksi.
+    """
+    try:
+        while True:
+            request_line = await reader.readline()
+            if not request_line:
+                break
+            headers = {}
+            while True:
+                line = await reader.readline()
+                if line in (b'\r\n', b'\n', b''):
+                    break
+                key, _, value = line.decode('latin-1').partition(':')
+                headers[key.strip().lower()] = value.strip()
+
+            keep_alive = True
+            try:
+                parts = request_line.decode('latin-1').split()
+                if len(parts) != 3:
+                    raise HttpError(400, "Baris permintaan tidak valid.")
+                method, path, version = parts
+                keep_alive = headers.get('connection', '').lower() != 'close' and (
+                    version == 'HTTP/1.1' or headers.get('connection', '').lower() == 'keep-alive')
+                length = int(headers.get('content-length') or 0)
+                if length > MAX_BODY_BYTES:
+                    keep_alive = False
+                    raise HttpError(413, f"Body maksimal {MAX_BODY_BYTES} byte.")
+                if length and headers.get('expect', '').lower() == '100-continue':
+                    writer.write(b'HTTP/1.1 100 Continue\r\n\r\n')
+                body = await reader.readexactly(length) if length else b''
+                status, payload, extra = await route(service, method.upper(), path, body)
+            except HttpError as e:
+                status, payload, extra = e.status, {'error': str(e)}, {}
+            except Exception as e:
+                status, payload, extra = 500, {'error': f"{type(e).__name__}: {e}"}, {}
+
+            writer.write(_response(status, payload, extra, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host=SERVICE_HOST, port=SERVICE_PORT, **service_kwargs):
+    service = PredictionService(**service_kwargs)
+    print(f"Memuat sumber daya di {service.workers} worker...")
+    await service.start()
+    server = await asyncio.start_server(lambda r, w: handle_connection(service, r, w), host, port)
+    print(f"Layanan prediksi berjalan di http://{host}:{port} (POST /predict, POST /predict/batch, GET /health)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Layanan HTTP/JSON prediksi risiko gempa.")
+    parser.add_argument('--host', default=SERVICE_HOST)
+    parser.add_argument('--port', type=int, default=SERVICE_PORT)
+    parser.add_argument('--workers', type=int, default=SERVICE_WORKERS)
+    parser.add_argument('--max-batch-points', type=int, default=SERVICE_MAX_BATCH_POINTS)
+    parser.add_argument('--coalesce-ms', type=float, default=SERVICE_COALESCE_MS)
+    parser.add_argument('--max-pending-points', type=int, default=SERVICE_MAX_PENDING_POINTS)
+    parser.add_argument('--feature-mode', choices=['exact', 'grid'], default=FEATURE_MODE)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(
+            args.host, args.port, workers=args.workers, max_batch_points=args.max_batch_points,
+            coalesce_ms=args.coalesce_ms, max_pending_points=args.max_pending_points, feature_mode=args.feature_mode
+        ))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+import numpy as np
+import geopandas as gpd
+import shapely
+from pyproj import Transformer
+
+from siagagempa.config import METRIC_CRS
+from siagagempa.compact_store import PoiStore, KelurahanStore
+from siagagempa.seismic_index import SeismicTimeIndex
+from siagagempa.nearest_index import NearestIndex
+from siagagempa import metrics
+
+
+class SpatialIndex:
+    """
+    Salinan geometri terproyeksi (EPSG:3857), indeks STRtree, dan poligon kelurahan yang sudah
+    di-`prepare`. Dibangun sekali per proses oleh `load_all_resources` lalu dipakai ulang oleh
+    semua kueri titik sehingga tidak ada lagi `to_crs` atas seluruh dataset per permintaan.
+    Layer POI dan demografi disimpan sebagai PoiStore/KelurahanStore (lihat siagagempa.compact_store);
+    GeoDataFrame yang diberikan dikonversi otomatis. Koordinat metrik yang sudah dihitung (mis. dari
+    bundel data, lihat siagagempa.data_bundle) dapat diberikan lewat `gempa_metric_xy`/`poi_metric_xy`.
+    Jika katalog gempa memiliki kolom `time`, indeks waktu gempa (SeismicTimeIndex) ikut dibangun untuk
+    fitur berjendela waktu. KDTree per kategori POI dan gempa (NearestIndex) untuk fitur jarak tetangga
+    terdekat dibangun saat `nearest_index` pertama kali dipakai.
+    """
+
+    # Sama dengan default Point.buffer pada versi sebelumnya, agar batas radius identik
+    BUFFER_QUAD_SEGS = 16
+
+    def __init__(self, gdf_gempa, gdf_poi, gdf_demografi, density_grid=None, feature_cache=None,
+                 gempa_metric_xy=None, poi_metric_xy=None):
+        self._to_metric = Transformer.from_crs("EPSG:4326", METRIC_CRS, always_xy=True)
+
+        with metrics.stage('spatial_index.to_crs', labels={'layer': 'gempa'}, rows=len(gdf_gempa)):
+            if gempa_metric_xy is not None:
+                self.gempa_proj = gpd.GeoSeries(shapely.points(*gempa_metric_xy), index=gdf_gempa.index, crs=METRIC_CRS)
+            else:
+                self.gempa_proj = gdf_gempa.geometry.to_crs(METRIC_CRS)
+        self.poi = gdf_poi if isinstance(gdf_poi, PoiStore) else PoiStore.from_geodataframe(gdf_poi)
+        self.kelurahan = gdf_demografi if isinstance(gdf_demografi, KelurahanStore) else KelurahanStore.from_geodataframe(gdf_demografi)
+        with metrics.stage('spatial_index.to_crs', labels={'layer': 'poi'}, rows=len(self.poi)):
+            # Satu-satunya salinan geometri POI: titik metrik untuk STRtree
+            if poi_metric_xy is not None:
+                self.poi_geoms = shapely.points(*poi_metric_xy)
+            else:
+                self.poi_geoms = self.points_metric(self.poi.lon, self.poi.lat)
+        self.kelurahan_geoms = self.kelurahan.geoms
+
+        with metrics.stage('spatial_index.build_trees', rows=len(gdf_gempa) + len(self.poi) + len(self.kelurahan)):
+            self.gempa_geoms = np.asarray(self.gempa_proj.values)
+            self.gempa_tree = shapely.STRtree(self.gempa_geoms)
+            self.poi_tree = shapely.STRtree(self.poi_geoms)
+            self.kelurahan_tree = shapely.STRtree(self.kelurahan_geoms)
+            # Poligon yang di-prepare dipakai otomatis oleh predikat vektor shapely
+            shapely.prepare(self.kelurahan_geoms)
+
+        self.gempa_time_index = None
+        if 'time' in gdf_gempa.columns:
+            with metrics.stage('spatial_index.build_time_index', rows=len(gdf_gempa)):
+                gempa_xy = (shapely.get_x(self.gempa_geoms), shapely.get_y(self.gempa_geoms))
+                self.gempa_time_index = SeismicTimeIndex.from_geodataframe(gdf_gempa, gempa_xy)
+
+        self.gempa_mag = gdf_gempa['mag'].to_numpy() if 'mag' in gdf_gempa.columns else None
+        self._nearest_index = None
+
+        # Opsional: DensityGrid untuk fitur radius mode 'grid' (lihat siagagempa.density_grid)
+        self.density_grid = density_grid
+        # Opsional: LocationFeatureCache bersama untuk fitur lokasi (lihat siagagempa.feature_cache)
+        self.feature_cache = feature_cache
+
+    @property
+    def nearest_index(self):
+        """
+        NearestIndex (lihat siagagempa.nearest_index), dibangun sekali saat pertama dipakai.
+        """
+        if self._nearest_index is None:
+            with metrics.stage('spatial_index.build_nearest_index', rows=len(self.gempa_geoms) + len(self.poi)):
+                self._nearest_index = NearestIndex(
+                    (shapely.get_x(self.poi_geoms), shapely.get_y(self.poi_geoms)), self.poi.category_codes,
+                    self.poi.categories, (shapely.get_x(self.gempa_geoms), shapely.get_y(self.gempa_geoms)),
+                    self.gempa_mag,
+                )
+        return self._nearest_index
+
+    def points(self, lons, lats):
+        """
+        Membuat array titik EPSG:4326.
+        """
+        return shapely.points(np.asarray(lons, dtype=float), np.asarray(lats, dtype=float))
+
+    def metric_xy(self, lons, lats):
+        """
+        Koordinat x, y di CRS metrik memakai transformer yang sudah di-cache.
+        """
+        x, y = self._to_metric.transform(np.asarray(lons, dtype=float), np.asarray(lats, dtype=float))
+        return np.asarray(x), np.asarray(y)
+
+    def points_metric(self, lons, lats):
+        """
+        Membuat array titik langsung di CRS metrik.
+        """
+        return shapely.points(*self.metric_xy(lons, lats))
+
+    def locate_kelurahan(self, points):
+        """
+        Point-in-polygon untuk semua titik. Mengembalikan posisi baris kelurahan pertama
+        yang memuat tiap titik, atau -1 jika titik berada di luar semua kelurahan.
+        """
+        with metrics.stage('spatial.kelurahan_join', points=len(points)) as info:
+            result = np.full(len(points), -1, dtype=np.int64)
+            idx_point, idx_kel = self.kelurahan_tree.query(points)
+            info['rows_scanned'] = len(idx_point)
+            if len(idx_point):
+                hit = shapely.intersects(self.kelurahan_geoms[idx_kel], points[idx_point])
+                idx_point, idx_kel = idx_point[hit], idx_kel[hit]
+                idx_point, first = np.unique(idx_point, return_index=True)
+                result[idx_point] = idx_kel[first]
+            info['rows_matched'] = len(idx_point)
+        return result
+
+    def _query_within(self, stage_name, tree, geoms, points_metric, radius_m):
+        """
+        Kandidat dari bounding box di STRtree lalu predikat intersects terhadap buffer (sama dengan
+        kueri STRtree ber-predikat), dengan jumlah kandidat dan hasil dicatat ke metrik.
+        """
+        with metrics.stage(stage_name, labels={'radius_m': radius_m}, points=len(points_metric)) as info:
+            buffers = shapely.buffer(points_metric, radius_m, quad_segs=self.BUFFER_QUAD_SEGS)
+            idx_point, idx_row = tree.query(buffers)
+            info['rows_scanned'] = len(idx_point)
+            if len(idx_point):
+                shapely.prepare(buffers)
+                hit = shapely.intersects(buffers[idx_point], geoms[idx_row])
+                idx_point, idx_row = idx_point[hit], idx_row[hit]
+            info['rows_matched'] = len(idx_point)
+        return idx_point, idx_row
+
+    def query_gempa(self, points_metric, radius_m):
+        """
+        Pasangan (indeks titik, indeks gempa) untuk gempa di dalam buffer `radius_m` meter.
+        """
+        return self._query_within('spatial.gempa_join', self.gempa_tree, self.gempa_geoms, points_metric, radius_m)
+
+    def query_poi(self, points_metric, radius_m):
+        """
+        Pasangan (indeks titik, indeks POI) untuk POI di dalam buffer `radius_m` meter.
+        """
+        return self._query_within('spatial.poi_join', self.poi_tree, self.poi_geoms, points_metric, radius_m)
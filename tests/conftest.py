@@ -0,0 +1,60 @@
+"""
+Fixture bersama. Path data di siagagempa.config relatif terhadap folder repo, jadi semua test berjalan dari sana;
+test yang butuh file data yang tidak ada (mis. GeoPackage POI/demografi yang tidak ikut di git) dilewati.
+
+    python -m pytest tests
+"""
+import os
+
+import numpy as np
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture(autouse=True)
+def repo_cwd(monkeypatch):
+    monkeypatch.chdir(REPO_DIR)
+
+
+def require_files(*paths):
+    missing = [path for path in paths if not os.path.exists(os.path.join(REPO_DIR, path))]
+    if missing:
+        pytest.skip(f"File data tidak tersedia: {missing}")
+
+
+@pytest.fixture(scope='session')
+def model():
+    import joblib
+    from siagagempa.config import MODEL_FILENAME
+
+    require_files(MODEL_FILENAME)
+    return joblib.load(os.path.join(REPO_DIR, MODEL_FILENAME))
+
+
+@pytest.fixture(scope='session')
+def geodata():
+    """
+    (gdf_gempa, gdf_poi, gdf_demografi) dari GeoPackage, seperti `resources.load_geodata`.
+    """
+    from siagagempa.resources import GEODATA_PATHS, load_geodata
+
+    require_files(*GEODATA_PATHS)
+    cwd = os.getcwd()
+    os.chdir(REPO_DIR)
+    try:
+        return load_geodata()
+    finally:
+        os.chdir(cwd)
+
+
+def random_points(gdf_demografi, n_points, seed=1):
+    """
+    Separuh titik di sekitar Bandung (POI padat), separuh seragam di seluruh provinsi.
+    """
+    rng = np.random.default_rng(seed)
+    min_lon, min_lat, max_lon, max_lat = gdf_demografi.to_crs("EPSG:4326").total_bounds
+    n_city = n_points // 2
+    lats = np.r_[rng.normal(-6.92, 0.05, n_city), rng.uniform(min_lat, max_lat, n_points - n_city)]
+    lons = np.r_[rng.normal(107.61, 0.05, n_city), rng.uniform(min_lon, max_lon, n_points - n_city)]
+    return lats, lons
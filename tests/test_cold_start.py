@@ -0,0 +1,32 @@
+"""
+Start dingin dari bundel data tidak boleh memuat scikit-learn (model terkompilasi dan NearestIndex lazy).
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+COLD_START = """
+import sys
+from siagagempa.resources import load_resources
+load_resources()
+print(sorted(name for name in sys.modules if name == 'sklearn' or name.startswith('sklearn.')))
+"""
+
+
+def test_bundle_cold_start_does_not_import_sklearn(monkeypatch):
+    from siagagempa.data_bundle import bundle_is_current
+
+    # Path data di config relatif terhadap folder repo
+    monkeypatch.chdir(REPO_DIR)
+    if not bundle_is_current():
+        pytest.skip("Bundel data belum dibangun: python -m siagagempa.data_bundle build")
+    # Proses baru agar modul yang sudah diimpor oleh test lain tidak ikut terhitung
+    result = subprocess.run(
+        [sys.executable, '-c', COLD_START], cwd=REPO_DIR, capture_output=True, text=True, check=True,
+        env={**os.environ, 'PYTHONPATH': REPO_DIR}
+    )
+    assert result.stdout.strip().splitlines()[-1] == '[]'
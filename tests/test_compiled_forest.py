@@ -0,0 +1,70 @@
+"""
+CompiledForest memberi probabilitas identik dengan RandomForestClassifier.
+"""
+import os
+
+import geopandas as gpd
+import numpy as np
+import pytest
+
+from siagagempa.compiled_forest import CompiledForest, forest_arrays, _bitvector_arrays
+from siagagempa.grid import model_input_frame
+from conftest import REPO_DIR, require_files
+
+GRID_PATH = os.path.join('data', 'final_grid_data_processed.gpkg')
+
+
+@pytest.fixture(scope='module')
+def forest(model):
+    return CompiledForest.from_estimator(model)
+
+
+@pytest.fixture(scope='module')
+def X_grid(model):
+    require_files(GRID_PATH)
+    gdf_grid = gpd.read_file(os.path.join(REPO_DIR, GRID_PATH))
+    return model_input_frame(gdf_grid.drop(columns=gdf_grid.geometry.name), model.feature_names_in_.tolist())
+
+
+def random_rows(X_grid, n_rows, seed=42):
+    """
+    Baris grid yang diacak dan diskalakan per kolom, agar jalur di luar data pelatihan ikut teruji.
+    """
+    rng = np.random.default_rng(seed)
+    X = X_grid.sample(n_rows, replace=True, random_state=seed).reset_index(drop=True)
+    return X * rng.uniform(0.5, 1.5, size=X.shape)
+
+
+def test_proba_matches_sklearn(model, forest, X_grid):
+    for X in [X_grid, random_rows(X_grid, 5000)]:
+        np.testing.assert_array_equal(forest.predict_proba(X), model.predict_proba(X))
+        np.testing.assert_array_equal(forest.predict(X), model.predict(X))
+
+
+def test_single_rows_match_sklearn(model, forest, X_grid):
+    X = random_rows(X_grid, 5, seed=7)
+    for i in range(len(X)):
+        np.testing.assert_array_equal(forest.predict_proba(X.iloc[[i]]), model.predict_proba(X.iloc[[i]]))
+
+
+def test_missing_values_match_sklearn(model, forest, X_grid):
+    X = random_rows(X_grid, 500, seed=3)
+    rng = np.random.default_rng(3)
+    X = X.mask(rng.random(X.shape) < 0.2)
+    np.testing.assert_array_equal(forest.predict_proba(X), model.predict_proba(X))
+
+
+def test_contributions_sum_to_proba(forest, X_grid):
+    X = random_rows(X_grid, 200, seed=5)
+    bias, contrib = forest.contributions(X)
+    np.testing.assert_allclose(bias + contrib.sum(axis=1), forest.predict_proba(X), atol=1e-9)
+
+
+def test_compile_rejects_non_depth_first_trees(model):
+    _, arrays = forest_arrays(model)
+    left, right = arrays['children_left'].copy(), arrays['children_right'].copy()
+    # Menukar anak kiri/kanan akar pohon pertama merusak urutan preorder
+    root = arrays['roots'][0]
+    left[root], right[root] = right[root], left[root]
+    with pytest.raises(ValueError, match="depth-first"):
+        _bitvector_arrays(arrays['roots'], arrays['feature'], arrays['threshold'], left, right, model.n_features_in_)
@@ -0,0 +1,40 @@
+"""
+Fitur dari bundel data (koordinat metrik tersimpan) sama persis dengan jalur GeoPackage.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from siagagempa.data_bundle import bundle_is_current, load_bundle_geodata
+from siagagempa.features import (
+    predict_vulnerability_for_points, compute_seismic_window_features, compute_nearest_features
+)
+from siagagempa.resources import load_compact_geodata
+from siagagempa.spatial_index import SpatialIndex
+from conftest import random_points
+
+
+def test_bundle_features_match_geopackage(model, geodata):
+    if not bundle_is_current():
+        pytest.skip("Bundel data belum dibangun: python -m siagagempa.data_bundle build")
+    features = model.feature_names_in_.tolist()
+    lats, lons = random_points(geodata[2], 500, seed=2)
+
+    results = []
+    for gdf_gempa, gdf_poi, gdf_demografi, metric_xy in [
+        load_bundle_geodata(), (*load_compact_geodata(), {})
+    ]:
+        spatial_index = SpatialIndex(gdf_gempa, gdf_poi, gdf_demografi, **metric_xy)
+        X, idx_kel = predict_vulnerability_for_points(
+            lats, lons, None, features, gdf_gempa, gdf_poi, gdf_demografi, spatial_index, return_kelurahan_index=True
+        )
+        extra = pd.DataFrame({
+            **compute_seismic_window_features(lats, lons, spatial_index),
+            **compute_nearest_features(lats, lons, spatial_index),
+        })
+        results.append((X, idx_kel, extra))
+
+    (X_bundle, kel_bundle, extra_bundle), (X_gpkg, kel_gpkg, extra_gpkg) = results
+    pd.testing.assert_frame_equal(X_bundle, X_gpkg, check_exact=True)
+    np.testing.assert_array_equal(kel_bundle, kel_gpkg)
+    pd.testing.assert_frame_equal(extra_bundle, extra_gpkg, check_exact=True)
@@ -0,0 +1,88 @@
+"""
+Fitur batch mode exact sama dengan implementasi awal per titik (sjoin GeoPandas).
+"""
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+from shapely.geometry import Point
+
+from siagagempa.config import BUFFER_GEMPA_KM, BUFFER_POI_METER, POI_CATEGORY_COLUMNS
+from siagagempa.features import predict_vulnerability_for_points, USER_INPUT_DEFAULTS
+from siagagempa.spatial_index import SpatialIndex
+from conftest import random_points
+
+DEMOG_COLUMNS = [
+    'jumlah_penduduk', 'pria', 'wanita', 'jumlah_produktif', 'jumlah_non_produktif', 'rasio_lp',
+    'rasio_produktif_nonproduktif', 'kepadatan_penduduk_kelurahan', 'jumlah_penduduk_miskin_kelurahan_estimasi'
+]
+CONFIRMATION_COLUMNS = {
+    'ada_rs': 'Fasilitas Kesehatan', 'ada_sekolah': 'Sekolah', 'ada_pemerintahan': 'Pemerintahan/Publik',
+    'ada_fasos_lain': 'Fasilitas Sosial/Publik Lain', 'ada_bangunan_biasa': 'Bangunan Biasa',
+}
+
+
+def baseline_features(lat, lon, user, model_expected_features, gdf_gempa, gdf_poi, gdf_demografi):
+    """
+    Fitur satu titik seperti `predict_vulnerability_for_point` sebelum optimasi: buffer di EPSG:3857
+    lalu sjoin terhadap seluruh layer.
+    """
+    user_point = gpd.GeoDataFrame(geometry=[Point(lon, lat)], crs="EPSG:4326")
+    user_point_proj = user_point.to_crs(epsg=3857)
+
+    demog_sjoin = gpd.sjoin(user_point, gdf_demografi, how="inner", predicate='intersects')
+    if demog_sjoin.empty:
+        demog = {col: 0.0 for col in DEMOG_COLUMNS}
+    else:
+        demog = {col: demog_sjoin.iloc[0].get(col, 0.0) for col in DEMOG_COLUMNS}
+    final_non_produktif = max(user['jumlah_anak'] + user['jumlah_lansia'], demog['jumlah_non_produktif'])
+    demog['jumlah_non_produktif'] = final_non_produktif
+    demog['rasio_produktif_nonproduktif'] = (
+        demog['jumlah_produktif'] / final_non_produktif if final_non_produktif > 0 else 1.0
+    )
+
+    buffer_gempa = gpd.GeoDataFrame(
+        geometry=[user_point_proj.geometry.iloc[0].buffer(BUFFER_GEMPA_KM * 1000)], crs="EPSG:3857"
+    ).to_crs(epsg=4326)
+    gempa_sjoin = gpd.sjoin(gdf_gempa, buffer_gempa, how="inner", predicate='intersects')
+    if gempa_sjoin.empty:
+        gempa = {'count_gempa': 0, 'max_mag': 0.0, 'avg_depth': 0.0}
+    else:
+        gempa = {'count_gempa': len(gempa_sjoin), 'max_mag': gempa_sjoin['mag'].max(), 'avg_depth': gempa_sjoin['depth'].mean()}
+
+    buffer_poi = gpd.GeoDataFrame(
+        geometry=[user_point_proj.geometry.iloc[0].buffer(BUFFER_POI_METER)], crs="EPSG:3857"
+    ).to_crs(epsg=4326)
+    poi_counts = gpd.sjoin(gdf_poi, buffer_poi, how="inner", predicate='intersects')['category'].value_counts().to_dict()
+    poi = {col: poi_counts.get(category, 0) for category, col in POI_CATEGORY_COLUMNS.items()}
+    for user_col, category in CONFIRMATION_COLUMNS.items():
+        if user[user_col] == 'Ya':
+            poi[POI_CATEGORY_COLUMNS[category]] = max(1, poi[POI_CATEGORY_COLUMNS[category]])
+
+    rasio_lp = user['jumlah_laki'] / user['jumlah_perempuan'] if user['jumlah_perempuan'] > 0 else 1.0
+    features = {**demog, **gempa, **poi, 'user_input_jumlah_kk': user['jumlah_kk'], 'user_input_rasio_lp': rasio_lp}
+    return pd.DataFrame([pd.Series(features)]).reindex(columns=model_expected_features, fill_value=0.0)
+
+
+def random_user_inputs(n_points, seed=1):
+    rng = np.random.default_rng(seed)
+    user = {col: rng.integers(0, 100, n_points) for col in ['jumlah_kk', 'jumlah_laki', 'jumlah_perempuan']}
+    user.update({col: rng.integers(0, 30, n_points) for col in ['jumlah_anak', 'jumlah_lansia']})
+    user.update({col: rng.choice(['Ya', 'Tidak'], n_points) for col in CONFIRMATION_COLUMNS})
+    return pd.DataFrame(user)[list(USER_INPUT_DEFAULTS)]
+
+
+def test_exact_features_match_baseline(model, geodata):
+    gdf_gempa, gdf_poi, gdf_demografi = geodata
+    features = model.feature_names_in_.tolist()
+    lats, lons = random_points(gdf_demografi, 60)
+    user_inputs = random_user_inputs(len(lats))
+
+    spatial_index = SpatialIndex(gdf_gempa, gdf_poi, gdf_demografi)
+    X = predict_vulnerability_for_points(lats, lons, user_inputs, features, gdf_gempa, gdf_poi, gdf_demografi, spatial_index)
+    X_baseline = pd.concat([
+        baseline_features(lat, lon, user, features, gdf_gempa, gdf_poi, gdf_demografi)
+        for lat, lon, (_, user) in zip(lats, lons, user_inputs.iterrows())
+    ], ignore_index=True)
+
+    np.testing.assert_allclose(X.to_numpy(dtype=float), X_baseline.to_numpy(dtype=float), rtol=1e-9)
+    np.testing.assert_array_equal(model.predict(X), model.predict(X_baseline))
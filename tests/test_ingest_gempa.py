@@ -0,0 +1,128 @@
+"""
+Ingestion gempa: deduplikasi (id USGS, fallback time+lat+lon, versi `updated` terbaru), agregat sel inkremental,
+dan ingest ulang idempoten.
+"""
+import os
+import shutil
+
+import geopandas as gpd
+import numpy as np
+import pandas as pd
+import pytest
+
+from siagagempa import ingest_gempa
+from siagagempa.config import GD_GEMPA_JABAR_PATH, GD_DEMOGRAFI_JABAR_CLEAN_PATH
+from siagagempa.grid import update_cell_aggregates
+from siagagempa.ingest_gempa import read_catalog, select_new_events, append_events, _conform_schema
+from siagagempa.risk_tiles import DEFAULT_GRID_SOURCE
+from conftest import REPO_DIR, require_files
+
+
+def catalog(rows):
+    df = pd.DataFrame(rows)
+    return gpd.GeoDataFrame(df, geometry=gpd.points_from_xy(df['longitude'], df['latitude']), crs="EPSG:4326")
+
+
+def event(id_, time, updated='2024-01-01T00:00:00Z', lat=-6.9, lon=107.6, mag=4.5):
+    return {'id': id_, 'time': time, 'updated': updated, 'latitude': lat, 'longitude': lon,
+            'mag': mag, 'depth': 10.0, 'place': 'Jawa Barat'}
+
+
+def test_select_new_events_dedupes_against_catalog_and_within_batch():
+    existing = catalog([event('us1', '2024-01-01T00:00:00Z')])
+    new = catalog([
+        event('us1', '2024-01-01T00:00:00Z'),  # sudah ada di katalog
+        event('us2', '2024-02-01T00:00:00Z', updated='2024-02-02T00:00:00Z', mag=4.9),
+        event('us2', '2024-02-01T00:00:00Z', updated='2024-02-01T00:00:00Z', mag=4.7),  # revisi lama
+        event(None, '2024-03-01T00:00:00Z', lat=-7.0),  # tanpa id: kunci time+lat+lon
+        event(None, '2024-03-01T00:00:00Z', lat=-7.0),
+        event(None, '2024-03-01T00:00:00Z', lat=-7.1),
+    ])
+
+    selected = select_new_events(new, existing)
+    assert sorted(selected['id'].fillna('-')) == ['-', '-', 'us2']
+    assert selected.loc[selected['id'] == 'us2', 'mag'].tolist() == [4.9]
+    assert sorted(selected.loc[selected['id'].isna(), 'latitude']) == [-7.1, -7.0]
+
+
+def test_events_without_id_match_existing_fallback_key():
+    existing = catalog([event(None, '2024-03-01T00:00:00Z', lat=-7.0)])
+    new = catalog([event(None, '2024-03-01T00:00:00Z', lat=-7.0), event(None, '2024-03-01T00:00:00Z', lat=-7.2)])
+    assert select_new_events(new, existing)['latitude'].tolist() == [-7.2]
+
+
+def test_reingesting_appended_events_finds_nothing_new(tmp_path):
+    require_files(GD_GEMPA_JABAR_PATH)
+    gempa_path = str(tmp_path / 'gempa.gpkg')
+    shutil.copyfile(os.path.join(REPO_DIR, GD_GEMPA_JABAR_PATH), gempa_path)
+    existing = gpd.read_file(gempa_path)
+    csv_path = tmp_path / 'query.csv'
+    # Satu gempa yang sudah ada ditambah satu gempa baru, masing-masing ditulis dua kali
+    rows = pd.DataFrame(existing.drop(columns=existing.geometry.name).iloc[[0]])
+    new_row = rows.assign(id='test0001', time='2030-01-01T00:00:00.000Z')
+    pd.concat([rows, new_row, rows, new_row]).to_csv(csv_path, index=False)
+
+    new_events = select_new_events(read_catalog([csv_path]), existing)
+    assert new_events['id'].tolist() == ['test0001']
+    append_events(_conform_schema(new_events, existing), gempa_path)
+
+    updated = gpd.read_file(gempa_path)
+    assert len(updated) == len(existing) + 1
+    assert select_new_events(read_catalog([csv_path]), updated).empty
+
+
+def test_update_cell_aggregates_matches_full_recompute():
+    rng = np.random.default_rng(0)
+    n_cells, n_events = 40, 500
+    idx_cell = rng.integers(0, n_cells - 5, n_events)  # 5 sel terakhir tidak pernah terkena gempa
+    mags = rng.uniform(2.5, 7.0, n_events)
+    depths = rng.uniform(1.0, 300.0, n_events)
+    grid = pd.DataFrame({'count_gempa': np.zeros(n_cells, dtype=np.int64),
+                         'avg_depth': np.zeros(n_cells), 'max_mag': np.zeros(n_cells)})
+
+    # Tiga batch inkremental, mulai dari pengisi 0
+    for part in np.array_split(np.arange(n_events), 3):
+        update_cell_aggregates(grid, idx_cell[part], mags[part], depths[part])
+
+    full = pd.DataFrame({'cell': idx_cell, 'mag': mags, 'depth': depths}).groupby('cell').agg(
+        count_gempa=('mag', 'size'), avg_depth=('depth', 'mean'), max_mag=('mag', 'max')
+    ).reindex(range(n_cells), fill_value=0)
+    assert grid['count_gempa'].tolist() == full['count_gempa'].tolist()
+    np.testing.assert_allclose(grid['avg_depth'], full['avg_depth'], rtol=1e-12)
+    np.testing.assert_array_equal(grid['max_mag'], full['max_mag'])
+
+
+def test_interrupted_ingest_reruns_to_same_grid(tmp_path, monkeypatch):
+    require_files(GD_GEMPA_JABAR_PATH, GD_DEMOGRAFI_JABAR_CLEAN_PATH, DEFAULT_GRID_SOURCE)
+    existing = gpd.read_file(os.path.join(REPO_DIR, GD_GEMPA_JABAR_PATH))
+    csv_path = tmp_path / 'query.csv'
+    rows = pd.DataFrame(existing.drop(columns=existing.geometry.name).iloc[:3])
+    rows.assign(id=['test0001', 'test0002', 'test0003'], time='2030-01-01T00:00:00.000Z', mag=6.8).to_csv(csv_path, index=False)
+
+    def run(name, crash_path=None):
+        paths = {'gempa': str(tmp_path / f'{name}_gempa.gpkg'), 'grid': str(tmp_path / f'{name}_grid.gpkg')}
+        shutil.copyfile(os.path.join(REPO_DIR, GD_GEMPA_JABAR_PATH), paths['gempa'])
+        shutil.copyfile(os.path.join(REPO_DIR, DEFAULT_GRID_SOURCE), paths['grid'])
+        if crash_path:
+            replace_atomic = ingest_gempa._replace_atomic
+
+            def crash(path, write):
+                if path == paths[crash_path]:
+                    raise RuntimeError("terputus")
+                replace_atomic(path, write)
+
+            with monkeypatch.context() as m:
+                m.setattr(ingest_gempa, '_replace_atomic', crash)
+                with pytest.raises(RuntimeError):
+                    ingest_gempa.ingest([csv_path], paths['gempa'], paths['grid'], GD_DEMOGRAFI_JABAR_CLEAN_PATH, tiles_dir='')
+        summary = ingest_gempa.ingest([csv_path], paths['gempa'], paths['grid'], GD_DEMOGRAFI_JABAR_CLEAN_PATH, tiles_dir='')
+        assert summary['new_events'] == 3 and summary['cells_updated'] > 0
+        return gpd.read_file(paths['grid']), gpd.read_file(paths['gempa'])
+
+    grid_once, gempa_once = run('once')
+    # Terputus saat menulis grid maupun saat menambahkan gempa: ingest ulang harus menghasilkan grid yang sama
+    for crash_path in ['grid', 'gempa']:
+        grid_rerun, gempa_rerun = run(crash_path, crash_path)
+        assert len(gempa_rerun) == len(gempa_once) == len(existing) + 3
+        pd.testing.assert_frame_equal(pd.DataFrame(grid_rerun.drop(columns='geometry')),
+                                      pd.DataFrame(grid_once.drop(columns='geometry')))
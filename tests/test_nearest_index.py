@@ -0,0 +1,53 @@
+"""
+Fitur tetangga terdekat: jarak sama dengan brute force, dan input kosong menghasilkan kolom lengkap tanpa baris.
+"""
+import numpy as np
+import pandas as pd
+
+from siagagempa.config import NEAREST_POI_COLUMNS, NEAREST_GEMPA_K
+from siagagempa.features import compute_nearest_features
+from siagagempa.nearest_index import NearestIndex, nearest_columns, ground_scale
+from siagagempa.spatial_index import SpatialIndex
+
+CATEGORIES = list(NEAREST_POI_COLUMNS)
+
+
+def synthetic_index(seed=0, n_poi=60, n_gempa=30):
+    rng = np.random.default_rng(seed)
+    poi_xy = rng.uniform(-5e4, 5e4, (2, n_poi)) + np.array([[1.19e7], [-7.7e5]])
+    gempa_xy = rng.uniform(-5e4, 5e4, (2, n_gempa)) + np.array([[1.19e7], [-7.7e5]])
+    nearest_index = NearestIndex(
+        poi_xy=tuple(poi_xy), poi_codes=rng.integers(0, len(CATEGORIES), n_poi), poi_categories=CATEGORIES,
+        gempa_xy=tuple(gempa_xy), gempa_mag=rng.uniform(2.5, 6.5, n_gempa)
+    )
+    return nearest_index, poi_xy, gempa_xy
+
+
+def test_nearest_gempa_matches_brute_force():
+    nearest_index, _, gempa_xy = synthetic_index()
+    x, y = np.array([1.19e7, 1.192e7]), np.array([-7.7e5, -7.6e5])
+    dist, idx = nearest_index.nearest_gempa(x, y, k=NEAREST_GEMPA_K)
+
+    brute = np.hypot(gempa_xy[0][None, :] - x[:, None], gempa_xy[1][None, :] - y[:, None])
+    expected = np.sort(brute, axis=1)[:, :NEAREST_GEMPA_K] * ground_scale(y)[:, None]
+    np.testing.assert_allclose(dist, expected, rtol=1e-12)
+    assert idx.shape == (2, NEAREST_GEMPA_K)
+
+
+def test_empty_input_returns_empty_columns():
+    nearest_index, _, _ = synthetic_index()
+    empty = np.array([], dtype=float)
+
+    dist, idx = nearest_index.nearest_poi(empty, empty, CATEGORIES[0])
+    assert dist.shape == idx.shape == (0, 1)
+    dist, idx = nearest_index.nearest_gempa(empty, empty)
+    assert dist.shape == idx.shape == (0, NEAREST_GEMPA_K)
+
+    features = pd.DataFrame(nearest_index.features(empty, empty))
+    assert features.columns.tolist() == nearest_columns() and features.empty
+
+
+def test_compute_nearest_features_empty(geodata):
+    spatial_index = SpatialIndex(*geodata)
+    features = pd.DataFrame(compute_nearest_features([], [], spatial_index))
+    assert features.columns.tolist() == nearest_columns() and features.empty
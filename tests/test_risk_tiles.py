@@ -0,0 +1,37 @@
+"""
+Tile peta risiko: metadata mencatat grid sumber dan ukuran sel, dan pembaruan inkremental hanya untuk grid yang sama.
+"""
+import geopandas as gpd
+import numpy as np
+import shapely
+
+from siagagempa.risk_tiles import build_tiles, update_tiles, load_tiles_metadata, tiles_built_from
+
+
+def synthetic_grid(cell_size=0.045, n=6):
+    xs, ys = np.meshgrid(107.0 + cell_size * np.arange(n), -7.0 + cell_size * np.arange(n))
+    cells = shapely.box(xs.ravel(), ys.ravel(), xs.ravel() + cell_size, ys.ravel() + cell_size)
+    levels = np.array(['Rendah', 'Sedang', 'Tinggi'])[np.arange(n * n) % 3]
+    return gpd.GeoDataFrame({'vulnerability_level': levels}, geometry=cells, crs="EPSG:4326")
+
+
+def test_metadata_records_source_and_cell_size(tmp_path):
+    out_dir = str(tmp_path / 'tiles')
+    meta = build_tiles(synthetic_grid(), out_dir, min_zoom=7, max_zoom=9, source='data/grid_a.gpkg')
+
+    assert load_tiles_metadata(out_dir) == meta
+    assert meta['source'] == 'data/grid_a.gpkg'
+    assert abs(meta['cell_size_deg'] - 0.045) < 1e-9 and meta['cell_size_km'] == 5.01
+    assert tiles_built_from('data/grid_a.gpkg', out_dir) and not tiles_built_from('data/grid_b.gpkg', out_dir)
+
+
+def test_update_tiles_skips_other_source(tmp_path):
+    out_dir = str(tmp_path / 'tiles')
+    gdf = synthetic_grid()
+    build_tiles(gdf, out_dir, min_zoom=7, max_zoom=9, source='data/grid_a.gpkg')
+    changed = np.zeros(len(gdf), dtype=bool)
+    changed[0] = True
+
+    assert update_tiles(gdf, changed, out_dir, source='data/grid_b.gpkg') is None
+    assert update_tiles(gdf, changed, out_dir, source='data/grid_a.gpkg') == 3
+    assert load_tiles_metadata(out_dir)['source'] == 'data/grid_a.gpkg'
@@ -0,0 +1,89 @@
+"""
+Statistik jendela waktu SeismicTimeIndex sama dengan pemindaian seluruh katalog.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from siagagempa.seismic_index import SeismicTimeIndex, SECONDS_PER_YEAR
+
+
+def brute_force(x, y, seconds, mag, depth, qx0, qy0, qx1, qy1, years, radius_m, as_of=None):
+    t_end = seconds.max() if as_of is None else pd.Timestamp(as_of).timestamp()
+    counts, max_mags, avg_depths = [], [], []
+    for x0, y0, x1, y1 in zip(qx0, qy0, qx1, qy1):
+        dx = np.maximum(np.maximum(x0 - x, x - x1), 0.0)
+        dy = np.maximum(np.maximum(y0 - y, y - y1), 0.0)
+        hit = (np.hypot(dx, dy) <= radius_m) & (seconds <= t_end)
+        if years is not None:
+            hit &= seconds >= t_end - years * SECONDS_PER_YEAR
+        counts.append(hit.sum())
+        max_mags.append(mag[hit].max() if hit.any() else 0.0)
+        avg_depths.append(depth[hit].mean() if hit.any() else 0.0)
+    return np.array(counts), np.array(max_mags), np.array(avg_depths)
+
+
+@pytest.fixture(scope='module')
+def catalog():
+    rng = np.random.default_rng(0)
+    n_events = 3000
+    # Kluster padat ditambah sebaran luas, waktu acak selama 30 tahun
+    x = np.r_[rng.normal(0, 15000, n_events // 2), rng.uniform(-200000, 200000, n_events - n_events // 2)]
+    y = np.r_[rng.normal(0, 15000, n_events // 2), rng.uniform(-150000, 150000, n_events - n_events // 2)]
+    start = pd.Timestamp('1995-01-01', tz='UTC').timestamp()
+    seconds = np.floor(start + rng.uniform(0, 30 * SECONDS_PER_YEAR, n_events))
+    times = pd.to_datetime(seconds, unit='s', utc=True).strftime('%Y-%m-%dT%H:%M:%SZ')
+    mag = np.round(rng.uniform(2.5, 7.0, n_events), 1)
+    depth = rng.uniform(5, 300, n_events)
+    return x, y, seconds, times, mag, depth
+
+
+@pytest.mark.parametrize('years', [None, 1, 5, 10])
+@pytest.mark.parametrize('radius_m', [10000, 25000])
+def test_point_windows_match_brute_force(catalog, years, radius_m):
+    x, y, seconds, times, mag, depth = catalog
+    index = SeismicTimeIndex(x, y, times, mag, depth)
+    rng = np.random.default_rng(1)
+    qx, qy = rng.uniform(-220000, 220000, 400), rng.uniform(-170000, 170000, 400)
+
+    count, max_mag, avg_depth = index.window_stats(qx, qy, years=years, radius_m=radius_m)
+    expected = brute_force(x, y, seconds, mag, depth, qx, qy, qx, qy, years, radius_m)
+    np.testing.assert_array_equal(count, expected[0])
+    np.testing.assert_array_equal(max_mag, expected[1])
+    np.testing.assert_allclose(avg_depth, expected[2], rtol=1e-9)
+
+
+def test_box_windows_match_brute_force(catalog):
+    x, y, seconds, times, mag, depth = catalog
+    index = SeismicTimeIndex(x, y, times, mag, depth)
+    rng = np.random.default_rng(2)
+    qx0, qy0 = rng.uniform(-200000, 200000, 200), rng.uniform(-150000, 150000, 200)
+    qx1, qy1 = qx0 + rng.uniform(0, 30000, 200), qy0 + rng.uniform(0, 30000, 200)
+
+    count, max_mag, avg_depth = index.window_stats(qx0, qy0, qx1, qy1, years=5, radius_m=10000)
+    expected = brute_force(x, y, seconds, mag, depth, qx0, qy0, qx1, qy1, 5, 10000)
+    np.testing.assert_array_equal(count, expected[0])
+    np.testing.assert_array_equal(max_mag, expected[1])
+    np.testing.assert_allclose(avg_depth, expected[2], rtol=1e-9)
+
+
+@pytest.mark.parametrize('years', [None, 2, 5])
+@pytest.mark.parametrize('as_of', ['2005-06-01', '2012-01-01T12:00:00', '1990-01-01'])
+def test_windows_exclude_events_after_as_of(catalog, years, as_of):
+    x, y, seconds, times, mag, depth = catalog
+    index = SeismicTimeIndex(x, y, times, mag, depth)
+    rng = np.random.default_rng(3)
+    qx, qy = rng.uniform(-220000, 220000, 400), rng.uniform(-170000, 170000, 400)
+
+    count, max_mag, avg_depth = index.window_stats(qx, qy, years=years, radius_m=25000, as_of=as_of)
+    expected = brute_force(x, y, seconds, mag, depth, qx, qy, qx, qy, years, 25000, as_of)
+    np.testing.assert_array_equal(count, expected[0])
+    np.testing.assert_array_equal(max_mag, expected[1])
+    np.testing.assert_allclose(avg_depth, expected[2], rtol=1e-9)
+
+
+def test_as_of_ignores_later_events_at_same_location():
+    times = ['2000-01-01T00:00:00Z', '2010-01-01T00:00:00Z', '2020-01-01T00:00:00Z']
+    index = SeismicTimeIndex([0.0, 0.0, 0.0], [0.0, 0.0, 0.0], times, [5.0, 6.0, 7.0], [10.0, 20.0, 30.0])
+    count, max_mag, avg_depth = index.window_stats([0.0], [0.0], years=5, as_of='2011-01-01')
+    assert (count[0], max_mag[0], avg_depth[0]) == (1, 6.0, 20.0)
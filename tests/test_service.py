@@ -0,0 +1,59 @@
+"""
+Layanan HTTP/JSON: validasi input (HTTP 400 dengan nama kolom) dan permintaan/respons lewat pool satu worker.
+"""
+import asyncio
+import json
+
+import pytest
+
+from siagagempa.config import MODEL_FILENAME
+from siagagempa.resources import GEODATA_PATHS
+from siagagempa.service import PredictionService, HttpError, parse_point, route
+from conftest import require_files
+
+
+def post(service, path, payload):
+    return asyncio.run(route(service, 'POST', path, json.dumps(payload).encode()))
+
+
+@pytest.mark.parametrize('field, value', [
+    ('jumlah_kk', 'lima puluh'), ('jumlah_anak', -3), ('jumlah_lansia', True), ('ada_rs', 'mungkin'),
+])
+def test_invalid_user_value_is_400_naming_the_field(field, value):
+    with pytest.raises(HttpError) as e:
+        post(PredictionService(), '/predict', {'latitude': -6.9, 'longitude': 107.6, field: value})
+    assert e.value.status == 400 and field in str(e.value)
+
+
+def test_batch_error_names_the_point():
+    points = [{'latitude': -6.9, 'longitude': 107.6}, {'latitude': -6.9, 'longitude': 107.6, 'ada_sekolah': 'kadang'}]
+    with pytest.raises(HttpError) as e:
+        post(PredictionService(), '/predict/batch', {'points': points})
+    assert e.value.status == 400 and 'ke-1' in str(e.value) and 'ada_sekolah' in str(e.value)
+
+
+def test_parse_point_accepts_numeric_strings_and_answers():
+    lat, lon, user = parse_point({'lat': '-6.9', 'lon': 107.6, 'jumlah_kk': '40', 'ada_rs': ' YA ', 'ada_sekolah': 0})
+    assert (lat, lon) == (-6.9, 107.6)
+    assert user == {'jumlah_kk': 40.0, 'ada_rs': ' YA ', 'ada_sekolah': 0}
+
+
+def test_predict_batch_round_trip():
+    require_files(MODEL_FILENAME, *GEODATA_PATHS)
+
+    async def run():
+        service = PredictionService(workers=1, coalesce_ms=0)
+        await service.start()
+        try:
+            return await route(service, 'POST', '/predict/batch', json.dumps({'points': [
+                {'latitude': -6.92, 'longitude': 107.61, 'jumlah_kk': 80, 'ada_rs': 'Ya'},
+                {'latitude': 0.0, 'longitude': 0.0},
+            ]}).encode())
+        finally:
+            await service.close()
+
+    status, payload, _ = asyncio.run(run())
+    assert status == 200 and payload['count'] == 2
+    inside, outside = payload['results']
+    assert inside['dalam_cakupan'] and inside['tingkat_risiko'] in ('Rendah', 'Sedang', 'Tinggi')
+    assert outside == {'latitude': 0.0, 'longitude': 0.0, 'tingkat_risiko': None, 'dalam_cakupan': False}